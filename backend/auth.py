@@ -3,13 +3,16 @@ import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 
-from database import get_db
+from database import get_async_db, get_db
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from models import User, UserAccessProfile
+from principal_cache import attach, get_principal_cache, invalidate_principal, snapshot
 from schemas import TokenData
 
 # Password hashing
@@ -64,14 +67,8 @@ def verify_token(token: str) -> Optional[str]:
         return None
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Get the current authenticated user from the JWT token."""
-    token = credentials.credentials
-
-    email = verify_token(token)
+def _token_email(credentials: HTTPAuthorizationCredentials) -> str:
+    email = verify_token(credentials.credentials)
 
     if email is None:
         raise HTTPException(
@@ -79,8 +76,10 @@ async def get_current_user(
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return email
 
-    user = db.query(User).filter(User.email == email).first()
+
+def _require_active_user(user: Optional[User]) -> User:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -97,23 +96,87 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """Get the current authenticated user from the JWT token."""
+    email = _token_email(credentials)
+    cache = get_principal_cache()
+    cached = cache.get_user(credentials.credentials)
+    if cached is not None and cached["email"] == email:
+        return _require_active_user(attach(db, User, cached))
+
+    user = db.query(User).filter(User.email == email).first()
+    if user is not None:
+        cache.put_user(credentials.credentials, snapshot(user))
+    return _require_active_user(user)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """get_current_user for async endpoints, using the async session."""
+    email = _token_email(credentials)
+    cache = get_principal_cache()
+    cached = cache.get_user(credentials.credentials)
+    if cached is not None and cached["email"] == email:
+        return _require_active_user(attach(db.sync_session, User, cached))
+
+    user = (await db.execute(select(User).where(User.email == email).limit(1))).scalars().first()
+    if user is not None:
+        cache.put_user(credentials.credentials, snapshot(user))
+    return _require_active_user(user)
+
+
 def get_or_create_access_profile(
     db: Session,
     user: User,
     default_role: str = "FOUNDER",
 ) -> UserAccessProfile:
+    cache = get_principal_cache()
+    cached = cache.get_profile(user.id)
+    if cached is not None:
+        return attach(db, UserAccessProfile, cached)
+
     profile = db.query(UserAccessProfile).filter(UserAccessProfile.user_id == user.id).first()
-    if profile:
-        return profile
-
-    profile = UserAccessProfile(
-        user_id=user.id,
-        role=(default_role or "FOUNDER").upper(),
-        title="",
-    )
-    db.add(profile)
-    db.commit()
-    db.refresh(profile)
+    if not profile:
+        profile = UserAccessProfile(
+            user_id=user.id,
+            role=(default_role or "FOUNDER").upper(),
+            title="",
+        )
+        db.add(profile)
+        db.commit()
+        db.refresh(profile)
+    cache.put_profile(user.id, snapshot(profile))
+    return profile
+
+
+async def get_or_create_access_profile_async(
+    db: AsyncSession,
+    user: User,
+    default_role: str = "FOUNDER",
+) -> UserAccessProfile:
+    """get_or_create_access_profile for async endpoints."""
+    cache = get_principal_cache()
+    cached = cache.get_profile(user.id)
+    if cached is not None:
+        return attach(db.sync_session, UserAccessProfile, cached)
+
+    result = await db.execute(select(UserAccessProfile).where(UserAccessProfile.user_id == user.id).limit(1))
+    profile = result.scalars().first()
+    if not profile:
+        profile = UserAccessProfile(
+            user_id=user.id,
+            role=(default_role or "FOUNDER").upper(),
+            title="",
+        )
+        db.add(profile)
+        await db.commit()
+        await db.refresh(profile)
+    cache.put_profile(user.id, snapshot(profile))
     return profile
 
 
@@ -205,5 +268,6 @@ def reset_password_with_token(token: str, new_password: str, db: Session) -> boo
 
     db.add(user)
     db.commit()
+    invalidate_principal(user_id=user.id, email=user.email)
 
     return True
@@ -0,0 +1,141 @@
+"""
+Sustained throughput of a read endpoint on the sync and async session paths.
+
+Two endpoints of a minimal FastAPI app make the lookups an authenticated list
+endpoint makes (user, then access profile, then the listing):
+
+- sync: ``def`` + a Session from a sessionmaker, as get_db() provides. Starlette
+  runs it in its threadpool, so in-flight requests are capped by
+  --threadpool-size threads.
+- async: ``async def`` + an AsyncSession, as get_async_db() provides. Requests
+  wait on the event loop, so in-flight requests are capped by connections.
+
+--concurrency clients hit each endpoint in-process through httpx's ASGI
+transport for --duration seconds. --db-latency-ms adds a pg_sleep() to the
+listing query to stand in for network round-trips to a remote database,
+which is where threadpool pinning shows.
+
+Needs DATABASE_URL pointing at a Postgres (set DATABASE_SSLMODE=disable for a
+local server without TLS) and asyncpg installed. Only SELECTs against
+pg_catalog are issued. The pool size applies to both engines.
+
+Usage (from backend/):
+    python -m benchmarks.async_reads
+    python -m benchmarks.async_reads --concurrency 128 --duration 20 --pool-size 32 --db-latency-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import anyio.to_thread
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import db_pool
+
+USER_LOOKUP = text("SELECT oid, rolname FROM pg_roles WHERE rolname = current_user")
+PROFILE_LOOKUP = text("SELECT datname, datallowconn FROM pg_database WHERE datname = current_database()")
+LISTING = text("SELECT relname, reltuples FROM pg_class, pg_sleep(:delay) ORDER BY oid DESC LIMIT 25")
+
+
+def _build_app(url: str, delay: float) -> tuple[FastAPI, list]:
+    engine = create_engine(url, **db_pool.engine_options(url, "queue"))
+    async_engine = create_async_engine(db_pool.async_database_url(url), **db_pool.async_engine_options(url, "queue"))
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_listing():
+        db = session_factory()
+        try:
+            db.execute(USER_LOOKUP).first()
+            db.execute(PROFILE_LOOKUP).first()
+            return {"items": len(db.execute(LISTING, {"delay": delay}).all())}
+        finally:
+            db.close()
+
+    @app.get("/async")
+    async def async_listing():
+        async with async_session_factory() as db:
+            (await db.execute(USER_LOOKUP)).first()
+            (await db.execute(PROFILE_LOOKUP)).first()
+            return {"items": len((await db.execute(LISTING, {"delay": delay})).all())}
+
+    return app, [engine, async_engine]
+
+
+async def _client(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, errors: list) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            response.raise_for_status()
+        except Exception as exc:
+            errors.append(exc)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run(app: FastAPI, path: str, concurrency: int, duration: float) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        await client.get(path)  # warm-up: fill the pool
+        latencies: list = []
+        errors: list = []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(_client(client, path, deadline, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else 0.0,
+        "errors": len(errors),
+    }
+
+
+async def _main(args, url: str) -> None:
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool_size
+    app, engines = _build_app(url, args.db_latency_ms / 1000)
+    try:
+        print(
+            f"{args.concurrency} clients for {args.duration:.0f}s, pool_size={args.pool_size}, "
+            f"threadpool={args.threadpool_size}, extra db latency={args.db_latency_ms:.0f} ms"
+        )
+        print(f"{'path':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for path in args.paths:
+            result = await _run(app, f"/{path}", args.concurrency, args.duration)
+            print(f"{path:>6} {result['rps']:8.1f} {result['p50']:8.2f} {result['p95']:8.2f} {result['errors']:>7}")
+    finally:
+        engines[0].dispose()
+        await engines[1].dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--pool-size", type=int, default=16)
+    parser.add_argument("--threadpool-size", type=int, default=40, help="Starlette/anyio worker threads (default 40)")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--paths", nargs="+", choices=("sync", "async"), default=["sync", "async"])
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        parser.error("DATABASE_URL must point at a Postgres database")
+    os.environ["DATABASE_POOL_SIZE"] = str(args.pool_size)
+    os.environ["DATABASE_MAX_OVERFLOW"] = "0"
+    asyncio.run(_main(args, url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Request latency with NullPool versus the pooled (QueuePool) engine mode.
+
+Each simulated request opens a Session, runs the two lookups an
+authenticated endpoint makes (user, then access profile), and closes it,
+as get_db() + get_current_user() + get_or_create_access_profile() do.
+Requests are issued from --concurrency threads against two engines built
+with db_pool.engine_options: one per pool mode.
+
+Needs DATABASE_URL pointing at a Postgres (set DATABASE_SSLMODE=disable for a
+local server without TLS). Only SELECTs against pg_catalog are issued.
+
+Usage (from backend/):
+    python -m benchmarks.db_pool
+    python -m benchmarks.db_pool --requests 2000 --concurrency 8 --pool-size 4 --max-overflow 4
+"""
+
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import db_pool
+
+USER_LOOKUP = text("SELECT oid, rolname FROM pg_roles WHERE rolname = current_user")
+PROFILE_LOOKUP = text("SELECT datname, datallowconn FROM pg_database WHERE datname = current_database()")
+
+
+def _request(session_factory) -> float:
+    started = time.perf_counter()
+    db = session_factory()
+    try:
+        db.execute(USER_LOOKUP).first()
+        db.execute(PROFILE_LOOKUP).first()
+    finally:
+        db.close()
+    return time.perf_counter() - started
+
+
+def _run(mode: str, url: str, requests: int, concurrency: int) -> dict:
+    engine = create_engine(url, **db_pool.engine_options(url, mode))
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    try:
+        _request(session_factory)  # warm-up: DNS, TLS session cache, pool fill
+        db_pool.pool_metrics.reset()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = sorted(executor.map(lambda _: _request(session_factory), range(requests)))
+        elapsed = time.perf_counter() - started
+        stats = db_pool.database_pool_stats(engine)
+    finally:
+        engine.dispose()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "rps": requests / elapsed,
+        "connects": stats["connects"],
+        "checkout_p95": stats["checkout_ms_p95"],
+        "peak_overflow": stats["peak_overflow"],
+        "timeouts": stats["timeouts"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--modes", nargs="+", choices=db_pool.DATABASE_POOL_MODES, default=list(db_pool.DATABASE_POOL_MODES))
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        parser.error("DATABASE_URL must point at a Postgres database")
+    os.environ["DATABASE_POOL_SIZE"] = str(args.pool_size)
+    os.environ["DATABASE_MAX_OVERFLOW"] = str(args.max_overflow)
+
+    print(f"{args.requests} requests, {args.concurrency} threads, pool_size={args.pool_size} max_overflow={args.max_overflow}")
+    print(f"{'mode':>6} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>8} {'connects':>9} {'checkout p95':>13} {'overflow':>9} {'timeouts':>9}")
+    for mode in args.modes:
+        result = _run(mode, url, args.requests, args.concurrency)
+        print(
+            f"{mode:>6} {result['p50']:8.2f} {result['p95']:8.2f} {result['rps']:8.1f} {result['connects']:>9} "
+            f"{result['checkout_p95']:10.2f} ms {result['peak_overflow']:>9} {result['timeouts']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
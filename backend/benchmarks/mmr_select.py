@@ -0,0 +1,62 @@
+"""
+Micro-benchmark for rag.model.mmr_select.
+
+Times the NumPy path against the pure-Python fallback on random
+1536-dimension embeddings (the text-embedding-3-small width).
+
+Usage (from backend/):
+    python -m benchmarks.mmr_select
+    python -m benchmarks.mmr_select --sizes 1000 5000 20000 --top-k 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from rag import model
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000, 5000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--python-limit", type=int, default=1000, help="skip the pure-Python path above this size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    query = rng.standard_normal(args.dim).tolist()
+
+    print(f"{'candidates':>10} {'numpy ms':>10} {'python ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        embeddings = rng.standard_normal((size, args.dim)).tolist()
+        chunks = [(f"chunk-{i}", emb, f"doc-{i % 17}") for i, emb in enumerate(embeddings)]
+
+        numpy_s = _time(lambda: model.mmr_select(query, chunks, top_k=args.top_k), args.repeat)
+
+        python_s = None
+        if size <= args.python_limit:
+            python_s = _time(
+                lambda: model._mmr_order_python(query, embeddings, args.top_k, 0.5),
+                1,
+            )
+
+        speedup = f"{python_s / numpy_s:7.1f}x" if python_s else "      -"
+        python_ms = f"{python_s * 1000:10.1f}" if python_s else f"{'-':>10}"
+        print(f"{size:>10} {numpy_s * 1000:10.1f} {python_ms} {speedup}")
+
+
+
+if __name__ == "__main__":
+    main()
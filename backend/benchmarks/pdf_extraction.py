@@ -0,0 +1,94 @@
+"""
+Benchmark for parallel page-level PDF extraction.
+
+Generates a synthetic text-only PDF locally, then times sequential
+pdfplumber extraction against DocumentExtractionPool.extract_pdf_pages with
+1..N worker processes and checks every run reassembles the same pages.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_extraction
+    python -m benchmarks.pdf_extraction --pages 400 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from rag.extraction_pool import DocumentExtractionPool, count_pdf_pages, extract_pdf_page_range
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def build_text_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """A minimal PDF with one Helvetica text stream per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(1, pages + 1):
+        lines = [f"Page {page} line {line}: revenue grew while churn and CAC stayed flat." for line in range(lines_per_page)]
+        body = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({text}) '" for text in lines) + " ET"
+        stream = body.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="defaults to 1..cpu_count")
+    parser.add_argument("--pages-per-job", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = args.workers or list(range(1, cpu_count + 1))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.pdf")
+        with open(path, "wb") as handle:
+            handle.write(build_text_pdf(args.pages))
+        print(f"{args.pages} pages, {os.path.getsize(path) / 1024:.0f} KiB, {cpu_count} CPU(s)")
+
+        expected = extract_pdf_page_range(path, 0, count_pdf_pages(path))
+        sequential_s = _time(lambda: extract_pdf_page_range(path, 0, count_pdf_pages(path)), args.repeat)
+
+        print(f"{'workers':>8} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+        print(f"{'inline':>8} {sequential_s:9.2f} {args.pages / sequential_s:9.1f} {1.0:7.2f}x")
+        for workers in worker_counts:
+            pool = DocumentExtractionPool(workers=workers, max_queue=workers, max_pages=args.pages)
+            try:
+                # Spawn the worker processes outside the timed region.
+                assert pool.extract_pdf_pages(path) == expected, "pages reassembled out of order"
+                elapsed = _time(lambda: list(pool.iter_pdf_pages(path, pages_per_job=args.pages_per_job)), args.repeat)
+            finally:
+                pool.shutdown()
+            print(f"{workers:>8} {elapsed:9.2f} {args.pages / elapsed:9.1f} {sequential_s / elapsed:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Report table size and row-fetch latency with inline export_html versus the
+compressed artifact store.
+
+Two copies of the report table are filled with the same --reports rows, each
+with a synthetic rendered export (--html-kb of markup with inline base64 SVG
+charts, the shape build_report_html produces):
+
+- inline: the HTML sits in an export_html column of the row (before)
+- artifacts: the row holds export_artifact_id and the HTML is stored once per
+  distinct content, compressed, as reporting/artifact_store.py does (after)
+
+--duplicate-ratio of the reports reuse an earlier report's HTML, standing in
+for republished or re-rendered unchanged content.
+
+Reported per layout: total size of the report table and (after) the artifact
+table, median latency to fetch one full row by id, and to fetch a 50-row
+page of full rows. The artifacts layout also reports reading the HTML back
+(join plus decompress), which only the export path pays.
+
+Defaults to a temporary SQLite file. With --database-url (e.g. a Postgres
+DATABASE_URL) the benchmark creates and drops its own bench_* tables there.
+
+Usage (from backend/):
+    python -m benchmarks.report_artifacts
+    python -m benchmarks.report_artifacts --reports 2000 --html-kb 300 --database-url "$DATABASE_URL"
+"""
+
+import argparse
+import base64
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Integer, MetaData, String, Table, Text, create_engine, select, text
+
+from models import RenderedArtifact
+from modules.simulation.reporting.artifact_store import artifact_values, decompress
+
+metadata = MetaData()
+
+
+def _report_columns() -> list:
+    return [
+        Column("id", String(36), primary_key=True),
+        Column("owner_user_id", Integer, nullable=False, index=True),
+        Column("report_name", String(255), nullable=False),
+        Column("summary", Text, nullable=False),
+        Column("sections", JSON, nullable=False),
+        Column("key_findings", JSON, nullable=False),
+        Column("recommended_actions", JSON, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+    ]
+
+
+inline_reports = Table("bench_reports_inline", metadata, *_report_columns(), Column("export_html", Text, nullable=False))
+artifact_reports = Table(
+    "bench_reports_artifacts", metadata, *_report_columns(), Column("export_artifact_id", String(64), index=True)
+)
+artifacts = RenderedArtifact.__table__.to_metadata(metadata, name="bench_rendered_artifacts")
+
+
+def _chart(rng: random.Random) -> str:
+    bars = "".join(
+        f'<rect x="{index * 24}" y="{200 - value}" width="18" height="{value}" fill="#3b82f6"/>'
+        f'<text x="{index * 24}" y="215" font-size="9">Q{index + 1} {value}%</text>'
+        for index, value in enumerate(rng.randint(10, 190) for _ in range(12))
+    )
+    svg = f'<svg xmlns="http://www.w3.org/2000/svg" width="300" height="220">{bars}</svg>'
+    return f'<img alt="chart" src="data:image/svg+xml;base64,{base64.b64encode(svg.encode()).decode()}"/>'
+
+
+def _html(rng: random.Random, size_kb: int) -> str:
+    parts = ["<!doctype html><html><head><style>body{font-family:Inter}</style></head><body>"]
+    length = 0
+    while length < size_kb * 1024:
+        words = " ".join(rng.choice(("market", "runway", "churn", "pricing", "cohort", "retention", "margin")) for _ in range(60))
+        block = f"<section><h2>Finding {len(parts)}</h2><p>{words}.</p>{_chart(rng)}</section>"
+        parts.append(block)
+        length += len(block)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def _fill(engine, reports: int, html_kb: int, duplicate_ratio: float, seed: int) -> None:
+    rng = random.Random(seed)
+    htmls: list[str] = []
+    with engine.begin() as conn:
+        for index in range(reports):
+            if htmls and rng.random() < duplicate_ratio:
+                html = rng.choice(htmls)
+            else:
+                html = _html(rng, html_kb)
+                htmls.append(html)
+            row = {
+                "id": str(uuid.uuid4()),
+                "owner_user_id": index % 20,
+                "report_name": f"Report {index}",
+                "summary": "Viability summary. " * 20,
+                "sections": [{"title": f"Section {n}", "blocks": [{"type": "rich_text"}]} for n in range(8)],
+                "key_findings": [f"Finding {n}" for n in range(6)],
+                "recommended_actions": [f"Action {n}" for n in range(5)],
+                "created_at": datetime(2026, 1, 1),
+            }
+            conn.execute(inline_reports.insert().values(**row, export_html=html))
+            values = artifact_values(html)
+            if conn.execute(select(artifacts.c.id).where(artifacts.c.id == values["id"])).first() is None:
+                conn.execute(artifacts.insert().values(**values))
+            conn.execute(artifact_reports.insert().values(**row, export_artifact_id=values["id"]))
+
+
+def _table_bytes(engine, name: str):
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            return conn.execute(text("SELECT pg_total_relation_size(:name)"), {"name": name}).scalar()
+        if engine.dialect.name == "sqlite":
+            try:
+                return conn.execute(text("SELECT SUM(pgsize) FROM dbstat WHERE name = :name"), {"name": name}).scalar()
+            except Exception:
+                return None
+    return None
+
+
+def _median_ms(samples: list[float]) -> float:
+    return statistics.median(samples) * 1000
+
+
+def _time_fetches(engine, table: Table, ids: list[str], repeats: int) -> tuple[float, float]:
+    one, page = [], []
+    with engine.connect() as conn:
+        for report_id in ids[:repeats]:
+            started = time.perf_counter()
+            conn.execute(select(table).where(table.c.id == report_id)).one()
+            one.append(time.perf_counter() - started)
+        for _ in range(max(1, repeats // 10)):
+            started = time.perf_counter()
+            conn.execute(select(table).where(table.c.owner_user_id == 3).limit(50)).all()
+            page.append(time.perf_counter() - started)
+    return _median_ms(one), _median_ms(page)
+
+
+def _time_html_reads(engine, ids: list[str], repeats: int) -> float:
+    samples = []
+    query = select(artifacts.c.data, artifacts.c.encoding).join(
+        artifact_reports, artifact_reports.c.export_artifact_id == artifacts.c.id
+    )
+    with engine.connect() as conn:
+        for report_id in ids[:repeats]:
+            started = time.perf_counter()
+            data, encoding = conn.execute(query.where(artifact_reports.c.id == report_id)).one()
+            decompress(data, encoding).decode("utf-8")
+            samples.append(time.perf_counter() - started)
+    return _median_ms(samples)
+
+
+def _format_bytes(value) -> str:
+    return "n/a" if value is None else f"{value / 1024 / 1024:.2f} MiB"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=300)
+    parser.add_argument("--html-kb", type=int, default=150)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    parser.add_argument("--fetches", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+
+    temp_dir = None
+    url = args.database_url
+    if not url:
+        temp_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(temp_dir.name, 'bench.db')}"
+    engine = create_engine(url)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    try:
+        started = time.perf_counter()
+        _fill(engine, args.reports, args.html_kb, args.duplicate_ratio, args.seed)
+        print(
+            f"{args.reports} reports, ~{args.html_kb} KiB HTML each, {args.duplicate_ratio:.0%} duplicates, "
+            f"{engine.dialect.name} (filled in {time.perf_counter() - started:.1f}s)"
+        )
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE"))
+
+        with engine.connect() as conn:
+            ids = conn.execute(select(inline_reports.c.id)).scalars().all()
+            stored = conn.execute(
+                select(artifacts.c.encoding, artifacts.c.size_bytes, artifacts.c.stored_bytes)
+            ).all()
+        random.Random(args.seed).shuffle(ids)
+
+        inline_bytes = _table_bytes(engine, inline_reports.name)
+        report_bytes = _table_bytes(engine, artifact_reports.name)
+        artifact_bytes = _table_bytes(engine, artifacts.name)
+        inline_one, inline_page = _time_fetches(engine, inline_reports, ids, args.fetches)
+        after_one, after_page = _time_fetches(engine, artifact_reports, ids, args.fetches)
+        html_read = _time_html_reads(engine, ids, args.fetches)
+
+        raw = sum(row.size_bytes for row in stored)
+        compressed = sum(row.stored_bytes for row in stored)
+        print(
+            f"artifacts: {len(stored)} distinct ({stored[0].encoding}), "
+            f"{raw / 1024 / 1024:.2f} MiB raw -> {compressed / 1024 / 1024:.2f} MiB stored"
+        )
+        print(f"{'layout':>10} {'report table':>14} {'artifacts':>12} {'row by id':>11} {'50-row page':>12}")
+        print(f"{'inline':>10} {_format_bytes(inline_bytes):>14} {'-':>12} {inline_one:8.3f} ms {inline_page:9.3f} ms")
+        print(
+            f"{'artifacts':>10} {_format_bytes(report_bytes):>14} {_format_bytes(artifact_bytes):>12} "
+            f"{after_one:8.3f} ms {after_page:9.3f} ms"
+        )
+        print(f"export HTML read (join + decompress): {html_read:.3f} ms")
+    finally:
+        metadata.drop_all(engine)
+        engine.dispose()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Recall@k versus latency for pgvector ANN indexes.
+
+Loads clustered random vectors into a scratch table, computes exact top-k
+with index scans disabled, then builds each ANN index (via
+rag.vector_index.build_index_sql) and sweeps hnsw.ef_search / ivfflat.probes.
+Needs DATABASE_URL pointing at a Postgres with the vector extension; the
+scratch table is dropped afterwards unless --keep is given.
+
+Usage (from backend/):
+    python -m benchmarks.vector_recall
+    python -m benchmarks.vector_recall --rows 100000 --dim 1536 --queries 200 --top-k 10
+    python -m benchmarks.vector_recall --methods hnsw --ef-search 20 40 80 160 320
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+
+from rag.vector_index import apply_search_params, build_index_sql, index_name, ivfflat_lists_for
+
+TABLE = "vector_recall_bench"
+
+
+def _literal(vector) -> str:
+    return "[" + ",".join(f"{value:.6f}" for value in vector) + "]"
+
+
+def _clustered(rng, rows: int, dim: int, clusters: int) -> np.ndarray:
+    """Gaussian blobs around random centres, closer to real embeddings than uniform noise."""
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, rows)
+    return centres[labels] + 0.35 * rng.standard_normal((rows, dim)).astype(np.float32)
+
+
+def _search(cur, query: str, top_k: int) -> list:
+    cur.execute(f"SELECT id FROM {TABLE} ORDER BY embedding <=> %s::vector LIMIT %s", (query, top_k))
+    return [row[0] for row in cur.fetchall()]
+
+
+def _sweep(conn, queries, truth, top_k: int, **search_params) -> tuple:
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        with conn.cursor() as cur:
+            apply_search_params(cur, **search_params)
+            started = time.perf_counter()
+            found = _search(cur, query, top_k)
+            latencies.append(time.perf_counter() - started)
+        conn.rollback()
+        hits += len(set(found) & expected)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return hits / (len(queries) * top_k), statistics.median(latencies) * 1000, p95 * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--methods", nargs="+", choices=["hnsw", "ivfflat"], default=["hnsw", "ivfflat"])
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 20, 40, 80, 160])
+    parser.add_argument("--lists", type=int, default=0, help="ivfflat lists (0 = rows/1000)")
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table")
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        parser.error("DATABASE_URL must point at a Postgres database with the vector extension")
+
+    rng = np.random.default_rng(7)
+    data = _clustered(rng, args.rows, args.dim, args.clusters)
+    queries = [_literal(vector) for vector in _clustered(rng, args.queries, args.dim, args.clusters)]
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    try:
+        with conn.cursor() as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+            cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cur.execute(f"CREATE TABLE {TABLE} (id integer PRIMARY KEY, embedding vector({args.dim}))")
+            execute_values(
+                cur,
+                f"INSERT INTO {TABLE} (id, embedding) VALUES %s",
+                [(index, _literal(vector)) for index, vector in enumerate(data)],
+                page_size=1000,
+            )
+            cur.execute(f"ANALYZE {TABLE}")
+        conn.commit()
+
+        truth = []
+        exact_latencies = []
+        for query in queries:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL enable_indexscan = off")
+                started = time.perf_counter()
+                truth.append(set(_search(cur, query, args.top_k)))
+                exact_latencies.append(time.perf_counter() - started)
+            conn.rollback()
+        exact_ms = statistics.median(exact_latencies) * 1000
+
+        print(f"{args.rows} rows x {args.dim} dims, {args.queries} queries, recall@{args.top_k}")
+        print(f"{'index':>8} {'param':>14} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8} {'vs exact':>9}")
+        print(f"{'exact':>8} {'-':>14} {1.0:7.3f} {exact_ms:8.2f} {'-':>8} {1.0:8.1f}x")
+
+        for method in args.methods:
+            lists = args.lists or ivfflat_lists_for(args.rows)
+            sql = build_index_sql(
+                method, table=TABLE, m=args.m, ef_construction=args.ef_construction, lists=lists, concurrently=False
+            )
+            with conn.cursor() as cur:
+                started = time.perf_counter()
+                cur.execute(sql)
+            conn.commit()
+            print(f"{method:>8} built in {time.perf_counter() - started:.1f}s ({sql.split(' WITH ')[1]})")
+
+            sweep = [("ef_search", value) for value in args.ef_search] if method == "hnsw" else [
+                ("probes", value) for value in args.probes if value <= lists
+            ]
+            for name, value in sweep:
+                recall, p50, p95 = _sweep(conn, queries, truth, args.top_k, **{name: value})
+                print(f"{method:>8} {f'{name}={value}':>14} {recall:7.3f} {p50:8.2f} {p95:8.2f} {exact_ms / p50:8.1f}x")
+
+            with conn.cursor() as cur:
+                cur.execute(f"DROP INDEX IF EXISTS {index_name(method, TABLE)}")
+            conn.commit()
+    finally:
+        if not args.keep:
+            with conn.cursor() as cur:
+                conn.rollback()
+                cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
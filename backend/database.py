@@ -1,11 +1,13 @@
 import logging
 import os
+import threading
 import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import bindparam, create_engine, inspect, text
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from db_pool import async_database_url, async_engine_options, database_pool_stats as _pool_stats, engine_options
 from models import Base
 
 load_dotenv()
@@ -16,25 +18,8 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found in environment variables")
 
-engine_kwargs = {
-    "pool_pre_ping": True,
-    "pool_recycle": int(os.getenv("DATABASE_POOL_RECYCLE_SECONDS", "300")),
-}
-
-# Supabase/Postgres deployments typically require SSL.
-if DATABASE_URL.startswith("postgresql"):
-    engine_kwargs["connect_args"] = {
-        "sslmode": os.getenv("DATABASE_SSLMODE", "require"),
-        "connect_timeout": int(os.getenv("DATABASE_CONNECT_TIMEOUT_SECONDS", "10")),
-    }
-
-use_null_pool = os.getenv("DATABASE_USE_NULL_POOL", "1").strip().lower() not in {"0", "false", "no"}
-if use_null_pool:
-    engine_kwargs["poolclass"] = NullPool
-else:
-    engine_kwargs["pool_size"] = int(os.getenv("DATABASE_POOL_SIZE", "2"))
-    engine_kwargs["max_overflow"] = int(os.getenv("DATABASE_MAX_OVERFLOW", "0"))
-    engine_kwargs["pool_timeout"] = int(os.getenv("DATABASE_POOL_TIMEOUT_SECONDS", "10"))
+# NullPool or a transaction-pooler-safe QueuePool, per DATABASE_POOL_MODE (see db_pool.py).
+engine_kwargs = engine_options(DATABASE_URL)
 
 engine = create_engine(DATABASE_URL, **engine_kwargs)
 
@@ -44,6 +29,34 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async engine (asyncpg) for read-heavy endpoints; created on first use so the
+# sync-only paths (jobs, CLIs, tests) never need the async driver.
+_async_engine = None
+_async_session_factory = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine():
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_engine(
+                    async_database_url(DATABASE_URL),
+                    **async_engine_options(DATABASE_URL),
+                )
+                _async_session_factory = async_sessionmaker(
+                    _async_engine,
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    get_async_engine()
+    return _async_session_factory
+
 
 def _has_column(inspector, table_name: str, column_name: str) -> bool:
     try:
@@ -52,6 +65,43 @@ def _has_column(inspector, table_name: str, column_name: str) -> bool:
         return False
 
 
+def _has_foreign_key(inspector, table_name: str, column_name: str) -> bool:
+    try:
+        return any(column_name in fk.get("constrained_columns", []) for fk in inspector.get_foreign_keys(table_name))
+    except Exception:
+        return False
+
+
+def _json_array_length_sql(dialect_name: str, column: str) -> str:
+    if dialect_name == "postgresql":
+        return f"CASE WHEN json_typeof({column}::json) = 'array' THEN json_array_length({column}::json) ELSE 0 END"
+    return f"CASE WHEN json_type({column}) = 'array' THEN json_array_length({column}) ELSE 0 END"
+
+
+def _backfill_report_item_counts(batch_size: int = 500) -> None:
+    """Set the list counts from the JSON columns, one committed set-based UPDATE per batch of ids."""
+    counts = ", ".join(
+        f"{column}_count = {_json_array_length_sql(engine.dialect.name, column)}"
+        for column in ("sections", "key_findings", "recommended_actions")
+    )
+    last_id = ""
+    while True:
+        with engine.begin() as conn:
+            ids = conn.execute(
+                text("SELECT id FROM business_insight_reports WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                {"last_id": last_id, "limit": batch_size},
+            ).scalars().all()
+            if not ids:
+                return
+            conn.execute(
+                text(f"UPDATE business_insight_reports SET {counts} WHERE id IN :ids").bindparams(
+                    bindparam("ids", expanding=True)
+                ),
+                {"ids": ids},
+            )
+        last_id = ids[-1]
+
+
 def _run_lightweight_migrations() -> None:
     """Best-effort additive migrations for deployments without Alembic."""
     try:
@@ -75,6 +125,36 @@ def _run_lightweight_migrations() -> None:
         if _has_column(inspector, "business_insight_reports", "template_id") is False:
             conn.execute(text("ALTER TABLE business_insight_reports ADD COLUMN template_id VARCHAR(64) DEFAULT 'obsidian_board'"))
 
+        # business_insight_reports list counts (read by listings instead of the JSON columns)
+        added_counts = False
+        for column in ("sections_count", "key_findings_count", "recommended_actions_count"):
+            if _has_column(inspector, "business_insight_reports", column) is False:
+                conn.execute(text(f"ALTER TABLE business_insight_reports ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+                added_counts = True
+
+        # background_jobs.heartbeat_at (lease of the process running a job)
+        if _has_column(inspector, "background_jobs", "heartbeat_at") is False:
+            conn.execute(text("ALTER TABLE background_jobs ADD COLUMN heartbeat_at TIMESTAMP"))
+
+        # business_insight_reports.export_html -> rendered_artifacts (compressed, content-addressed)
+        if _has_column(inspector, "business_insight_reports", "export_artifact_id") is False:
+            conn.execute(text("ALTER TABLE business_insight_reports ADD COLUMN export_artifact_id VARCHAR(64)"))
+        add_export_artifact_fk = conn.dialect.name == "postgresql" and not _has_foreign_key(
+            inspector, "business_insight_reports", "export_artifact_id"
+        )
+        if add_export_artifact_fk:
+            # NOT VALID skips the table scan here; the constraint is validated after the copy below.
+            conn.execute(
+                text(
+                    "ALTER TABLE business_insight_reports ADD CONSTRAINT business_insight_reports_export_artifact_id_fkey "
+                    "FOREIGN KEY (export_artifact_id) REFERENCES rendered_artifacts (id) ON DELETE SET NULL NOT VALID"
+                )
+            )
+        legacy_export_html = _has_column(inspector, "business_insight_reports", "export_html")
+        if legacy_export_html and conn.dialect.name != "sqlite":
+            # The model no longer writes export_html; keep inserts valid until the column is dropped.
+            conn.execute(text("ALTER TABLE business_insight_reports ALTER COLUMN export_html SET DEFAULT ''"))
+
         # indexes (ignore failures if already present)
         for statement in [
             "CREATE INDEX IF NOT EXISTS ix_user_access_profiles_is_pro ON user_access_profiles (is_pro)",
@@ -84,12 +164,62 @@ def _run_lightweight_migrations() -> None:
             "CREATE INDEX IF NOT EXISTS ix_business_insight_report_versions_report_id ON business_insight_report_versions (report_id)",
             "CREATE INDEX IF NOT EXISTS ix_business_insight_report_versions_status ON business_insight_report_versions (status)",
             "CREATE INDEX IF NOT EXISTS ix_business_insight_report_versions_content_hash ON business_insight_report_versions (content_hash)",
+            "CREATE INDEX IF NOT EXISTS ix_business_insight_reports_export_artifact_id ON business_insight_reports (export_artifact_id)",
         ]:
             try:
                 conn.execute(text(statement))
             except Exception:
                 pass
 
+        # newest-first listing indexes (see models._newest_first_indexes)
+        for table, owner_column in (("business_insight_reports", "owner_user_id"), ("simulation_runs", "owner_email")):
+            if conn.dialect.name == "postgresql":
+                conn.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS ix_{table}_owner_newest "
+                        f"ON {table} ({owner_column}, created_at DESC NULLS LAST, id DESC)"
+                    )
+                )
+                conn.execute(text(f"DROP INDEX IF EXISTS ix_{table}_owner_created_id"))
+            else:
+                conn.execute(
+                    text(f"CREATE INDEX IF NOT EXISTS ix_{table}_owner_created_id ON {table} ({owner_column}, created_at, id)")
+                )
+
+    if added_counts:
+        # Outside the schema transaction, so the new columns' lock is not held while rows are rewritten.
+        _backfill_report_item_counts()
+
+    if legacy_export_html:
+        # Imported here: the reporting package pulls in the report renderer.
+        from modules.simulation.reporting.artifact_store import drop_legacy_export_html, move_legacy_export_html
+
+        # Outside the schema transaction: batches commit as they go and the drop is opt-in.
+        moved = move_legacy_export_html(engine)
+        if moved:
+            logger.info("Moved %s report exports to rendered_artifacts", moved)
+        dropped = False
+        if os.getenv("DROP_LEGACY_EXPORT_HTML", "false").strip().lower() in {"1", "true", "yes", "on"}:
+            dropped = drop_legacy_export_html(engine)
+        if not dropped and engine.dialect.name == "sqlite":
+            # SQLite cannot give the NOT NULL column a default, so every new report insert would fail.
+            raise RuntimeError(
+                "business_insight_reports.export_html is still present and SQLite cannot default it; "
+                "restart with DROP_LEGACY_EXPORT_HTML=1 to drop it (its HTML has been copied to rendered_artifacts)."
+            )
+
+    if add_export_artifact_fk:
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "ALTER TABLE business_insight_reports "
+                        "VALIDATE CONSTRAINT business_insight_reports_export_artifact_id_fkey"
+                    )
+                )
+        except Exception as exc:
+            logger.warning("export_artifact_id foreign key left unvalidated (orphaned artifact pointers?): %s", exc)
+
 
 def get_db():
     """Dependency to get database session."""
@@ -100,6 +230,20 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency to get an async database session (for async def endpoints)."""
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    with _async_engine_lock:
+        engine_to_dispose, _async_engine, _async_session_factory = _async_engine, None, None
+    if engine_to_dispose is not None:
+        await engine_to_dispose.dispose()
+
+
 def check_database_health() -> dict:
     """Return a lightweight, non-secret database connectivity status."""
     try:
@@ -110,6 +254,13 @@ def check_database_health() -> dict:
         return {"ready": False, "error": str(exc)}
 
 
+def database_pool_stats() -> dict:
+    """Pool mode, occupancy and checkout latency/overflow metrics for /health."""
+    stats = _pool_stats(engine)
+    stats["async"] = _pool_stats(_async_engine.sync_engine) if _async_engine is not None else {"initialized": False}
+    return stats
+
+
 def create_tables():
     """Create all database tables with retries for transient pooler saturation."""
     attempts = max(1, int(os.getenv("DATABASE_STARTUP_RETRIES", "3")))
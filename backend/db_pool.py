@@ -0,0 +1,274 @@
+"""
+SQLAlchemy engine pooling for database.py, with checkout metrics.
+
+DATABASE_POOL_MODE selects the pool:
+
+- null: a fresh connection per checkout (NullPool). This is the historical
+  default and is still used when DATABASE_USE_NULL_POOL is left at 1.
+- queue: a bounded QueuePool of DATABASE_POOL_SIZE connections plus
+  DATABASE_MAX_OVERFLOW temporary ones. Checkouts block for up to
+  DATABASE_POOL_TIMEOUT_SECONDS when the pool is exhausted.
+
+The queued mode is safe behind a transaction-mode pooler (Supabase on port
+6543, PgBouncer pool_mode=transaction):
+
+- Server-side prepared statements are disabled for drivers that use them
+  (psycopg 3, asyncpg). psycopg2 never prepares server-side, so it needs
+  nothing.
+- Connections are rolled back when returned (reset_on_return="rollback").
+  No session state such as SET or advisory locks survives a request, and no
+  open transaction pins a server connection.
+- Connections are reused LIFO. The pool keeps a few hot connections, and
+  surplus ones sit idle long enough for pool_recycle and the pooler's idle
+  timeout to close them.
+
+Both pool classes record checkout latency (including waits and new
+connections), timeouts, new connections and overflow use for
+database_pool_stats().
+
+async_engine_options() builds the same pool for the asyncpg engine behind
+database.get_async_db; its metrics are kept separately.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+DATABASE_POOL_MODES = ("null", "queue")
+TRANSACTION_POOLER_PORT = 6543
+
+_LATENCY_WINDOW = 2048
+
+
+def database_pool_mode() -> str:
+    mode = os.getenv("DATABASE_POOL_MODE", "").strip().lower()
+    if not mode:
+        use_null_pool = os.getenv("DATABASE_USE_NULL_POOL", "1").strip().lower() not in {"0", "false", "no"}
+        mode = "null" if use_null_pool else "queue"
+    if mode not in DATABASE_POOL_MODES:
+        raise ValueError(f"Unknown DATABASE_POOL_MODE '{mode}'. Use one of {DATABASE_POOL_MODES}.")
+    return mode
+
+
+def behind_transaction_pooler(database_url: str) -> bool:
+    """DATABASE_TRANSACTION_POOLER, or the Supabase transaction pooler port."""
+    configured = os.getenv("DATABASE_TRANSACTION_POOLER", "").strip().lower()
+    if configured:
+        return configured not in {"0", "false", "no"}
+    try:
+        return make_url(database_url).port == TRANSACTION_POOLER_PORT
+    except Exception:
+        return False
+
+
+def prepared_statement_connect_args(database_url: str) -> Dict[str, Any]:
+    """connect_args that turn off server-side prepared statements for the URL's driver."""
+    driver = make_url(database_url).get_driver_name()
+    if driver == "psycopg":
+        return {"prepare_threshold": None}
+    if driver == "asyncpg":
+        # asyncpg still prepares each statement; unique names keep them from
+        # colliding on a server connection shared with other clients.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return {}
+
+
+class PoolMetrics:
+    """Thread-safe counters shared by the instrumented pool classes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latencies.clear()
+            self._counters = {
+                "checkouts": 0,
+                "timeouts": 0,
+                "connects": 0,
+                "overflow_checkouts": 0,
+                "peak_checked_out": 0,
+                "peak_overflow": 0,
+                "checkout_seconds_total": 0.0,
+                "checkout_seconds_max": 0.0,
+            }
+
+    def record_checkout(self, seconds: float, pool: Any) -> None:
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+        overflow = max(0, pool.overflow()) if isinstance(pool, QueuePool) else 0
+        with self._lock:
+            counters = self._counters
+            counters["checkouts"] += 1
+            counters["checkout_seconds_total"] += seconds
+            counters["checkout_seconds_max"] = max(counters["checkout_seconds_max"], seconds)
+            counters["peak_checked_out"] = max(counters["peak_checked_out"], checked_out)
+            counters["peak_overflow"] = max(counters["peak_overflow"], overflow)
+            if overflow:
+                counters["overflow_checkouts"] += 1
+            self._latencies.append(seconds)
+
+    def record(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = sorted(self._latencies)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+        checkouts = counters.pop("checkouts")
+        total = counters.pop("checkout_seconds_total")
+        slowest = counters.pop("checkout_seconds_max")
+        return {
+            "checkouts": checkouts,
+            **counters,
+            "checkout_ms_avg": round(total / checkouts * 1000, 3) if checkouts else 0.0,
+            "checkout_ms_p50": round(percentile(0.5) * 1000, 3),
+            "checkout_ms_p95": round(percentile(0.95) * 1000, 3),
+            "checkout_ms_max": round(slowest * 1000, 3),
+        }
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class _InstrumentedPool:
+    metrics = pool_metrics
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.record("timeouts")
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, self)
+        return connection
+
+    def _create_connection(self):
+        self.metrics.record("connects")
+        return super()._create_connection()
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedNullPool(_InstrumentedPool, NullPool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+
+class InstrumentedAsyncNullPool(_InstrumentedPool, NullPool):
+    metrics = async_pool_metrics
+
+
+def async_database_url(database_url: str) -> str:
+    """The DATABASE_URL rewritten for an asyncio driver (asyncpg, or aiosqlite for SQLite)."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return database_url
+
+
+def _pool_options(mode: str, queue_pool: type, null_pool: type) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "pool_pre_ping": True,
+        "pool_recycle": int(os.getenv("DATABASE_POOL_RECYCLE_SECONDS", "300")),
+    }
+    if mode == "null":
+        options["poolclass"] = null_pool
+        return options
+    options.update(
+        {
+            "poolclass": queue_pool,
+            "pool_size": max(1, int(os.getenv("DATABASE_POOL_SIZE", "2"))),
+            "max_overflow": max(0, int(os.getenv("DATABASE_MAX_OVERFLOW", "0"))),
+            "pool_timeout": float(os.getenv("DATABASE_POOL_TIMEOUT_SECONDS", "10")),
+            "pool_use_lifo": os.getenv("DATABASE_POOL_USE_LIFO", "1").strip().lower() not in {"0", "false", "no"},
+            "pool_reset_on_return": "rollback",
+        }
+    )
+    return options
+
+
+def engine_options(database_url: str, mode: str | None = None) -> Dict[str, Any]:
+    """create_engine() keyword arguments for the given (or configured) pool mode."""
+    options = _pool_options(mode or database_pool_mode(), InstrumentedQueuePool, InstrumentedNullPool)
+    connect_args: Dict[str, Any] = {}
+    # Supabase/Postgres deployments typically require SSL.
+    if database_url.startswith("postgresql"):
+        connect_args.update(
+            {
+                "sslmode": os.getenv("DATABASE_SSLMODE", "require"),
+                "connect_timeout": int(os.getenv("DATABASE_CONNECT_TIMEOUT_SECONDS", "10")),
+            }
+        )
+    if behind_transaction_pooler(database_url):
+        connect_args.update(prepared_statement_connect_args(database_url))
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def async_engine_options(database_url: str, mode: str | None = None) -> Dict[str, Any]:
+    """create_async_engine() keyword arguments; database_url is the sync DATABASE_URL."""
+    options = _pool_options(mode or database_pool_mode(), InstrumentedAsyncQueuePool, InstrumentedAsyncNullPool)
+    async_url = async_database_url(database_url)
+    connect_args: Dict[str, Any] = {}
+    if make_url(async_url).get_driver_name() == "asyncpg":
+        # asyncpg takes the libpq sslmode names through ``ssl`` and a plain ``timeout``.
+        connect_args.update(
+            {
+                "ssl": os.getenv("DATABASE_SSLMODE", "require"),
+                "timeout": int(os.getenv("DATABASE_CONNECT_TIMEOUT_SECONDS", "10")),
+            }
+        )
+        if behind_transaction_pooler(database_url):
+            connect_args.update(prepared_statement_connect_args(async_url))
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def database_pool_stats(engine) -> Dict[str, Any]:
+    pool = engine.pool
+    stats: Dict[str, Any] = {"mode": "queue" if isinstance(pool, QueuePool) else "null"}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+            }
+        )
+    stats.update(getattr(pool, "metrics", pool_metrics).snapshot())
+    return stats
@@ -0,0 +1,377 @@
+"""
+In-process background jobs for long-running simulation, report and plan work.
+
+Jobs are rows in ``background_jobs``; a small pool of worker threads pulls job
+ids from an in-memory queue, so no external broker is needed. Handlers report
+progress as ``SimulationLog`` entries, which are committed to the job row as
+they happen so clients can poll them. Cancellation is cooperative: queued jobs
+are cancelled immediately, running jobs stop at their next progress entry.
+Failed attempts are retried with exponential backoff unless the error is a
+client error.
+
+Several processes (uvicorn workers, instances during a rolling deploy) can
+share the table. A worker claims a job with a conditional QUEUED -> RUNNING
+update and only runs it if that update hit the row. While it runs, the
+owning process refreshes heartbeat_at every JOB_HEARTBEAT_SECONDS; on start,
+RUNNING jobs whose heartbeat is older than JOB_LEASE_SECONDS are requeued.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from fastapi import HTTPException
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from models import BackgroundJob
+from modules.simulation.schemas import SimulationLog
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = max(1, int(os.getenv("JOB_WORKERS", "2")))
+JOB_MAX_ATTEMPTS = max(1, int(os.getenv("JOB_MAX_ATTEMPTS", "2")))
+JOB_RETRY_BACKOFF_SECONDS = max(0.0, float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "5")))
+JOB_HEARTBEAT_SECONDS = max(1.0, float(os.getenv("JOB_HEARTBEAT_SECONDS", "30")))
+JOB_LEASE_SECONDS = max(JOB_HEARTBEAT_SECONDS * 2, float(os.getenv("JOB_LEASE_SECONDS", "300")))
+
+JobHandler = Callable[[Session, BackgroundJob, "JobContext"], Dict[str, Any]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+class JobCancelledError(Exception):
+    """Raised inside a handler when the job was cancelled while running."""
+
+
+def register_job_handler(job_type: str):
+    """Register the function that runs jobs of ``job_type``."""
+
+    def decorator(handler: JobHandler) -> JobHandler:
+        _handlers[job_type] = handler
+        return handler
+
+    return decorator
+
+
+def _default_session_factory() -> Session:
+    from database import SessionLocal
+
+    return SessionLocal()
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (JobCancelledError, ValueError)):
+        return False
+    if isinstance(exc, HTTPException):
+        return exc.status_code >= 500
+    return True
+
+
+def serialize_job(job: BackgroundJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "attempts": int(job.attempts or 0),
+        "max_attempts": int(job.max_attempts or 1),
+        "cancel_requested": bool(job.cancel_requested),
+        "progress": list(job.progress or []),
+        "result": job.result,
+        "error": job.error or "",
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+class JobContext:
+    """Progress and cancellation hooks handed to a running job handler."""
+
+    def __init__(self, job_queue: "JobQueue", job_id: str) -> None:
+        self._queue = job_queue
+        self.job_id = job_id
+        self._progress: List[Dict[str, Any]] = []
+
+    def report_progress(self, entry: SimulationLog) -> None:
+        self._progress.append(entry.model_dump(mode="json"))
+        if self._queue._write_progress(self.job_id, self._progress):
+            raise JobCancelledError("Job was cancelled.")
+
+    def log(self, role: str, message: str, *, phase: str, status: str = "done") -> None:
+        self.report_progress(
+            SimulationLog(
+                role=role,
+                message=message,
+                status=status,
+                phase=phase,
+                sequence=len(self._progress) + 1,
+                metadata={"timestamp": datetime.now(timezone.utc).isoformat()},
+            )
+        )
+
+    def check_cancelled(self) -> None:
+        if self._queue._cancel_requested(self.job_id):
+            raise JobCancelledError("Job was cancelled.")
+
+
+class JobQueue:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = _default_session_factory,
+        workers: int = JOB_WORKERS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_backoff_seconds: float = JOB_RETRY_BACKOFF_SECONDS,
+        heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.lease_seconds = lease_seconds
+        self._pending: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._timers: List[threading.Timer] = []
+        self._active: Set[str] = set()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self) -> None:
+        """Start the workers, requeueing jobs whose running process stopped heartbeating."""
+        with self._lock:
+            if self._running:
+                return
+        expired = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        lease = func.coalesce(BackgroundJob.heartbeat_at, BackgroundJob.started_at)
+        with self.session_factory() as db:
+            # Another live process may still be running RUNNING jobs; only take over expired leases.
+            db.query(BackgroundJob).filter(
+                BackgroundJob.status == "RUNNING", or_(lease.is_(None), lease < expired)
+            ).update({BackgroundJob.status: "QUEUED"}, synchronize_session=False)
+            db.commit()
+            queued = (
+                db.query(BackgroundJob.id)
+                .filter(BackgroundJob.status == "QUEUED")
+                .order_by(BackgroundJob.created_at)
+                .all()
+            )
+            for (job_id,) in queued:
+                self._pending.put(job_id)
+        with self._lock:
+            self._running = True
+            self._stopped.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{index + 1}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        self._threads.append(heartbeat)
+        heartbeat.start()
+        logger.info("Background job workers started (workers=%s)", self.workers)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            timers, self._timers = self._timers, []
+        self._stopped.set()
+        for timer in timers:
+            timer.cancel()
+        for _ in range(self.workers):
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def submit(self, job_type: str, payload: Dict[str, Any], *, owner_user_id: int) -> Dict[str, Any]:
+        if job_type not in _handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        with self.session_factory() as db:
+            job = BackgroundJob(
+                owner_user_id=owner_user_id,
+                job_type=job_type,
+                status="QUEUED",
+                payload=payload,
+                progress=[],
+                max_attempts=self.max_attempts,
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            serialized = serialize_job(job)
+        self._pending.put(serialized["job_id"])
+        return serialized
+
+    def cancel(self, db: Session, job: BackgroundJob) -> BackgroundJob:
+        if job.status == "QUEUED":
+            job.status = "CANCELLED"
+            job.finished_at = datetime.utcnow()
+        elif job.status == "RUNNING":
+            job.cancel_requested = True
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def _worker_loop(self) -> None:
+        while True:
+            job_id = self._pending.get()
+            try:
+                if job_id is None:
+                    return
+                self._run(job_id)
+            except Exception:
+                logger.exception("Background job %s crashed the worker loop", job_id)
+            finally:
+                self._pending.task_done()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stopped.wait(self.heartbeat_seconds):
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                continue
+            try:
+                with self.session_factory() as db:
+                    db.query(BackgroundJob).filter(
+                        BackgroundJob.id.in_(active), BackgroundJob.status == "RUNNING"
+                    ).update({BackgroundJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+                    db.commit()
+            except Exception:
+                logger.exception("Background job heartbeat failed")
+
+    def _claim(self, db: Session, job_id: str) -> bool:
+        """Move the job from QUEUED to RUNNING; False if another worker or process got it first."""
+        now = datetime.utcnow()
+        claimed = db.query(BackgroundJob).filter(
+            BackgroundJob.id == job_id, BackgroundJob.status == "QUEUED"
+        ).update(
+            {
+                BackgroundJob.status: "RUNNING",
+                BackgroundJob.attempts: BackgroundJob.attempts + 1,
+                BackgroundJob.started_at: now,
+                BackgroundJob.heartbeat_at: now,
+                BackgroundJob.progress: [],
+                BackgroundJob.error: "",
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        return claimed == 1
+
+    def _write_progress(self, job_id: str, progress: List[Dict[str, Any]]) -> bool:
+        with self.session_factory() as db:
+            job = db.get(BackgroundJob, job_id)
+            if job is None:
+                return True
+            job.progress = list(progress)
+            db.commit()
+            return bool(job.cancel_requested)
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        with self.session_factory() as db:
+            job = db.get(BackgroundJob, job_id)
+            return job is None or bool(job.cancel_requested)
+
+    def _finish(self, job_id: str, status: str, *, result: Optional[Dict[str, Any]] = None, error: str = "") -> None:
+        with self.session_factory() as db:
+            job = db.get(BackgroundJob, job_id)
+            if job is None:
+                return
+            job.status = status
+            job.result = result
+            job.error = error
+            if status != "QUEUED":
+                job.finished_at = datetime.utcnow()
+            db.commit()
+
+    def _schedule_retry(self, job_id: str, attempt: int) -> None:
+        delay = self.retry_backoff_seconds * (2 ** (attempt - 1))
+        with self._lock:
+            if not self._running:
+                return
+            if delay <= 0:
+                self._pending.put(job_id)
+                return
+            timer = threading.Timer(delay, self._pending.put, args=(job_id,))
+            timer.daemon = True
+            self._timers.append(timer)
+        timer.start()
+
+    def _run(self, job_id: str) -> None:
+        with self.session_factory() as db:
+            job = db.get(BackgroundJob, job_id)
+            if job is None or job.status != "QUEUED":
+                return
+            if job.cancel_requested:
+                job.status = "CANCELLED"
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                return
+            handler = _handlers.get(job.job_type)
+            if handler is None:
+                job.status = "FAILED"
+                job.error = f"No handler registered for job type {job.job_type}."
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                return
+            if not self._claim(db, job_id):
+                return
+            db.refresh(job)
+            attempt = int(job.attempts or 1)
+            max_attempts = int(job.max_attempts or 1)
+
+            with self._lock:
+                self._active.add(job_id)
+            context = JobContext(self, job_id)
+            try:
+                result = handler(db, job, context)
+            except JobCancelledError:
+                db.rollback()
+                self._finish(job_id, "CANCELLED", error="Cancelled by request.")
+                return
+            except Exception as exc:
+                db.rollback()
+                error = exc.detail if isinstance(exc, HTTPException) else str(exc)
+                if attempt < max_attempts and _is_retryable(exc):
+                    logger.warning("Background job %s attempt %s failed; retrying: %s", job_id, attempt, error)
+                    self._finish(job_id, "QUEUED", error=str(error))
+                    self._schedule_retry(job_id, attempt)
+                else:
+                    logger.warning("Background job %s failed after %s attempt(s): %s", job_id, attempt, error)
+                    self._finish(job_id, "FAILED", error=str(error))
+                return
+            finally:
+                with self._lock:
+                    self._active.discard(job_id)
+        self._finish(job_id, "SUCCEEDED", result=result)
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
+
+
+def start_job_workers() -> None:
+    get_job_queue().start()
+
+
+def stop_job_workers() -> None:
+    if _job_queue is not None:
+        _job_queue.stop()
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from auth import get_current_user, get_or_create_access_profile
+from database import get_db
+from job_queue import get_job_queue, serialize_job
+from models import BackgroundJob, User
+from schemas import BackgroundJobResponse
+
+job_router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+
+
+def _load_job(db: Session, current_user: User, job_id: str) -> BackgroundJob:
+    job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    profile = get_or_create_access_profile(db, current_user)
+    if profile.role.upper() != "ADMIN" and job.owner_user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="You do not have access to this job.")
+    return job
+
+
+@job_router.get("", response_model=list[BackgroundJobResponse])
+def list_jobs(
+    status: str | None = Query(default=None),
+    limit: int = Query(default=25, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    query = db.query(BackgroundJob).filter(BackgroundJob.owner_user_id == current_user.id)
+    if status:
+        query = query.filter(BackgroundJob.status == status.upper())
+    rows = query.order_by(BackgroundJob.created_at.desc()).limit(limit).all()
+    return [BackgroundJobResponse(**serialize_job(row)) for row in rows]
+
+
+@job_router.get("/{job_id}", response_model=BackgroundJobResponse)
+def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return BackgroundJobResponse(**serialize_job(_load_job(db, current_user, job_id)))
+
+
+@job_router.post("/{job_id}/cancel", response_model=BackgroundJobResponse)
+def cancel_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = _load_job(db, current_user, job_id)
+    if job.status not in {"QUEUED", "RUNNING"}:
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status.lower()}.")
+    return BackgroundJobResponse(**serialize_job(get_job_queue().cancel(db, job)))
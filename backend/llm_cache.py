@@ -0,0 +1,258 @@
+"""
+Deterministic cache for chat completion responses, with record/replay.
+
+Requests are keyed by sha256 over (model, temperature, messages,
+response_format), so an identical prompt, such as a rerun with unchanged
+inputs or a regenerated report for the same simulation, is answered without
+calling OpenAI. LLM_CACHE_MODE selects the behaviour:
+
+- off: always call the API
+- cache (default): in-memory LRU bounded by LLM_CACHE_MAX_ENTRIES, entries
+  expire after LLM_CACHE_TTL_SECONDS; with LLM_CACHE_DIR set, responses are
+  also kept on disk (same TTL) and survive restarts
+- record: always call the API and write every response to LLM_CACHE_DIR as a
+  reviewable JSON fixture
+- replay: answer only from LLM_CACHE_DIR fixtures, ignoring the TTL, and
+  raise LLMCacheMissError instead of touching the network
+
+Only usable responses are stored: completions that were cut off, empty
+content, and invalid JSON for a json_object response_format are never cached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_MODES = ("off", "cache", "record", "replay")
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "cache").strip().lower()
+LLM_CACHE_TTL_SECONDS = max(0.0, float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")))
+LLM_CACHE_MAX_ENTRIES = max(0, int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")))
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "").strip()
+
+
+class LLMCacheMissError(RuntimeError):
+    """Raised in replay mode when no fixture exists for a request."""
+
+
+def llm_cache_key(
+    model: str,
+    temperature: float | None,
+    messages: List[Dict[str, Any]],
+    response_format: Dict[str, Any] | None = None,
+) -> str:
+    request = {
+        "model": model,
+        "temperature": temperature,
+        "messages": messages,
+        "response_format": response_format,
+    }
+    encoded = json.dumps(request, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _usable(content: str, finish_reason: str | None, response_format: Dict[str, Any] | None) -> bool:
+    if not content or finish_reason not in (None, "stop"):
+        return False
+    if (response_format or {}).get("type") == "json_object":
+        try:
+            json.loads(content)
+        except ValueError:
+            return False
+    return True
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        mode: str = LLM_CACHE_MODE,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        directory: str = LLM_CACHE_DIR,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if mode not in LLM_CACHE_MODES:
+            raise ValueError(f"Unknown LLM_CACHE_MODE '{mode}'. Use one of {LLM_CACHE_MODES}.")
+        if mode in ("record", "replay") and not directory:
+            raise ValueError(f"LLM_CACHE_MODE={mode} needs LLM_CACHE_DIR for its fixtures.")
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0, "stores": 0}
+
+    @property
+    def offline(self) -> bool:
+        """True when requests are never sent to the API (no client needed)."""
+        return self.mode == "replay"
+
+    def _fixture_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _fresh(self, stored_at: float) -> bool:
+        return self.mode == "replay" or self._clock() - stored_at < self.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, content: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (stored_at, content)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        if self.mode in ("off", "record"):
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._fresh(entry[0]):
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._counters["expired"] += 1
+        fixture = self._read_fixture(key)
+        with self._lock:
+            if fixture is not None:
+                stored_at, content = fixture
+                if self._fresh(stored_at):
+                    self._remember(key, stored_at, content)
+                    self._counters["hits"] += 1
+                    self._counters["disk_hits"] += 1
+                    return content
+                self._counters["expired"] += 1
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, key: str, content: str, request: Dict[str, Any]) -> None:
+        if self.mode == "off":
+            return
+        stored_at = self._clock()
+        with self._lock:
+            self._remember(key, stored_at, content)
+            self._counters["stores"] += 1
+        if self.directory is not None:
+            self._write_fixture(key, stored_at, content, request)
+
+    def _read_fixture(self, key: str) -> Optional[tuple[float, str]]:
+        if self.directory is None:
+            return None
+        try:
+            data = json.loads(self._fixture_path(key).read_text(encoding="utf-8"))
+            return float(data["stored_at"]), str(data["content"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("LLM cache fixture %s is unreadable: %s", key, exc)
+            return None
+
+    def _write_fixture(self, key: str, stored_at: float, content: str, request: Dict[str, Any]) -> None:
+        fixture = {
+            "key": key,
+            "stored_at": stored_at,
+            "recorded_at": datetime.fromtimestamp(stored_at, timezone.utc).isoformat(),
+            "request": request,
+            "content": content,
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=self.directory, delete=False, encoding="utf-8") as handle:
+                json.dump(fixture, handle, indent=2, ensure_ascii=False)
+                temp_name = handle.name
+            os.replace(temp_name, self._fixture_path(key))
+        except OSError as exc:
+            logger.warning("LLM cache fixture write failed for %s: %s", key, exc)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "mode": self.mode,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self.directory is not None,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+_shared_cache: LLMResponseCache | None = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Return the process-wide cache configured from LLM_CACHE_* settings."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMResponseCache()
+        return _shared_cache
+
+
+def llm_cache_offline() -> bool:
+    return get_llm_cache().offline
+
+
+def cached_chat_completion(
+    client: Any,
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float | None = None,
+    response_format: Dict[str, Any] | None = None,
+) -> str:
+    """
+    Return the message content of a chat completion, served from the cache
+    when an identical request was answered before.
+
+    client may be None in replay mode; otherwise a missing client raises the
+    same RuntimeError callers used to raise themselves.
+    """
+    cache = get_llm_cache()
+    key = llm_cache_key(model, temperature, messages, response_format)
+    content = cache.get(key)
+    if content is not None:
+        return content
+    if cache.offline:
+        raise LLMCacheMissError(f"No recorded LLM response for request {key[:12]} (LLM_CACHE_MODE=replay).")
+    if client is None:
+        raise RuntimeError("OpenAI client not initialized. Check OPENAI_API_KEY.")
+
+    request: Dict[str, Any] = {"model": model, "messages": messages}
+    if temperature is not None:
+        request["temperature"] = temperature
+    if response_format is not None:
+        request["response_format"] = response_format
+    response = client.chat.completions.create(**request)
+    choice = response.choices[0]
+    content = (choice.message.content or "").strip()
+    if _usable(content, getattr(choice, "finish_reason", None), response_format):
+        cache.put(key, content, request)
+    return content
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    return get_llm_cache().stats()
@@ -11,11 +11,21 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.exc import OperationalError
 
 from agent_routes import agent_router
-from database import check_database_health, create_tables
+from database import check_database_health, create_tables, database_pool_stats, dispose_async_engine
+from job_queue import start_job_workers, stop_job_workers
+from job_routes import job_router
+from llm_cache import llm_cache_stats
 from modules.management.routes import management_router
+from modules.simulation.reporting.browser_pool import shutdown_browser_pool
+from modules.simulation.reporting.export_cache import report_export_cache_stats
 from modules.simulation.routes import simulation_router
+from modules.simulation.streaming import shutdown_simulation_streams
 from platform_routes import platform_router
 from platform_service import ensure_report_renderer_ready, get_report_renderer_health
+from principal_cache import principal_cache_stats
+from rag.connection_pool import pool_stats
+from rag.embedding_cache import embedding_cache_stats
+from rag.extraction_pool import extraction_pool_stats, shutdown_extraction_pool
 from routes import rag_router
 from routes import router as auth_router
 
@@ -64,7 +74,16 @@ async def lifespan(app: FastAPI):
     except Exception:
         logger.exception("Report renderer readiness check failed with strict mode enabled.")
         raise
+    try:
+        start_job_workers()
+    except OperationalError as exc:
+        logger.warning("Background job workers were not started because the database was unavailable: %s", exc)
     yield
+    stop_job_workers()
+    await dispose_async_engine()
+    shutdown_simulation_streams()
+    shutdown_browser_pool()
+    shutdown_extraction_pool()
 
 
 app = FastAPI(
@@ -80,7 +99,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition"],
+    expose_headers=["Content-Disposition", "X-Next-Cursor"],
 )
 
 app.include_router(auth_router)
@@ -89,6 +108,7 @@ app.include_router(simulation_router)
 app.include_router(management_router)
 app.include_router(agent_router)
 app.include_router(platform_router)
+app.include_router(job_router)
 
 
 @app.exception_handler(OperationalError)
@@ -134,6 +154,13 @@ def health_check(response: Response):
             "html_renderer_ready": renderer["html_renderer_ready"],
             "pdf_renderer_ready": renderer["pdf_renderer_ready"],
         },
+        "database_pool": database_pool_stats(),
+        "rag_database_pool": pool_stats(),
+        "embedding_cache": embedding_cache_stats(),
+        "llm_cache": llm_cache_stats(),
+        "principal_cache": principal_cache_stats(),
+        "report_export_cache": report_export_cache_stats(),
+        "document_extraction": extraction_pool_stats(),
     }
 
 
@@ -1,12 +1,41 @@
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, JSON, String, Text, UniqueConstraint
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.orm import declarative_base, relationship, validates
 from datetime import datetime
 
 Base = declarative_base()
 
 
+def _newest_first_indexes(table: str, owner_column: str) -> tuple:
+    """
+    (owner, created_at, id) indexes in pagination.newest_first() order. Postgres
+    needs NULLS LAST spelled out to scan it in order; SQLite cannot declare it
+    but already sorts NULLs last when scanning a plain index backwards.
+    """
+    return (
+        Index(f"ix_{table}_owner_created_id", owner_column, "created_at", "id").ddl_if(
+            callable_=lambda ddl, target, bind, **kw: kw["dialect"].name != "postgresql"
+        ),
+        Index(
+            f"ix_{table}_owner_newest", owner_column, text("created_at DESC NULLS LAST"), text("id DESC")
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -44,6 +73,10 @@ class UserAccessProfile(Base):
 
 class SimulationRun(Base):
     __tablename__ = "simulation_runs"
+    __table_args__ = (
+        # Keyset pagination of a founder's runs, newest first.
+        *_newest_first_indexes("simulation_runs", "owner_email"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     owner_email = Column(String(255), nullable=True, index=True)
@@ -215,8 +248,24 @@ class NotificationReadReceipt(Base):
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
 
+class RenderedArtifact(Base):
+    __tablename__ = "rendered_artifacts"
+
+    id = Column(String(64), primary_key=True)  # sha256 of the uncompressed content
+    content_type = Column(String(64), nullable=False, default="text/html")
+    encoding = Column(String(16), nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    stored_bytes = Column(Integer, nullable=False, default=0)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
 class BusinessInsightReport(Base):
     __tablename__ = "business_insight_reports"
+    __table_args__ = (
+        # Keyset pagination of an owner's reports, newest first.
+        *_newest_first_indexes("business_insight_reports", "owner_user_id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     owner_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -240,12 +289,27 @@ class BusinessInsightReport(Base):
     sections = Column(JSON, nullable=False, default=list)
     key_findings = Column(JSON, nullable=False, default=list)
     recommended_actions = Column(JSON, nullable=False, default=list)
-    export_html = Column(Text, nullable=False, default="")
+    # Kept in step with the JSON lists so listings never have to load them.
+    sections_count = Column(Integer, nullable=False, default=0)
+    key_findings_count = Column(Integer, nullable=False, default=0)
+    recommended_actions_count = Column(Integer, nullable=False, default=0)
+    # Rendered HTML lives in rendered_artifacts; see reporting/artifact_store.py.
+    export_artifact_id = Column(
+        String(64),
+        ForeignKey("rendered_artifacts.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
     published_version_id = Column(String(36), nullable=True, index=True)
     latest_draft_version_id = Column(String(36), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @validates("sections", "key_findings", "recommended_actions")
+    def _count_items(self, key, value):
+        setattr(self, f"{key}_count", len(value) if isinstance(value, list) else 0)
+        return value
+
 
 class BusinessInsightReportVersion(Base):
     __tablename__ = "business_insight_report_versions"
@@ -294,3 +358,25 @@ class CalendarEvent(Base):
     ends_at = Column(DateTime, nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    owner_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    job_type = Column(String(64), nullable=False, index=True)
+    status = Column(String(16), nullable=False, default="QUEUED", index=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    progress = Column(JSON, nullable=False, default=list)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=False, default="")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=1)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    started_at = Column(DateTime, nullable=True)
+    # Refreshed by the process running the job; a stale one means that process is gone.
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -6,7 +6,8 @@ import tempfile
 from typing import Dict, List, Tuple
 
 import openai
-import pdfplumber
+
+from rag.extraction_pool import extract_pdf_pages
 
 
 ALLOWED_CV_EXTENSIONS = {".pdf", ".doc", ".docx", ".txt", ".md", ".csv", ".json", ".log", ".rtf"}
@@ -18,13 +19,8 @@ def get_extension(file_name: str) -> str:
     return os.path.splitext(str(file_name or "").lower())[1]
 
 
-def _extract_text_pdf(file_path: str) -> str:
-    parts: List[str] = []
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            value = page.extract_text() or ""
-            if value.strip():
-                parts.append(value)
+def _extract_text_pdf(file_path: str, max_pages: int | None = None) -> str:
+    parts: List[str] = [page for page in extract_pdf_pages(file_path, max_pages=max_pages) if page.strip()]
     return "\n".join(parts)
 
 
@@ -46,7 +42,7 @@ def _extract_text_plain(file_path: str) -> str:
         return handle.read()
 
 
-def extract_cv_text(file_name: str, raw_bytes: bytes) -> Tuple[str, str]:
+def extract_cv_text(file_name: str, raw_bytes: bytes, max_pages: int | None = None) -> Tuple[str, str]:
     extension = get_extension(file_name)
     if extension not in ALLOWED_CV_EXTENSIONS:
         allowed = ", ".join(sorted(ALLOWED_CV_EXTENSIONS))
@@ -58,7 +54,7 @@ def extract_cv_text(file_name: str, raw_bytes: bytes) -> Tuple[str, str]:
 
     try:
         if extension == ".pdf":
-            text = _extract_text_pdf(temp_path)
+            text = _extract_text_pdf(temp_path, max_pages=max_pages)
         elif extension == ".docx":
             text = _extract_text_docx(temp_path)
         elif extension == ".doc":
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
@@ -5,7 +6,9 @@ from sqlalchemy.orm import Session
 
 from auth import get_current_user, get_or_create_access_profile
 from database import get_db
+from job_queue import JobContext, get_job_queue, register_job_handler
 from models import (
+    BackgroundJob,
     ManagementActivityMonitor,
     ManagementAgentMemory,
     ManagementPlanRun,
@@ -29,6 +32,8 @@ from .schemas import (
 )
 from .cv_parser import extract_cv_text, parse_cv_profile
 from platform_service import create_notification
+from rag.extraction_pool import ExtractionQueueFullError, ExtractionTimeoutError, get_extraction_pool
+from schemas import BackgroundJobResponse
 from .service import (
     build_agent_memory_context,
     compute_monitor_signal_score,
@@ -112,12 +117,23 @@ async def parse_management_cv(file: UploadFile = File(...)):
     if len(content) > 10 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="CV file exceeds 10MB limit.")
 
+    extraction_pool = get_extraction_pool()
     try:
-        text, _ = extract_cv_text(file_name, content)
-        profile = parse_cv_profile(file_name=file_name, text=text)
+        text, _ = await extraction_pool.run(
+            extract_cv_text,
+            file_name,
+            content,
+            max_pages=extraction_pool.max_pages,
+        )
+        # parse_cv_profile may call the LLM; that is I/O, so a thread is enough.
+        profile = await asyncio.to_thread(parse_cv_profile, file_name=file_name, text=text)
         return ManagementCvParseResponse(**profile)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
+    except ExtractionQueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except ExtractionTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
     except Exception:
         raise HTTPException(status_code=500, detail="Unable to parse CV file.")
 
@@ -402,6 +418,50 @@ def generate_workspace_plan(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    return _generate_workspace_plan(db, current_user, workspace_id, payload)
+
+
+@management_router.post(
+    "/workspaces/{workspace_id}/plan/jobs",
+    response_model=BackgroundJobResponse,
+    status_code=202,
+)
+def submit_workspace_plan_job(
+    workspace_id: str,
+    payload: ManagementActivityPlanRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    row = db.query(ManagementWorkspace).filter(ManagementWorkspace.id == workspace_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Management workspace not found.")
+    _ensure_workspace_access(db, current_user, row)
+    job = get_job_queue().submit(
+        "management.plan",
+        {"workspace_id": workspace_id, "request": payload.model_dump(mode="json")},
+        owner_user_id=current_user.id,
+    )
+    return BackgroundJobResponse(**job)
+
+
+@register_job_handler("management.plan")
+def _run_workspace_plan_job(db: Session, job: BackgroundJob, context: JobContext) -> dict:
+    current_user = db.query(User).filter(User.id == job.owner_user_id).first()
+    if current_user is None:
+        raise ValueError("Job owner no longer exists.")
+    payload = ManagementActivityPlanRequest.model_validate(job.payload["request"])
+    return _generate_workspace_plan(db, current_user, job.payload["workspace_id"], payload, context).model_dump(
+        mode="json"
+    )
+
+
+def _generate_workspace_plan(
+    db: Session,
+    current_user: User,
+    workspace_id: str,
+    payload: ManagementActivityPlanRequest,
+    context: JobContext | None = None,
+) -> ManagementActivityPlanResponse:
     row = db.query(ManagementWorkspace).filter(ManagementWorkspace.id == workspace_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Management workspace not found.")
@@ -416,6 +476,8 @@ def generate_workspace_plan(
     )
     memory_context = build_agent_memory_context(memory_rows)
 
+    if context is not None:
+        context.log("PLANNING AGENT", f"Planning toward: {payload.objective[:120]}", phase="planning", status="running")
     plan = generate_management_plan(
         workspace=row,
         objective=payload.objective,
@@ -461,6 +523,8 @@ def generate_workspace_plan(
     )
     db.commit()
     db.refresh(plan_run)
+    if context is not None:
+        context.log("PLANNING AGENT", "Activity plan saved.", phase="complete")
     return ManagementActivityPlanResponse(**serialize_plan_run(plan_run))
 
 
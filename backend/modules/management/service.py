@@ -7,6 +7,7 @@ from typing import Any, Dict, List
 
 import openai
 
+from llm_cache import cached_chat_completion, llm_cache_offline
 from models import ManagementActivityMonitor, ManagementAgentMemory, ManagementPlanRun, ManagementWorkspace
 from .schemas import PlannedActivity
 
@@ -227,7 +228,7 @@ def _invoke_plan_llm(
     workspace: ManagementWorkspace,
     memory_context: str = "",
 ) -> Dict[str, Any]:
-    if client is None:
+    if client is None and not llm_cache_offline():
         raise RuntimeError("OpenAI client not initialized. Check OPENAI_API_KEY.")
 
     system_prompt = (
@@ -242,7 +243,8 @@ def _invoke_plan_llm(
         f"Workspace context:\n{build_workspace_prompt_context(workspace)}\n\n"
         f"Persistent management memory:\n{memory_context or 'No memory context available.'}"
     )
-    response = client.chat.completions.create(
+    raw = cached_chat_completion(
+        client,
         model=os.getenv("SIMULATION_MODEL", "gpt-4o-mini"),
         temperature=0.2,
         response_format={"type": "json_object"},
@@ -251,7 +253,6 @@ def _invoke_plan_llm(
             {"role": "user", "content": user_prompt},
         ],
     )
-    raw = (response.choices[0].message.content or "").strip()
     parsed = json.loads(raw) if raw else {}
     if not isinstance(parsed, dict):
         parsed = {}
@@ -0,0 +1,200 @@
+"""
+Content-addressed, compressed storage for rendered report artifacts.
+
+Rendered HTML, with its inline SVG data-URI charts, used to live in
+business_insight_reports.export_html, so every report row carried it. It
+now lives in rendered_artifacts:
+
+- each artifact is keyed by the sha256 of its content, so identical
+  renders (a republish of unchanged content, say) are stored once
+- content is compressed with zstd when the ``zstandard`` package is
+  installed, otherwise gzip; REPORT_ARTIFACT_COMPRESSION forces one
+- report rows point at their artifact through export_artifact_id, and an
+  artifact is deleted once no report references it
+
+Existing export_html values are copied over by move_legacy_export_html in
+small committed batches. The column itself stays until
+drop_legacy_export_html removes it, which only happens once every non-empty
+export_html has an artifact, so the previous release can still be rolled
+back to until then.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import BusinessInsightReport, RenderedArtifact
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_ENCODINGS = ("zstd", "gzip")
+REPORT_ARTIFACT_ZSTD_LEVEL = int(os.getenv("REPORT_ARTIFACT_ZSTD_LEVEL", "10"))
+REPORT_ARTIFACT_GZIP_LEVEL = int(os.getenv("REPORT_ARTIFACT_GZIP_LEVEL", "6"))
+REPORT_ARTIFACT_MIGRATION_BATCH_SIZE = max(1, int(os.getenv("REPORT_ARTIFACT_MIGRATION_BATCH_SIZE", "50")))
+
+_UNMOVED_EXPORT_HTML = (
+    "FROM business_insight_reports "
+    "WHERE export_artifact_id IS NULL AND export_html IS NOT NULL AND export_html <> ''"
+)
+
+
+def artifact_encoding() -> str:
+    configured = os.getenv("REPORT_ARTIFACT_COMPRESSION", "").strip().lower()
+    if configured == "gzip" or (not configured and not ZSTD_AVAILABLE):
+        return "gzip"
+    if configured not in ("", "zstd"):
+        raise ValueError(f"Unknown REPORT_ARTIFACT_COMPRESSION '{configured}'. Use one of {ARTIFACT_ENCODINGS}.")
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("REPORT_ARTIFACT_COMPRESSION=zstd needs the zstandard package.")
+    return "zstd"
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=REPORT_ARTIFACT_ZSTD_LEVEL).compress(data)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=REPORT_ARTIFACT_GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unknown artifact encoding '{encoding}'.")
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Artifact is zstd-compressed but the zstandard package is not installed.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    raise ValueError(f"Unknown artifact encoding '{encoding}'.")
+
+
+def artifact_values(content: str, content_type: str = "text/html") -> Dict[str, Any]:
+    """Column values of the rendered_artifacts row for ``content``."""
+    raw = content.encode("utf-8")
+    encoding = artifact_encoding()
+    data = compress(raw, encoding)
+    return {
+        "id": hashlib.sha256(raw).hexdigest(),
+        "content_type": content_type,
+        "encoding": encoding,
+        "size_bytes": len(raw),
+        "stored_bytes": len(data),
+        "data": data,
+    }
+
+
+def store_artifact(db: Session, content: str, content_type: str = "text/html") -> RenderedArtifact:
+    values = artifact_values(content, content_type)
+    existing = db.get(RenderedArtifact, values["id"])
+    if existing is not None:
+        return existing
+    artifact = RenderedArtifact(**values)
+    try:
+        with db.begin_nested():
+            db.add(artifact)
+    except IntegrityError:
+        # Stored concurrently by another request with the same content.
+        return db.get(RenderedArtifact, values["id"])
+    return artifact
+
+
+def load_artifact_text(db: Session, artifact_id: Optional[str]) -> Optional[str]:
+    if not artifact_id:
+        return None
+    artifact = db.get(RenderedArtifact, artifact_id)
+    if artifact is None:
+        return None
+    return decompress(artifact.data, artifact.encoding).decode("utf-8")
+
+
+def release_artifact(db: Session, artifact_id: Optional[str]) -> None:
+    """Delete the artifact unless a report still references it. Call after the reference is gone (flushed)."""
+    if not artifact_id:
+        return
+    still_used = db.execute(
+        select(BusinessInsightReport.id).where(BusinessInsightReport.export_artifact_id == artifact_id).limit(1)
+    ).first()
+    if still_used is None:
+        artifact = db.get(RenderedArtifact, artifact_id)
+        if artifact is not None:
+            db.delete(artifact)
+
+
+def set_report_export_html(db: Session, report: BusinessInsightReport, html: str) -> None:
+    """Point ``report`` at the artifact for ``html``, dropping its previous artifact if now unused."""
+    previous = report.export_artifact_id
+    artifact = store_artifact(db, html)
+    report.export_artifact_id = artifact.id
+    if previous and previous != artifact.id:
+        db.flush()
+        release_artifact(db, previous)
+
+
+def report_export_html(db: Session, report: BusinessInsightReport) -> str:
+    return load_artifact_text(db, report.export_artifact_id) or ""
+
+
+def move_legacy_export_html(engine: Engine, batch_size: int = REPORT_ARTIFACT_MIGRATION_BATCH_SIZE) -> int:
+    """
+    Copy business_insight_reports.export_html into rendered_artifacts, committing
+    every batch_size reports so no long transaction holds the report rows.
+    Returns the number of reports moved; safe to rerun.
+    """
+    artifacts = RenderedArtifact.__table__
+    moved = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(f"SELECT id, export_html {_UNMOVED_EXPORT_HTML} ORDER BY id LIMIT :limit"), {"limit": batch_size}
+            ).all()
+            for report_id, html in rows:
+                values = artifact_values(html)
+                if conn.execute(select(artifacts.c.id).where(artifacts.c.id == values["id"])).first() is None:
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(artifacts.insert().values(**values))
+                    except IntegrityError:
+                        # Stored concurrently by another instance running the migration.
+                        pass
+                conn.execute(
+                    text(
+                        "UPDATE business_insight_reports SET export_artifact_id = :artifact_id "
+                        "WHERE id = :id AND export_artifact_id IS NULL"
+                    ),
+                    {"artifact_id": values["id"], "id": report_id},
+                )
+        moved += len(rows)
+        if len(rows) < batch_size:
+            return moved
+
+
+def drop_legacy_export_html(engine: Engine) -> bool:
+    """
+    Drop business_insight_reports.export_html if every non-empty value has been
+    moved to an artifact. Returns False, leaving the column, if any has not.
+    """
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Keep writers of the previous release out between the check and the drop.
+            conn.execute(text("LOCK TABLE business_insight_reports IN ACCESS EXCLUSIVE MODE"))
+        remaining = conn.execute(text(f"SELECT COUNT(*) {_UNMOVED_EXPORT_HTML}")).scalar()
+        if remaining:
+            logger.warning("Keeping business_insight_reports.export_html: %s reports not moved to artifacts yet", remaining)
+            return False
+        conn.execute(text("ALTER TABLE business_insight_reports DROP COLUMN export_html"))
+    return True
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+try:
+    from playwright.sync_api import sync_playwright
+except Exception as exc:
+    sync_playwright = None
+    PLAYWRIGHT_IMPORT_ERROR = exc
+else:
+    PLAYWRIGHT_IMPORT_ERROR = None
+
+
+logger = logging.getLogger(__name__)
+
+CHROMIUM_LAUNCH_ARGS = ["--no-sandbox", "--disable-setuid-sandbox", "--disable-dev-shm-usage"]
+
+
+class ChromiumBrowserPool:
+    """Keep a few warm Chromium browsers for HTML-to-PDF rendering.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    browser lives on its own worker thread and renders are queued to the
+    workers. The worker count is the concurrency limit: parallel exports wait
+    in the queue instead of launching more Chromium processes. Each render
+    gets a fresh browser context, browsers are recycled after
+    ``max_renders_per_browser`` renders, and a crashed browser is relaunched
+    and the render retried once.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        max_renders_per_browser: int = 100,
+        render_timeout_seconds: float = 60.0,
+        launch_args: list[str] | None = None,
+        preflight: Callable[[], None] | None = None,
+    ) -> None:
+        self.size = max(1, size)
+        self.max_renders_per_browser = max(1, max_renders_per_browser)
+        self.render_timeout_seconds = render_timeout_seconds
+        self.launch_args = list(launch_args or CHROMIUM_LAUNCH_ARGS)
+        self.preflight = preflight
+        self._jobs: queue.Queue = queue.Queue()
+        self._workers: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"renders": 0, "launches": 0, "recycles": 0, "crashes": 0, "failures": 0}
+
+    def render_pdf(self, html: str, pdf_options: dict[str, Any]) -> bytes:
+        if sync_playwright is None:
+            message = "Playwright is required to generate PDF reports with Chromium."
+            if PLAYWRIGHT_IMPORT_ERROR is not None:
+                message = f"{message} Import error: {PLAYWRIGHT_IMPORT_ERROR}"
+            raise RuntimeError(message)
+        self._ensure_workers()
+        future: Future = Future()
+        self._jobs.put((html, pdf_options, future))
+        try:
+            return future.result(timeout=self.render_timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            raise RuntimeError(f"PDF render did not finish within {self.render_timeout_seconds:.0f}s.")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._jobs.put(None)
+        for worker in workers:
+            worker.join(timeout=10)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "browsers": len(self._workers),
+                "queued": self._jobs.qsize(),
+                "max_renders_per_browser": self.max_renders_per_browser,
+            }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _ensure_workers(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The Chromium browser pool has been shut down.")
+            while len(self._workers) < self.size:
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"report-chromium-{len(self._workers) + 1}",
+                    daemon=True,
+                )
+                self._workers.append(worker)
+                worker.start()
+
+    def _launch(self) -> tuple[Any, Any]:
+        if self.preflight is not None:
+            self.preflight()
+        playwright = sync_playwright().start()
+        try:
+            browser = playwright.chromium.launch(args=self.launch_args)
+        except Exception:
+            playwright.stop()
+            raise
+        self._count("launches")
+        return playwright, browser
+
+    def _close(self, playwright: Any, browser: Any) -> None:
+        for action in (getattr(browser, "close", None), getattr(playwright, "stop", None)):
+            if action is None:
+                continue
+            try:
+                action()
+            except Exception:
+                logger.debug("Ignoring error while closing Chromium.", exc_info=True)
+
+    def _render(self, browser: Any, html: str, pdf_options: dict[str, Any]) -> bytes:
+        context = browser.new_context()
+        try:
+            page = context.new_page()
+            page.set_content(html, wait_until="networkidle")
+            page.emulate_media(media="print")
+            return page.pdf(**pdf_options)
+        finally:
+            try:
+                context.close()
+            except Exception:
+                logger.debug("Ignoring error while closing a browser context.", exc_info=True)
+
+    def _worker_loop(self) -> None:
+        playwright = browser = None
+        renders = 0
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            html, pdf_options, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            attempts = 0
+            while True:
+                attempts += 1
+                try:
+                    if browser is None:
+                        playwright, browser = self._launch()
+                        renders = 0
+                    pdf_bytes = self._render(browser, html, pdf_options)
+                except Exception as exc:
+                    crashed = browser is not None and not browser.is_connected()
+                    if browser is None or crashed:
+                        if crashed:
+                            self._count("crashes")
+                            logger.warning("Chromium disconnected during render; relaunching. reason=%s", exc)
+                        self._close(playwright, browser)
+                        playwright = browser = None
+                        if crashed and attempts < 2:
+                            continue
+                    self._count("failures")
+                    future.set_exception(exc)
+                    break
+                renders += 1
+                self._count("renders")
+                future.set_result(pdf_bytes)
+                break
+            if browser is not None and renders >= self.max_renders_per_browser:
+                self._count("recycles")
+                self._close(playwright, browser)
+                playwright = browser = None
+        self._close(playwright, browser)
+
+
+_shared_pool: ChromiumBrowserPool | None = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_browser_pool(preflight: Callable[[], None] | None = None) -> ChromiumBrowserPool:
+    """Return the process-wide browser pool configured from REPORT_BROWSER_* settings."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            _shared_pool = ChromiumBrowserPool(
+                size=int(os.getenv("REPORT_BROWSER_POOL_SIZE", "1")),
+                max_renders_per_browser=int(os.getenv("REPORT_BROWSER_MAX_RENDERS", "100")),
+                render_timeout_seconds=float(os.getenv("REPORT_BROWSER_RENDER_TIMEOUT_SECONDS", "60")),
+                preflight=preflight,
+            )
+        return _shared_pool
+
+
+def shutdown_browser_pool() -> None:
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def browser_pool_stats() -> dict[str, Any]:
+    pool = _shared_pool
+    if pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **pool.stats()}
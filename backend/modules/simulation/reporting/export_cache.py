@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when template or renderer changes alter the bytes produced for the same document.
+REPORT_RENDERER_VERSION = os.getenv("REPORT_RENDERER_VERSION", "1").strip() or "1"
+
+
+def build_export_cache_key(
+    *,
+    content_hash: str,
+    template_id: str,
+    quality: str,
+    export_format: str,
+    renderer_version: str,
+    context: str = "",
+) -> str:
+    """Fingerprint one rendered artifact.
+
+    ``context`` covers inputs that live outside the document itself, such as the
+    simulation and workspace the report header is built from.
+    """
+    parts = [content_hash, template_id, quality, export_format, renderer_version, context]
+    return hashlib.sha256("\x1f".join(str(part or "") for part in parts).encode("utf-8")).hexdigest()
+
+
+class ReportExportCache:
+    """Content-addressed cache for rendered report HTML and PDF bytes.
+
+    Entries live in an in-memory LRU bounded by ``max_bytes`` and, when
+    ``directory`` is set, in a blob directory that survives restarts. Keys are
+    content hashes, so entries never go stale and are never invalidated; they
+    only age out of memory.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, directory: str = "") -> None:
+        self.max_bytes = max(0, max_bytes)
+        self.directory = Path(directory) if directory else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "stores": 0}
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as exc:
+                logger.error("Report export disk cache unavailable at %s: %s", self.directory, exc)
+                self.directory = None
+
+    def _blob_path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _remember(self, key: str, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = content
+        self._size += len(content)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self._counters["evictions"] += 1
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return content
+        if self.directory is not None:
+            try:
+                content = self._blob_path(key).read_bytes()
+            except FileNotFoundError:
+                content = None
+            except OSError as exc:
+                logger.warning("Report export disk cache read failed for %s: %s", key, exc)
+                content = None
+            if content is not None:
+                with self._lock:
+                    self._remember(key, content)
+                    self._counters["hits"] += 1
+                    self._counters["disk_hits"] += 1
+                return content
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, key: str, content: bytes) -> None:
+        with self._lock:
+            self._remember(key, content)
+            self._counters["stores"] += 1
+        if self.directory is None:
+            return
+        path = self._blob_path(key)
+        if path.exists():
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as handle:
+                handle.write(content)
+                temp_name = handle.name
+            os.replace(temp_name, path)
+        except OSError as exc:
+            logger.warning("Report export disk cache write failed for %s: %s", key, exc)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "persistent": self.directory is not None,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+_shared_cache: ReportExportCache | None = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_report_export_cache() -> ReportExportCache:
+    """Return the process-wide export cache configured from REPORT_EXPORT_CACHE_* settings."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ReportExportCache(
+                max_bytes=int(os.getenv("REPORT_EXPORT_CACHE_MAX_MB", "64")) * 1024 * 1024,
+                directory=os.getenv("REPORT_EXPORT_CACHE_DIR", "").strip(),
+            )
+        return _shared_cache
+
+
+def report_export_cache_stats() -> dict[str, Any]:
+    return get_report_export_cache().stats()
@@ -5,7 +5,6 @@ import logging
 import os
 import re
 import sys
-import tempfile
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
@@ -41,13 +40,7 @@ except Exception as exc:
 else:
     WEASYPRINT_IMPORT_ERROR = None
 
-try:
-    from playwright.sync_api import sync_playwright
-except Exception as exc:
-    sync_playwright = None
-    PLAYWRIGHT_IMPORT_ERROR = exc
-else:
-    PLAYWRIGHT_IMPORT_ERROR = None
+from .browser_pool import PLAYWRIGHT_IMPORT_ERROR, get_browser_pool, sync_playwright
 
 
 class StartupSimulationReportGenerator:
@@ -447,7 +440,6 @@ class StartupSimulationReportGenerator:
                 message = f"{message} Import error: {PLAYWRIGHT_IMPORT_ERROR}"
             raise RuntimeError(message)
 
-        temp_path: Path | None = None
         try:
             # On Windows, Playwright needs an asyncio policy that supports subprocess.
             if sys.platform.startswith("win"):
@@ -460,26 +452,16 @@ class StartupSimulationReportGenerator:
                 ):
                     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-            self._assert_asyncio_subprocess_supported_for_playwright()
-
-            with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False, encoding="utf-8") as handle:
-                handle.write(html)
-                temp_path = Path(handle.name)
-
-            with sync_playwright() as playwright:
-                browser = playwright.chromium.launch(
-                    args=["--no-sandbox", "--disable-setuid-sandbox", "--disable-dev-shm-usage"]
-                )
-                page = browser.new_page()
-                page.goto(temp_path.resolve().as_uri(), wait_until="networkidle")
-                page.emulate_media(media="print")
-                pdf_bytes = page.pdf(
-                    format=self.default_page_size,
-                    print_background=True,
-                    prefer_css_page_size=True,
-                )
-                browser.close()
-                return pdf_bytes
+            # Browsers stay warm between exports; the preflight runs once per launch.
+            browser_pool = get_browser_pool(preflight=self._assert_asyncio_subprocess_supported_for_playwright)
+            return browser_pool.render_pdf(
+                html,
+                {
+                    "format": self.default_page_size,
+                    "print_background": True,
+                    "prefer_css_page_size": True,
+                },
+            )
         except NotImplementedError as exc:
             raise RuntimeError(
                 "Playwright PDF rendering is unavailable in this runtime loop configuration. "
@@ -488,9 +470,6 @@ class StartupSimulationReportGenerator:
             ) from exc
         except Exception as exc:
             raise RuntimeError(f"Playwright PDF rendering failed: {exc}")
-        finally:
-            if temp_path is not None and temp_path.exists():
-                temp_path.unlink(missing_ok=True)
 
     def _assert_asyncio_subprocess_supported_for_playwright(self) -> None:
         async def _probe() -> int:
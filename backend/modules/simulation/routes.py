@@ -1,17 +1,34 @@
+import asyncio
 import re
+from typing import Callable
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from auth import get_current_user, get_or_create_access_profile
-from database import get_db
-from models import SimulationRun, User
+from auth import (
+    get_current_user,
+    get_current_user_async,
+    get_or_create_access_profile,
+    get_or_create_access_profile_async,
+)
+from database import SessionLocal, get_async_db, get_db
+from job_queue import JobContext, get_job_queue, register_job_handler
+from models import BackgroundJob, BusinessInsightReport, SimulationRun, User
 from modules.management.cv_parser import extract_cv_text
+from pagination import after_cursor, newest_first, next_cursor
+from .reporting.artifact_store import release_artifact
 from platform_service import create_notification
+from rag.extraction_pool import ExtractionQueueFullError, ExtractionTimeoutError, get_extraction_pool
+from schemas import BackgroundJobResponse
 from .schemas import (
+    AgentFeedback,
     SimulationIntakeFileResponse,
     SimulationIntakeTurnRequest,
     SimulationIntakeTurnResponse,
+    SimulationLog,
     SimulationRerunRequest,
     SimulationRunDetail,
     SimulationRunRequest,
@@ -19,6 +36,7 @@ from .schemas import (
     SimulationRunSummary,
 )
 from .service import run_intake_turn, run_simulation
+from .streaming import SimulationEventStream
 
 simulation_router = APIRouter(prefix="/api/v1/simulations", tags=["simulations"])
 MAX_SIMULATION_VERSION = 3
@@ -49,6 +67,45 @@ def _persist_simulation_run(db: Session, payload: SimulationRunRequest, result:
     return record
 
 
+def _complete_simulation_run(
+    db: Session,
+    payload: SimulationRunRequest,
+    *,
+    current_user_id: int,
+    rerun: bool,
+    on_log: Callable[[SimulationLog], None] | None = None,
+    on_advisor: Callable[[str, AgentFeedback], None] | None = None,
+) -> SimulationRunResponse:
+    result = run_simulation(payload, on_log=on_log, on_advisor=on_advisor)
+    _persist_simulation_run(db, payload, result)
+    create_notification(
+        db,
+        category="SIMULATION",
+        title="Simulation rerun completed" if rerun else "Simulation completed",
+        message=(
+            f"{result.startup_name} {'rerun ' if rerun else ''}finished with score {result.overall_score}/100."
+        ),
+        link="/simulation/results",
+        target_user_id=current_user_id,
+        metadata={"simulation_id": result.simulation_id},
+    )
+    db.commit()
+    return result
+
+
+@register_job_handler("simulation.run")
+def _run_simulation_job(db: Session, job: BackgroundJob, context: JobContext) -> dict:
+    payload = SimulationRunRequest.model_validate(job.payload["request"])
+    result = _complete_simulation_run(
+        db,
+        payload,
+        current_user_id=job.owner_user_id,
+        rerun=bool(job.payload.get("rerun")),
+        on_log=context.report_progress,
+    )
+    return result.model_dump(mode="json")
+
+
 def _split_startup_name_version(name: str | None) -> tuple[str, int]:
     value = (name or "").strip()
     if not value:
@@ -95,8 +152,14 @@ async def simulation_intake_file_upload(file: UploadFile = File(...)):
     if len(content) > 10 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="Uploaded file exceeds 10MB limit.")
 
+    extraction_pool = get_extraction_pool()
     try:
-        text, extension = extract_cv_text(file_name, content)
+        text, extension = await extraction_pool.run(
+            extract_cv_text,
+            file_name,
+            content,
+            max_pages=extraction_pool.max_pages,
+        )
         normalized = re.sub(r"\r\n?", "\n", str(text or ""))
         normalized = re.sub(r"[ \t]+", " ", normalized)
         normalized = re.sub(r"\n{3,}", "\n\n", normalized).strip()
@@ -109,6 +172,10 @@ async def simulation_intake_file_upload(file: UploadFile = File(...)):
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
+    except ExtractionQueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except ExtractionTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
     except HTTPException:
         raise
     except Exception:
@@ -135,38 +202,95 @@ def run_simulation_endpoint(
 ):
     try:
         scoped_payload = payload.model_copy(update={"owner_email": current_user.email})
-        result = run_simulation(scoped_payload)
-        _persist_simulation_run(db, scoped_payload, result)
-        create_notification(
-            db,
-            category="SIMULATION",
-            title="Simulation completed",
-            message=f"{result.startup_name} finished with score {result.overall_score}/100.",
-            link="/simulation/results",
-            target_user_id=current_user.id,
-            metadata={"simulation_id": result.simulation_id},
-        )
-        db.commit()
-        return result
+        return _complete_simulation_run(db, scoped_payload, current_user_id=current_user.id, rerun=False)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(exc)}")
 
 
+@simulation_router.post("/run/stream")
+async def run_simulation_stream_endpoint(
+    payload: SimulationRunRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Run a simulation and stream its progress as Server-Sent Events.
+
+    Emits every log entry as it is written, each advisor's feedback as soon
+    as that advisor finishes, and the final result (persisted exactly like
+    POST /run). See modules/simulation/streaming.py for the event format.
+    """
+    scoped_payload = payload.model_copy(update={"owner_email": current_user.email})
+    current_user_id = current_user.id
+
+    def run(stream: SimulationEventStream) -> SimulationRunResponse:
+        # The request-scoped session is not safe to share with the worker thread.
+        db = SessionLocal()
+        try:
+            return _complete_simulation_run(
+                db,
+                scoped_payload,
+                current_user_id=current_user_id,
+                rerun=False,
+                on_log=stream.on_log,
+                on_advisor=stream.on_advisor,
+            )
+        finally:
+            db.close()
+
+    stream = SimulationEventStream(asyncio.get_running_loop())
+    return StreamingResponse(
+        stream.run(run),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@simulation_router.post("/jobs", response_model=BackgroundJobResponse, status_code=202)
+def submit_simulation_job(
+    payload: SimulationRunRequest,
+    current_user: User = Depends(get_current_user),
+):
+    scoped_payload = payload.model_copy(update={"owner_email": current_user.email})
+    job = get_job_queue().submit(
+        "simulation.run",
+        {"request": scoped_payload.model_dump(mode="json"), "rerun": False},
+        owner_user_id=current_user.id,
+    )
+    return BackgroundJobResponse(**job)
+
+
 @simulation_router.get("", response_model=list[SimulationRunSummary])
-def list_simulations(
+async def list_simulations(
+    response: Response,
     email: str | None = Query(default=None),
     limit: int = Query(default=25, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor header of the previous page."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    profile = get_or_create_access_profile(db, current_user)
-    query = db.query(SimulationRun)
+    profile = await get_or_create_access_profile_async(db, current_user)
+    statement = select(
+        SimulationRun.id,
+        SimulationRun.startup_name,
+        SimulationRun.status,
+        SimulationRun.overall_score,
+        SimulationRun.metrics,
+        SimulationRun.created_at,
+    )
     if profile.role.upper() == "ADMIN" and email:
-        query = query.filter(SimulationRun.owner_email == email)
+        statement = statement.where(SimulationRun.owner_email == email)
     elif profile.role.upper() != "ADMIN":
-        query = query.filter(SimulationRun.owner_email == current_user.email)
-
-    rows = query.order_by(SimulationRun.created_at.desc()).limit(limit).all()
+        statement = statement.where(SimulationRun.owner_email == current_user.email)
+    if cursor:
+        try:
+            statement = statement.where(after_cursor(SimulationRun.created_at, SimulationRun.id, cursor))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    statement = statement.order_by(*newest_first(SimulationRun.created_at, SimulationRun.id)).limit(limit + 1)
+    rows = (await db.execute(statement)).all()
+    following = next_cursor(rows, limit)
+    if following:
+        response.headers["X-Next-Cursor"] = following
     return [
         SimulationRunSummary(
             simulation_id=row.id,
@@ -176,7 +300,7 @@ def list_simulations(
             metrics=row.metrics or {},
             created_at=row.created_at,
         )
-        for row in rows
+        for row in rows[:limit]
     ]
 
 
@@ -211,13 +335,12 @@ def get_simulation(
     )
 
 
-@simulation_router.post("/{simulation_id}/rerun", response_model=SimulationRunResponse)
-def rerun_simulation(
+def _build_rerun_payload(
+    db: Session,
     simulation_id: str,
     payload: SimulationRerunRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+    current_user: User,
+) -> dict:
     original = db.query(SimulationRun).filter(SimulationRun.id == simulation_id).first()
     if not original:
         raise HTTPException(status_code=404, detail="Simulation not found.")
@@ -236,28 +359,46 @@ def rerun_simulation(
             owner_email=merged.get("owner_email") or original.owner_email,
             original_name=merged.get("startup_name") or original.startup_name,
         )
+    return merged
+
 
+@simulation_router.post("/{simulation_id}/rerun", response_model=SimulationRunResponse)
+def rerun_simulation(
+    simulation_id: str,
+    payload: SimulationRerunRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    merged = _build_rerun_payload(db, simulation_id, payload, current_user)
     try:
         run_payload = SimulationRunRequest.model_validate(merged)
-        result = run_simulation(run_payload)
-        _persist_simulation_run(db, run_payload, result)
-        create_notification(
-            db,
-            category="SIMULATION",
-            title="Simulation rerun completed",
-            message=f"{result.startup_name} rerun finished with score {result.overall_score}/100.",
-            link="/simulation/results",
-            target_user_id=current_user.id,
-            metadata={"simulation_id": result.simulation_id},
-        )
-        db.commit()
-        return result
+        return _complete_simulation_run(db, run_payload, current_user_id=current_user.id, rerun=True)
     except HTTPException:
         raise
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Simulation rerun failed: {str(exc)}")
 
 
+@simulation_router.post("/{simulation_id}/rerun/jobs", response_model=BackgroundJobResponse, status_code=202)
+def submit_simulation_rerun_job(
+    simulation_id: str,
+    payload: SimulationRerunRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    merged = _build_rerun_payload(db, simulation_id, payload, current_user)
+    try:
+        run_payload = SimulationRunRequest.model_validate(merged)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    job = get_job_queue().submit(
+        "simulation.run",
+        {"request": run_payload.model_dump(mode="json"), "rerun": True},
+        owner_user_id=current_user.id,
+    )
+    return BackgroundJobResponse(**job)
+
+
 @simulation_router.delete("/{simulation_id}")
 def delete_simulation(
     simulation_id: str,
@@ -271,6 +412,16 @@ def delete_simulation(
     if profile.role.upper() != "ADMIN" and row.owner_email != current_user.email:
         raise HTTPException(status_code=403, detail="You do not have access to this simulation.")
 
+    # Reports go with the run (ON DELETE CASCADE); their rendered artifacts may be shared.
+    artifact_ids = {
+        artifact_id
+        for (artifact_id,) in db.query(BusinessInsightReport.export_artifact_id)
+        .filter(BusinessInsightReport.simulation_id == row.id)
+        .all()
+    }
     db.delete(row)
+    db.flush()
+    for artifact_id in artifact_ids:
+        release_artifact(db, artifact_id)
     db.commit()
     return {"status": "deleted", "simulation_id": simulation_id}
@@ -5,11 +5,13 @@ import logging
 import os
 import re
 import uuid
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Any, Dict, List, TypedDict
+from typing import Any, Callable, Dict, List, TypedDict
 
 import openai
 
+from llm_cache import cached_chat_completion, llm_cache_offline
 from .schemas import (
     AgentFeedback,
     SimulationLog,
@@ -100,6 +102,18 @@ def _text_quality(value: str | None, *, weak: int = 24, strong: int = 140) -> in
     return _clamp_score(35 + ((length - weak) / max(1, strong - weak)) * 55)
 
 
+class _ObservedLogs(list):
+    """Log list that hands every new entry to a progress callback as it is appended."""
+
+    def __init__(self, on_log: Callable[[SimulationLog], None]) -> None:
+        super().__init__()
+        self._on_log = on_log
+
+    def append(self, entry: SimulationLog) -> None:
+        super().append(entry)
+        self._on_log(entry)
+
+
 def _new_log(
     logs: List[SimulationLog],
     role: str,
@@ -462,28 +476,36 @@ def run_intake_turn(
     )
 
 
-def _tool_context(query: str, top_k: int = 4) -> str:
+def _tool_contexts(queries: List[str], top_k: int = 4) -> List[str]:
     try:
-        from tools import build_context, rerank_with_mmr, retrieve_docs
+        from tools import build_context, rerank_with_mmr, retrieve_docs_batch
     except Exception as exc:
         logger.warning("Tool context helpers unavailable. error=%s", exc)
-        return ""
+        return ["" for _ in queries]
     try:
-        docs = retrieve_docs(query, top_k=max(top_k, 5))
-        if not docs:
-            return ""
-        ranked = rerank_with_mmr(query, docs, top_k=top_k)
-        return build_context(ranked)
+        batches = retrieve_docs_batch(queries, top_k=max(top_k, 5), include_embeddings=True)
+        contexts = []
+        for query, docs in zip(queries, batches):
+            ranked = rerank_with_mmr(query, docs, top_k=top_k) if docs else []
+            contexts.append(build_context(ranked) if ranked else "")
+        return contexts
     except Exception as exc:
         logger.warning("Tool context retrieval failed. error=%s", exc)
-        return ""
+        return ["" for _ in queries]
+
+
+def _tool_context(query: str, top_k: int = 4) -> str:
+    return _tool_contexts([query], top_k=top_k)[0]
 
 
-def _context_with_count(query: str, top_k: int = 4) -> tuple[str, int]:
-    context = _tool_context(query, top_k=top_k)
+def _count_context_items(context: str) -> int:
     if not context:
-        return "", 0
-    return context, len(re.findall(r"^\[\d+\.", context, flags=re.MULTILINE)) or 1
+        return 0
+    return len(re.findall(r"^\[\d+\.", context, flags=re.MULTILINE)) or 1
+
+
+def _contexts_with_counts(queries: List[str], top_k: int = 4) -> List[tuple[str, int]]:
+    return [(context, _count_context_items(context)) for context in _tool_contexts(queries, top_k=top_k)]
 
 
 def _strip_code_fences(text: str) -> str:
@@ -505,10 +527,11 @@ def _parse_json_or_default(raw: str, default: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _invoke_json(system_prompt: str, user_prompt: str) -> Dict[str, Any]:
-    if client is None:
+    if client is None and not llm_cache_offline():
         raise RuntimeError("OpenAI client not initialized. Check OPENAI_API_KEY.")
 
-    response = client.chat.completions.create(
+    raw = cached_chat_completion(
+        client,
         model=os.getenv("SIMULATION_MODEL", "gpt-4o-mini"),
         temperature=0.2,
         messages=[
@@ -517,7 +540,6 @@ def _invoke_json(system_prompt: str, user_prompt: str) -> Dict[str, Any]:
         ],
         response_format={"type": "json_object"},
     )
-    raw = (response.choices[0].message.content or "").strip()
     parsed = json.loads(_strip_code_fences(raw)) if raw else {}
     return parsed if isinstance(parsed, dict) else {}
 
@@ -662,10 +684,176 @@ def _normalize_feedback(data: Dict[str, Any], perspective: str) -> AgentFeedback
     )
 
 
+CONTEXT_SCAN = [
+    {
+        "key": "market",
+        "role": "MARKET ANALYST",
+        "running": "Scanning for market benchmarks, competitive patterns, and segment evidence.",
+        "query": "Find TAM benchmarks, market trends, and competitor positioning signals.",
+        "done": "Testing whether the target segment is narrow enough to support a credible wedge.",
+    },
+    {
+        "key": "customer",
+        "role": "CUSTOMER AGENT",
+        "running": "Looking for buyer pain, current workarounds, adoption friction, and willingness-to-pay clues.",
+        "query": "Find customer behavior insights, adoption friction, and willingness-to-pay clues.",
+        "done": "Simulating the buyer's resistance to switching from the current workaround.",
+    },
+    {
+        "key": "investor",
+        "role": "INVESTOR AGENT",
+        "running": "Checking capital efficiency, unit economics clarity, runway, and funding-readiness signals.",
+        "query": "Find unit economics norms, funding signals, and scale risks for this domain.",
+        "done": "Stress-testing whether growth can outrun burn and acquisition cost.",
+    },
+]
+
+PARALLEL_ADVISORS = os.getenv("SIMULATION_PARALLEL_ADVISORS", "1").strip().lower() not in {"0", "false", "no"}
+
+ADVISOR_PHASE = [
+    {
+        "role": "MARKET ANALYST",
+        "label": "Market analyst",
+        "perspective": "Market Analyst",
+        "node": market_analyst_node,
+        "feedback_key": "market_analyst_feedback",
+        "running": "Evaluating market believability against segment specificity, urgency, competition, and TAM realism.",
+        "done": "Market pressure test complete. Captured risks, opportunities, pressure points, and confidence rationale.",
+        "failed": "Market advisor failed. The simulation was stopped rather than producing a partial score.",
+    },
+    {
+        "role": "CUSTOMER AGENT",
+        "label": "Customer agent",
+        "perspective": "Customer Agent",
+        "node": customer_agent_node,
+        "feedback_key": "customer_feedback",
+        "running": "Evaluating whether the problem is urgent enough to overcome adoption friction.",
+        "done": "Customer simulation complete. Captured buyer objections, value hooks, and adoption risks.",
+        "failed": "Customer advisor failed. The simulation was stopped rather than producing a partial score.",
+    },
+    {
+        "role": "INVESTOR AGENT",
+        "label": "Investor agent",
+        "perspective": "Investor Agent",
+        "node": investor_agent_node,
+        "feedback_key": "investor_feedback",
+        "running": "Evaluating runway, CAC clarity, scalability, defensibility, and funding readiness.",
+        "done": "Investment pressure test complete. Captured capital risks and funding-readiness upside.",
+        "failed": "Investor advisor failed. The simulation was stopped rather than producing a partial score.",
+    },
+]
+
+
+def _advisor_failed(logs: List[SimulationLog], advisor: Dict[str, Any], exc: Exception) -> RuntimeError:
+    logger.exception("%s simulation failed. error=%s", advisor["label"], exc)
+    _new_log(
+        logs,
+        advisor["role"],
+        advisor["failed"],
+        phase="analysis",
+        status="error",
+        metadata={"error": str(exc)},
+    )
+    return RuntimeError(f"{advisor['label']} failed during simulation. No score was produced.")
+
+
+def _advisor_done(logs: List[SimulationLog], advisor: Dict[str, Any], state: BoardState) -> None:
+    _new_log(
+        logs,
+        advisor["role"],
+        advisor["done"],
+        phase="analysis",
+        metadata={"confidence": state.get(advisor["feedback_key"], {}).get("confidence")},
+    )
+
+
+def _report_advisor_result(
+    on_advisor: Callable[[str, AgentFeedback], None] | None,
+    advisor: Dict[str, Any],
+    result: Dict[str, Any],
+) -> None:
+    """Hand one advisor's normalized feedback to on_advisor as soon as it is available."""
+    if on_advisor is None:
+        return
+    try:
+        feedback = _normalize_feedback(result.get(advisor["feedback_key"], {}), advisor["perspective"])
+    except ValueError:
+        # Invalid feedback fails the run once the phase is collected; nothing partial to show.
+        return
+    on_advisor(advisor["role"], feedback)
+
+
+def _advisor_result_callback(
+    on_advisor: Callable[[str, AgentFeedback], None],
+    advisor: Dict[str, Any],
+) -> Callable[[Future], None]:
+    def report(future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            _report_advisor_result(on_advisor, advisor, future.result())
 
+    return report
 
-def run_simulation(payload: SimulationRunRequest) -> SimulationRunResponse:
-    logs: List[SimulationLog] = []
+
+def _run_advisor_phase(
+    state: BoardState,
+    logs: List[SimulationLog],
+    on_advisor: Callable[[str, AgentFeedback], None] | None = None,
+) -> None:
+    """Run the three advisors, concurrently unless SIMULATION_PARALLEL_ADVISORS is off.
+
+    Advisors only read the shared briefing state, so they can run side by side.
+    Completion logs are still appended in advisor order, and any failure stops
+    the run exactly as the sequential path does. on_advisor, when given, gets
+    each advisor's feedback the moment that advisor finishes, in completion
+    order and possibly from a worker thread.
+    """
+    if not PARALLEL_ADVISORS:
+        for advisor in ADVISOR_PHASE:
+            _new_log(logs, advisor["role"], advisor["running"], phase="analysis", status="running")
+            try:
+                result = advisor["node"](state)
+            except Exception as exc:
+                raise _advisor_failed(logs, advisor, exc) from exc
+            state.update(result)
+            _report_advisor_result(on_advisor, advisor, result)
+            _advisor_done(logs, advisor, state)
+        return
+
+    for advisor in ADVISOR_PHASE:
+        _new_log(logs, advisor["role"], advisor["running"], phase="analysis", status="running")
+
+    snapshot: BoardState = dict(state)
+    executor = ThreadPoolExecutor(max_workers=len(ADVISOR_PHASE), thread_name_prefix="simulation-advisor")
+    try:
+        futures = [executor.submit(advisor["node"], snapshot) for advisor in ADVISOR_PHASE]
+        if on_advisor is not None:
+            for advisor, future in zip(ADVISOR_PHASE, futures):
+                future.add_done_callback(_advisor_result_callback(on_advisor, advisor))
+        wait(futures, return_when=FIRST_EXCEPTION)
+        for advisor, future in zip(ADVISOR_PHASE, futures):
+            if future.done() and future.exception() is not None:
+                exc = future.exception()
+                raise _advisor_failed(logs, advisor, exc) from exc
+        for advisor, future in zip(ADVISOR_PHASE, futures):
+            state.update(future.result())
+            _advisor_done(logs, advisor, state)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_simulation(
+    payload: SimulationRunRequest,
+    on_log: Callable[[SimulationLog], None] | None = None,
+    on_advisor: Callable[[str, AgentFeedback], None] | None = None,
+) -> SimulationRunResponse:
+    """Run the board simulation.
+
+    on_log receives every log entry as it is written; on_advisor receives each
+    advisor's (role, feedback) as soon as that advisor finishes. Both are used
+    to stream progress (see modules/simulation/streaming.py). An exception
+    raised by on_log aborts the run at that point.
+    """
+    logs: List[SimulationLog] = _ObservedLogs(on_log) if on_log is not None else []
     _new_log(
         logs,
         "SIMULATION ROOM",
@@ -703,68 +891,18 @@ def run_simulation(payload: SimulationRunRequest) -> SimulationRunResponse:
     context_counts: Dict[str, int] = {}
     retrieved_context: Dict[str, str] = {}
 
-    _new_log(
-        logs,
-        "MARKET ANALYST",
-        "Scanning for market benchmarks, competitive patterns, and segment evidence.",
-        phase="context_scan",
-        status="running",
-    )
-    retrieved_context["market"], context_counts["market"] = _context_with_count(
-        f"{strategy}\n\nFind TAM benchmarks, market trends, and competitor positioning signals."
-    )
-    _new_log(
-        logs,
-        "MARKET ANALYST",
-        (
-            f"Retrieved {context_counts['market']} market evidence item(s). "
-            "Testing whether the target segment is narrow enough to support a credible wedge."
-        ),
-        phase="context_scan",
-        metadata={"retrieved_items": context_counts["market"]},
-    )
-
-    _new_log(
-        logs,
-        "CUSTOMER AGENT",
-        "Looking for buyer pain, current workarounds, adoption friction, and willingness-to-pay clues.",
-        phase="context_scan",
-        status="running",
-    )
-    retrieved_context["customer"], context_counts["customer"] = _context_with_count(
-        f"{strategy}\n\nFind customer behavior insights, adoption friction, and willingness-to-pay clues."
-    )
-    _new_log(
-        logs,
-        "CUSTOMER AGENT",
-        (
-            f"Retrieved {context_counts['customer']} customer evidence item(s). "
-            "Simulating the buyer's resistance to switching from the current workaround."
-        ),
-        phase="context_scan",
-        metadata={"retrieved_items": context_counts["customer"]},
-    )
-
-    _new_log(
-        logs,
-        "INVESTOR AGENT",
-        "Checking capital efficiency, unit economics clarity, runway, and funding-readiness signals.",
-        phase="context_scan",
-        status="running",
-    )
-    retrieved_context["investor"], context_counts["investor"] = _context_with_count(
-        f"{strategy}\n\nFind unit economics norms, funding signals, and scale risks for this domain."
-    )
-    _new_log(
-        logs,
-        "INVESTOR AGENT",
-        (
-            f"Retrieved {context_counts['investor']} investor evidence item(s). "
-            "Stress-testing whether growth can outrun burn and acquisition cost."
-        ),
-        phase="context_scan",
-        metadata={"retrieved_items": context_counts["investor"]},
-    )
+    for scan in CONTEXT_SCAN:
+        _new_log(logs, scan["role"], scan["running"], phase="context_scan", status="running")
+    scan_results = _contexts_with_counts([f"{strategy}\n\n{scan['query']}" for scan in CONTEXT_SCAN])
+    for scan, (context, count) in zip(CONTEXT_SCAN, scan_results):
+        retrieved_context[scan["key"]], context_counts[scan["key"]] = context, count
+        _new_log(
+            logs,
+            scan["role"],
+            f"Retrieved {count} {scan['key']} evidence item(s). {scan['done']}",
+            phase="context_scan",
+            metadata={"retrieved_items": count},
+        )
 
     state: BoardState = {
         "startup_name": payload.startup_name,
@@ -774,89 +912,7 @@ def run_simulation(payload: SimulationRunRequest) -> SimulationRunResponse:
         "retrieved_context": retrieved_context,
     }
 
-    _new_log(
-        logs,
-        "MARKET ANALYST",
-        "Evaluating market believability against segment specificity, urgency, competition, and TAM realism.",
-        phase="analysis",
-        status="running",
-    )
-    try:
-        state.update(market_analyst_node(state))
-        _new_log(
-            logs,
-            "MARKET ANALYST",
-            "Market pressure test complete. Captured risks, opportunities, pressure points, and confidence rationale.",
-            phase="analysis",
-            metadata={"confidence": state.get("market_analyst_feedback", {}).get("confidence")},
-        )
-    except Exception as exc:
-        logger.exception("Market analyst simulation failed. error=%s", exc)
-        _new_log(
-            logs,
-            "MARKET ANALYST",
-            "Market advisor failed. The simulation was stopped rather than producing a partial score.",
-            phase="analysis",
-            status="error",
-            metadata={"error": str(exc)},
-        )
-        raise RuntimeError("Market analyst failed during simulation. No score was produced.") from exc
-
-    _new_log(
-        logs,
-        "CUSTOMER AGENT",
-        "Evaluating whether the problem is urgent enough to overcome adoption friction.",
-        phase="analysis",
-        status="running",
-    )
-    try:
-        state.update(customer_agent_node(state))
-        _new_log(
-            logs,
-            "CUSTOMER AGENT",
-            "Customer simulation complete. Captured buyer objections, value hooks, and adoption risks.",
-            phase="analysis",
-            metadata={"confidence": state.get("customer_feedback", {}).get("confidence")},
-        )
-    except Exception as exc:
-        logger.exception("Customer agent simulation failed. error=%s", exc)
-        _new_log(
-            logs,
-            "CUSTOMER AGENT",
-            "Customer advisor failed. The simulation was stopped rather than producing a partial score.",
-            phase="analysis",
-            status="error",
-            metadata={"error": str(exc)},
-        )
-        raise RuntimeError("Customer agent failed during simulation. No score was produced.") from exc
-
-    _new_log(
-        logs,
-        "INVESTOR AGENT",
-        "Evaluating runway, CAC clarity, scalability, defensibility, and funding readiness.",
-        phase="analysis",
-        status="running",
-    )
-    try:
-        state.update(investor_agent_node(state))
-        _new_log(
-            logs,
-            "INVESTOR AGENT",
-            "Investment pressure test complete. Captured capital risks and funding-readiness upside.",
-            phase="analysis",
-            metadata={"confidence": state.get("investor_feedback", {}).get("confidence")},
-        )
-    except Exception as exc:
-        logger.exception("Investor agent simulation failed. error=%s", exc)
-        _new_log(
-            logs,
-            "INVESTOR AGENT",
-            "Investor advisor failed. The simulation was stopped rather than producing a partial score.",
-            phase="analysis",
-            status="error",
-            metadata={"error": str(exc)},
-        )
-        raise RuntimeError("Investor agent failed during simulation. No score was produced.") from exc
+    _run_advisor_phase(state, logs, on_advisor)
 
     market_agent = _normalize_feedback(
         state.get("market_analyst_feedback", {}),
@@ -961,7 +1017,7 @@ def run_simulation(payload: SimulationRunRequest) -> SimulationRunResponse:
         recommendations=recommendations,
         agents=[market_agent, customer_agent, investor_agent],
         synthesis=synthesis,
-        logs=logs,
+        logs=list(logs),
         assumptions=assumptions,
         deterministic_signals=deterministic_signals,
         uncertainty=uncertainty,
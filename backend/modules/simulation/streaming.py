@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable
+
+from .schemas import AgentFeedback, SimulationLog, SimulationRunResponse
+
+logger = logging.getLogger(__name__)
+
+SIMULATION_STREAM_WORKERS = max(1, int(os.getenv("SIMULATION_STREAM_WORKERS", "8")))
+SIMULATION_STREAM_HEARTBEAT_SECONDS = max(1.0, float(os.getenv("SIMULATION_STREAM_HEARTBEAT_SECONDS", "15")))
+
+_DONE = object()
+
+_shared_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+class SimulationStreamClosed(RuntimeError):
+    """Raised inside the simulation when the client has gone away."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _shared_executor
+    if _shared_executor is None:
+        with _executor_lock:
+            if _shared_executor is None:
+                _shared_executor = ThreadPoolExecutor(
+                    max_workers=SIMULATION_STREAM_WORKERS,
+                    thread_name_prefix="simulation-stream",
+                )
+    return _shared_executor
+
+
+def shutdown_simulation_streams() -> None:
+    global _shared_executor
+    with _executor_lock:
+        executor, _shared_executor = _shared_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def sse_event(event: str, data: Any, event_id: str | None = None) -> str:
+    """Format one Server-Sent Events frame."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=True, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class SimulationEventStream:
+    """Bridge a simulation running on a worker thread to an SSE response.
+
+    run_simulation's on_log / on_advisor hooks are called on worker threads;
+    they hand events to the event loop with call_soon_threadsafe and the
+    response drains them as they arrive. Event types:
+
+    - ``log``: one SimulationLog, with its sequence as the SSE id
+    - ``advisor``: ``{"role", "feedback"}`` as soon as an advisor finishes
+    - ``result``: the final SimulationRunResponse
+    - ``error``: ``{"detail"}`` when the run fails
+
+    A comment line is sent every SIMULATION_STREAM_HEARTBEAT_SECONDS so
+    proxies keep the connection open. When the client disconnects, the next
+    log raises SimulationStreamClosed and the run stops there.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        heartbeat_seconds: float = SIMULATION_STREAM_HEARTBEAT_SECONDS,
+    ) -> None:
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._closed = threading.Event()
+        self.heartbeat_seconds = heartbeat_seconds
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def close(self) -> None:
+        self._closed.set()
+
+    def _put(self, item: Any) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        except RuntimeError:
+            # The event loop is gone (server shutting down); treat it as a disconnect.
+            self.close()
+
+    def on_log(self, entry: SimulationLog) -> None:
+        if self.closed:
+            raise SimulationStreamClosed("Simulation stream client disconnected.")
+        self._put(("log", entry.model_dump(mode="json"), str(entry.sequence)))
+
+    def on_advisor(self, role: str, feedback: AgentFeedback) -> None:
+        if not self.closed:
+            self._put(("advisor", {"role": role, "feedback": feedback.model_dump(mode="json")}, None))
+
+    def _execute(self, run: Callable[["SimulationEventStream"], SimulationRunResponse]) -> None:
+        try:
+            result = run(self)
+            self._put(("result", result.model_dump(mode="json"), None))
+        except SimulationStreamClosed:
+            logger.info("Simulation stream closed by the client; run stopped.")
+        except Exception as exc:
+            logger.exception("Streamed simulation failed. error=%s", exc)
+            self._put(("error", {"detail": f"Simulation failed: {str(exc)}"}, None))
+        finally:
+            self._put(_DONE)
+
+    async def run(self, run: Callable[["SimulationEventStream"], SimulationRunResponse]) -> AsyncIterator[str]:
+        """Start run(stream) on the stream executor and yield SSE frames until it ends."""
+        self._loop.run_in_executor(_get_executor(), self._execute, run)
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is _DONE:
+                    return
+                yield sse_event(*item)
+        finally:
+            self.close()
@@ -0,0 +1,54 @@
+"""
+Opaque keyset cursors for listings ordered newest first by (created_at, id).
+
+A cursor encodes the sort key of the last row a client has seen. The next
+page is the rows strictly after it in (created_at DESC NULLS LAST, id DESC)
+order, so the database walks an index from that point instead of counting
+off an OFFSET. Deep pages cost the same as the first one. created_at is
+nullable; undated rows come last and their cursors carry an empty timestamp.
+"""
+
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import and_, or_, tuple_
+
+
+def encode_cursor(created_at: datetime | None, row_id: Any) -> str:
+    raw = f"{created_at.isoformat() if created_at is not None else ''}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, str]:
+    """Return (created_at, id) from a cursor; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|", 1)
+        if not row_id:
+            raise ValueError("missing id")
+        return (datetime.fromisoformat(created_at) if created_at else None), row_id
+    except (UnicodeError, ValueError) as exc:
+        raise ValueError("Invalid pagination cursor.") from exc
+
+
+def newest_first(created_column, id_column) -> tuple:
+    return created_column.desc().nulls_last(), id_column.desc()
+
+
+def after_cursor(created_column, id_column, cursor: str):
+    """WHERE clause for the rows that follow ``cursor`` in newest_first() order."""
+    created_at, row_id = decode_cursor(cursor)
+    if created_at is None:
+        return and_(created_column.is_(None), id_column < row_id)
+    return or_(tuple_(created_column, id_column) < tuple_(created_at, row_id), created_column.is_(None))
+
+
+def next_cursor(rows: Sequence[Any], limit: int) -> str | None:
+    """Cursor for the page after ``rows``, fetched with ``limit + 1`` to detect more."""
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.created_at, last.id)
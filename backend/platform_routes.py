@@ -5,16 +5,25 @@ from math import ceil
 import re
 from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import Response
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from auth import get_current_user, get_or_create_access_profile, require_roles
-from database import get_db
+from auth import (
+    get_current_user,
+    get_current_user_async,
+    get_or_create_access_profile,
+    get_or_create_access_profile_async,
+    require_roles,
+)
+from database import get_async_db, get_db
+from job_queue import JobContext, get_job_queue, register_job_handler
 from models import (
     AgentRequest,
     AppNotification,
+    BackgroundJob,
     BusinessInsightReport,
     BusinessInsightReportVersion,
     CalendarEvent,
@@ -25,11 +34,16 @@ from models import (
     User,
     UserAccessProfile,
 )
+from modules.simulation.reporting.artifact_store import release_artifact, set_report_export_html
+from modules.simulation.reporting.export_cache import build_export_cache_key, get_report_export_cache
+from pagination import after_cursor, newest_first, next_cursor
 from platform_service import (
+    REPORT_LIST_COLUMNS,
     build_calendar_suggestions,
     build_report_html,
     build_report_html_from_document,
     build_report_pdf_from_html,
+    compute_document_hash,
     create_notification,
     ensure_report_versions_initialized,
     enrich_document_with_generated_visuals,
@@ -38,6 +52,7 @@ from platform_service import (
     plan_report_outline,
     publish_report_version,
     report_payload_to_document_json,
+    report_renderer_version,
     resolve_template_for_report_type,
     save_report_draft_version,
     serialize_calendar_event,
@@ -47,7 +62,9 @@ from platform_service import (
     serialize_report_list_item,
     suggest_report_name,
 )
+from principal_cache import invalidate_principal
 from schemas import (
+    BackgroundJobResponse,
     BusinessReportDraftPreviewRequest,
     BusinessReportDraftSaveRequest,
     BusinessReportDraftSaveResponse,
@@ -93,6 +110,61 @@ def _content_disposition_attachment(filename: str) -> str:
     return f'attachment; filename="{filename}"; filename*=UTF-8\'\'{encoded}'
 
 
+def _export_cache_key(
+    document_json: dict,
+    simulation: SimulationRun,
+    workspace: ManagementWorkspace | None,
+    *,
+    template_id: str,
+    quality: str,
+    export_format: str,
+) -> str:
+    workspace_marker = ""
+    if workspace is not None:
+        workspace_marker = f"{workspace.id}@{workspace.updated_at.isoformat() if workspace.updated_at else ''}"
+    return build_export_cache_key(
+        content_hash=compute_document_hash(document_json),
+        template_id=template_id,
+        quality=quality,
+        export_format=export_format,
+        renderer_version=report_renderer_version(export_format),
+        context=f"{simulation.id}|{workspace_marker}",
+    )
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "").strip()
+    if not header:
+        return False
+    if header == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def _cached_report_html(
+    document_json: dict,
+    simulation: SimulationRun,
+    workspace: ManagementWorkspace | None,
+    *,
+    template_id: str,
+    quality: str,
+    cache_key: str,
+) -> str:
+    cache = get_report_export_cache()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached.decode("utf-8")
+    html_source = build_report_html_from_document(
+        document_json,
+        simulation,
+        workspace,
+        template_id=template_id,
+        quality=quality,
+    )
+    cache.put(cache_key, html_source.encode("utf-8"))
+    return html_source
+
+
 def _serialize_user(user: User, profile: UserAccessProfile | None) -> UserResponse:
     return UserResponse(
         id=user.id,
@@ -260,27 +332,31 @@ def _document_is_sparse(document_json: dict | None) -> bool:
     return rich_count < 6
 
 
-def _notification_query(db: Session, current_user: User, profile: UserAccessProfile):
-    query = db.query(AppNotification)
+def _notification_audience(current_user: User, profile: UserAccessProfile):
+    """Filter for the notifications a non-admin viewer can see; None for admins."""
     if profile.role.upper() == "ADMIN":
-        return query
+        return None
 
     role = (profile.role or "").upper()
-    return query.filter(
-        or_(
-            AppNotification.target_user_id == current_user.id,
-            and_(
-                AppNotification.target_user_id.is_(None),
-                AppNotification.target_role == role,
-            ),
-        )
+    return or_(
+        AppNotification.target_user_id == current_user.id,
+        and_(
+            AppNotification.target_user_id.is_(None),
+            AppNotification.target_role == role,
+        ),
     )
 
 
-def _notification_read_exists(db: Session, user_id: int):
+def _notification_query(db: Session, current_user: User, profile: UserAccessProfile):
+    query = db.query(AppNotification)
+    audience = _notification_audience(current_user, profile)
+    return query if audience is None else query.filter(audience)
+
+
+def _notification_read_exists(user_id: int):
     return (
-        db.query(NotificationReadReceipt.id)
-        .filter(
+        select(NotificationReadReceipt.id)
+        .where(
             NotificationReadReceipt.notification_id == AppNotification.id,
             NotificationReadReceipt.user_id == user_id,
         )
@@ -288,39 +364,36 @@ def _notification_read_exists(db: Session, user_id: int):
     )
 
 
-def _notification_receipt_map(db: Session, user_id: int, notification_ids: list[str]) -> dict[str, datetime]:
+async def _notification_receipt_map_async(
+    db: AsyncSession,
+    user_id: int,
+    notification_ids: list[str],
+) -> dict[str, datetime]:
     if not notification_ids:
         return {}
 
-    rows = (
-        db.query(NotificationReadReceipt.notification_id, NotificationReadReceipt.read_at)
-        .filter(
+    result = await db.execute(
+        select(NotificationReadReceipt.notification_id, NotificationReadReceipt.read_at).where(
             NotificationReadReceipt.user_id == user_id,
             NotificationReadReceipt.notification_id.in_(notification_ids),
         )
-        .all()
     )
-    return {notification_id: read_at for notification_id, read_at in rows if notification_id}
+    return {notification_id: read_at for notification_id, read_at in result.all() if notification_id}
 
 
-def _notification_user_email_map(db: Session, target_user_ids: list[int]) -> dict[int, str]:
+async def _notification_user_email_map_async(db: AsyncSession, target_user_ids: list[int]) -> dict[int, str]:
     if not target_user_ids:
         return {}
 
-    rows = db.query(User.id, User.email).filter(User.id.in_(target_user_ids)).all()
-    return {user_id: email for user_id, email in rows if user_id is not None and email}
+    result = await db.execute(select(User.id, User.email).where(User.id.in_(target_user_ids)))
+    return {user_id: email for user_id, email in result.all() if user_id is not None and email}
 
 
-def _serialize_notifications_for_viewer(
-    db: Session,
-    current_user: User,
+def _notification_responses(
     rows: list[AppNotification],
+    receipt_map: dict[str, datetime],
+    email_map: dict[int, str],
 ) -> list[NotificationResponse]:
-    notification_ids = [row.id for row in rows if row.id]
-    target_user_ids = list({row.target_user_id for row in rows if row.target_user_id is not None})
-    receipt_map = _notification_receipt_map(db, current_user.id, notification_ids)
-    email_map = _notification_user_email_map(db, target_user_ids)
-
     return [
         NotificationResponse(
             **serialize_notification(
@@ -333,19 +406,33 @@ def _serialize_notifications_for_viewer(
     ]
 
 
+def _notification_ids(rows: list[AppNotification]) -> tuple[list[str], list[int]]:
+    notification_ids = [row.id for row in rows if row.id]
+    target_user_ids = list({row.target_user_id for row in rows if row.target_user_id is not None})
+    return notification_ids, target_user_ids
+
+
 @platform_router.get("/notifications", response_model=list[NotificationResponse])
-def list_notifications(
+async def list_notifications(
     unread_only: bool = Query(default=False),
     limit: int = Query(default=50, ge=1, le=200),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    profile = get_or_create_access_profile(db, current_user)
-    query = _notification_query(db, current_user, profile)
+    profile = await get_or_create_access_profile_async(db, current_user)
+    statement = select(AppNotification)
+    audience = _notification_audience(current_user, profile)
+    if audience is not None:
+        statement = statement.where(audience)
     if unread_only:
-        query = query.filter(~_notification_read_exists(db, current_user.id))
-    rows = query.order_by(AppNotification.created_at.desc()).limit(limit).all()
-    return _serialize_notifications_for_viewer(db, current_user, rows)
+        statement = statement.where(~_notification_read_exists(current_user.id))
+    statement = statement.order_by(AppNotification.created_at.desc()).limit(limit)
+    rows = list((await db.execute(statement)).scalars().all())
+
+    notification_ids, target_user_ids = _notification_ids(rows)
+    receipt_map = await _notification_receipt_map_async(db, current_user.id, notification_ids)
+    email_map = await _notification_user_email_map_async(db, target_user_ids)
+    return _notification_responses(rows, receipt_map, email_map)
 
 
 @platform_router.patch("/notifications/{notification_id}/read", response_model=NotificationReadResponse)
@@ -392,7 +479,7 @@ def mark_all_notifications_read(
     profile = get_or_create_access_profile(db, current_user)
     rows = (
         _notification_query(db, current_user, profile)
-        .filter(~_notification_read_exists(db, current_user.id))
+        .filter(~_notification_read_exists(current_user.id))
         .all()
     )
     now = datetime.utcnow()
@@ -409,38 +496,55 @@ def mark_all_notifications_read(
 
 
 @platform_router.get("/reports", response_model=BusinessReportListResponse)
-def list_reports(
+async def list_reports(
     workspace_id: str | None = Query(default=None),
     simulation_id: str | None = Query(default=None),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=8, ge=1, le=50),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page; empty for the first."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    profile = get_or_create_access_profile(db, current_user)
-    query = db.query(BusinessInsightReport)
+    profile = await get_or_create_access_profile_async(db, current_user)
+    conditions = []
     if profile.role.upper() != "ADMIN":
-        query = query.filter(BusinessInsightReport.owner_user_id == current_user.id)
+        conditions.append(BusinessInsightReport.owner_user_id == current_user.id)
     if workspace_id:
-        query = query.filter(BusinessInsightReport.workspace_id == workspace_id)
+        conditions.append(BusinessInsightReport.workspace_id == workspace_id)
     if simulation_id:
-        query = query.filter(BusinessInsightReport.simulation_id == simulation_id)
-    total = query.count()
-    offset = (page - 1) * page_size
-    rows = (
-        query.order_by(BusinessInsightReport.created_at.desc())
-        .offset(offset)
-        .limit(page_size)
-        .all()
+        conditions.append(BusinessInsightReport.simulation_id == simulation_id)
+
+    statement = (
+        select(*REPORT_LIST_COLUMNS)
+        .where(*conditions)
+        .order_by(*newest_first(BusinessInsightReport.created_at, BusinessInsightReport.id))
+        .limit(page_size + 1)
     )
-    total_pages = max(1, ceil(total / page_size)) if page_size > 0 else 1
-    items = [BusinessReportListItem(**serialize_report_list_item(row)) for row in rows]
+    total = total_pages = None
+    if cursor is not None:
+        if cursor:
+            try:
+                statement = statement.where(
+                    after_cursor(BusinessInsightReport.created_at, BusinessInsightReport.id, cursor)
+                )
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+    else:
+        total = (
+            await db.execute(select(func.count(BusinessInsightReport.id)).where(*conditions))
+        ).scalar_one()
+        total_pages = max(1, ceil(total / page_size))
+        statement = statement.offset((page - 1) * page_size)
+
+    rows = (await db.execute(statement)).all()
+    items = [BusinessReportListItem(**serialize_report_list_item(row)) for row in rows[:page_size]]
     return BusinessReportListResponse(
         items=items,
         page=page,
         page_size=page_size,
         total=total,
         total_pages=total_pages,
+        next_cursor=next_cursor(rows, page_size),
     )
 
 
@@ -471,12 +575,11 @@ def plan_report_outline_endpoint(
     return PlanOutlineResponse(outline=outline)
 
 
-@platform_router.post("/reports/generate", response_model=BusinessReportResponse)
-def generate_report(
+def _load_report_sources(
+    db: Session,
+    current_user: User,
     payload: BusinessReportGenerateRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+) -> tuple[SimulationRun, ManagementWorkspace | None]:
     simulation = db.query(SimulationRun).filter(SimulationRun.id == payload.simulation_id).first()
     if not simulation:
         raise HTTPException(status_code=404, detail="Simulation not found.")
@@ -488,6 +591,16 @@ def generate_report(
         if not workspace:
             raise HTTPException(status_code=404, detail="Management workspace not found.")
         _ensure_workspace_access(db, current_user, workspace)
+    return simulation, workspace
+
+
+def _generate_business_report(
+    db: Session,
+    current_user: User,
+    payload: BusinessReportGenerateRequest,
+    context: JobContext | None = None,
+) -> BusinessReportResponse:
+    simulation, workspace = _load_report_sources(db, current_user, payload)
     selected_template = resolve_template_for_report_type(payload.report_type, payload.template_id)
     resolved_report_name = suggest_report_name(
         startup_name=simulation.startup_name,
@@ -496,6 +609,8 @@ def generate_report(
     )
 
     approved_outline = [s.model_dump() for s in payload.outline] if payload.outline else None
+    if context is not None:
+        context.log("REPORT AGENT", f"Drafting {resolved_report_name}.", phase="generation", status="running")
     try:
         artifacts = generate_agentic_report_artifacts(
             simulation=simulation,
@@ -510,6 +625,8 @@ def generate_report(
         raise HTTPException(status_code=503, detail=str(exc))
     report_payload = artifacts["report_payload"]
     document_json = artifacts["document_json"]
+    if context is not None:
+        context.log("REPORT AGENT", "Report drafted. Rendering the export layout.", phase="rendering", status="running")
     try:
         export_html = build_report_html_from_document(
             document_json,
@@ -538,8 +655,8 @@ def generate_report(
         sections=report_payload["sections"],
         key_findings=report_payload["key_findings"],
         recommended_actions=report_payload["recommended_actions"],
-        export_html=export_html,
     )
+    set_report_export_html(db, row, export_html)
     db.add(row)
     db.flush()
     ensure_report_versions_initialized(
@@ -559,9 +676,44 @@ def generate_report(
     )
     db.commit()
     db.refresh(row)
+    if context is not None:
+        context.log("REPORT AGENT", f"{row.report_name} is ready.", phase="complete")
     return BusinessReportResponse(**serialize_report(row))
 
 
+@register_job_handler("report.generate")
+def _run_report_job(db: Session, job: BackgroundJob, context: JobContext) -> dict:
+    current_user = db.query(User).filter(User.id == job.owner_user_id).first()
+    if current_user is None:
+        raise ValueError("Job owner no longer exists.")
+    payload = BusinessReportGenerateRequest.model_validate(job.payload["request"])
+    return _generate_business_report(db, current_user, payload, context).model_dump(mode="json")
+
+
+@platform_router.post("/reports/generate", response_model=BusinessReportResponse)
+def generate_report(
+    payload: BusinessReportGenerateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _generate_business_report(db, current_user, payload)
+
+
+@platform_router.post("/reports/generate/jobs", response_model=BackgroundJobResponse, status_code=202)
+def submit_report_job(
+    payload: BusinessReportGenerateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _load_report_sources(db, current_user, payload)
+    job = get_job_queue().submit(
+        "report.generate",
+        {"request": payload.model_dump(mode="json")},
+        owner_user_id=current_user.id,
+    )
+    return BackgroundJobResponse(**job)
+
+
 @platform_router.get("/reports/{report_id}", response_model=BusinessReportResponse)
 def get_report(
     report_id: str,
@@ -801,7 +953,7 @@ def publish_report(
         created_by_user_id=current_user.id,
     )
     try:
-        row.export_html = build_report_html_from_document(
+        export_html = build_report_html_from_document(
             published.document_json if isinstance(published.document_json, dict) else {},
             simulation,
             workspace,
@@ -809,7 +961,9 @@ def publish_report(
             quality="standard",
         )
     except Exception:
-        pass
+        export_html = None
+    if export_html is not None:
+        set_report_export_html(db, row, export_html)
 
     db.add(row)
     db.commit()
@@ -834,7 +988,10 @@ def delete_report(
 
     # Explicitly clear versions to avoid residual records when FK cascade is not enforced.
     db.query(BusinessInsightReportVersion).filter(BusinessInsightReportVersion.report_id == row.id).delete()
+    artifact_id = row.export_artifact_id
     db.delete(row)
+    db.flush()
+    release_artifact(db, artifact_id)
     db.commit()
     return {"deleted": True, "report_id": report_id}
 
@@ -864,7 +1021,7 @@ def update_report(
         row.template_id = template["template_id"]
 
     try:
-        row.export_html = build_report_html(
+        export_html = build_report_html(
             serialize_report(row),
             simulation,
             workspace,
@@ -874,7 +1031,9 @@ def update_report(
         )
     except Exception:
         # Keep content update functional even if renderer dependencies are missing.
-        pass
+        export_html = None
+    if export_html is not None:
+        set_report_export_html(db, row, export_html)
 
     row.updated_at = datetime.utcnow()
     db.add(row)
@@ -886,6 +1045,7 @@ def update_report(
 @platform_router.get("/reports/{report_id}/export")
 def export_report(
     report_id: str,
+    request: Request,
     format: str = Query(default="pdf"),
     report_type: str | None = Query(default=None),
     quality: str = Query(default="standard"),
@@ -932,14 +1092,34 @@ def export_report(
             layout_guidance=payload.get("layout_guidance") if isinstance(payload, dict) else None,
         )
 
+    export_format = "html" if format.lower() == "gdocs" else "pdf"
+    cache_key_args = {"template_id": final_template_id, "quality": normalized_quality}
+    html_key = _export_cache_key(document_json, simulation, workspace, export_format="html", **cache_key_args)
+    artifact_key = html_key
+    if export_format == "pdf":
+        artifact_key = _export_cache_key(document_json, simulation, workspace, export_format="pdf", **cache_key_args)
+    etag = f'"{artifact_key}"'
+    if export_format == "html":
+        filename = f"{export_base_name}-google-docs-import.html"
+        media_type = "text/html; charset=utf-8"
+    else:
+        filename = f"{export_base_name}.pdf"
+        media_type = "application/pdf"
+    headers = {
+        "Content-Disposition": _content_disposition_attachment(filename),
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+    }
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": headers["Cache-Control"]})
+
+    cache = get_report_export_cache()
+    cached = cache.get(artifact_key) if export_format == "pdf" else None
+    if cached is not None:
+        return Response(content=cached, media_type=media_type, headers=headers)
+
     try:
-        html_source = build_report_html_from_document(
-            document_json,
-            simulation,
-            workspace,
-            template_id=final_template_id,
-            quality=normalized_quality,
-        )
+        html_source = _cached_report_html(document_json, simulation, workspace, cache_key=html_key, **cache_key_args)
     except Exception:
         raise HTTPException(
             status_code=503,
@@ -949,17 +1129,8 @@ def export_report(
             ),
         )
 
-    if format.lower() == "gdocs":
-        html_bytes = html_source.encode("utf-8")
-        return Response(
-            content=html_bytes,
-            media_type="text/html; charset=utf-8",
-            headers={
-                "Content-Disposition": _content_disposition_attachment(
-                    f"{export_base_name}-google-docs-import.html"
-                )
-            },
-        )
+    if export_format == "html":
+        return Response(content=html_source.encode("utf-8"), media_type=media_type, headers=headers)
 
     try:
         pdf_bytes = build_report_pdf_from_html(html_source)
@@ -971,17 +1142,15 @@ def export_report(
                 "Install WeasyPrint in the backend environment or export as Google Docs HTML."
             ),
         )
+    cache.put(artifact_key, pdf_bytes)
 
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={"Content-Disposition": _content_disposition_attachment(f"{export_base_name}.pdf")},
-    )
+    return Response(content=pdf_bytes, media_type=media_type, headers=headers)
 
 
 @platform_router.get("/reports/{report_id}/preview")
 def preview_report(
     report_id: str,
+    request: Request,
     quality: str = Query(default="standard"),
     template_id: str | None = Query(default=None),
     version_id: str | None = Query(default=None),
@@ -1020,13 +1189,27 @@ def preview_report(
             layout_guidance=payload.get("layout_guidance") if isinstance(payload, dict) else None,
         )
 
+    html_key = _export_cache_key(
+        document_json,
+        simulation,
+        workspace,
+        template_id=final_template_id,
+        quality=normalized_quality,
+        export_format="html",
+    )
+    etag = f'"{html_key}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
     try:
-        html_source = build_report_html_from_document(
+        html_source = _cached_report_html(
             document_json,
             simulation,
             workspace,
             template_id=final_template_id,
             quality=normalized_quality,
+            cache_key=html_key,
         )
     except Exception:
         raise HTTPException(
@@ -1037,29 +1220,30 @@ def preview_report(
             ),
         )
 
-    return Response(content=html_source, media_type="text/html; charset=utf-8")
+    return Response(content=html_source, media_type="text/html; charset=utf-8", headers=headers)
 
 
 @platform_router.get("/calendar/events", response_model=list[CalendarEventResponse])
-def list_calendar_events(
+async def list_calendar_events(
     workspace_id: str | None = Query(default=None),
     date_from: datetime | None = Query(default=None),
     date_to: datetime | None = Query(default=None),
     limit: int = Query(default=100, ge=1, le=300),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    profile = get_or_create_access_profile(db, current_user)
-    query = db.query(CalendarEvent)
+    profile = await get_or_create_access_profile_async(db, current_user)
+    statement = select(CalendarEvent)
     if profile.role.upper() != "ADMIN":
-        query = query.filter(CalendarEvent.owner_user_id == current_user.id)
+        statement = statement.where(CalendarEvent.owner_user_id == current_user.id)
     if workspace_id:
-        query = query.filter(CalendarEvent.workspace_id == workspace_id)
+        statement = statement.where(CalendarEvent.workspace_id == workspace_id)
     if date_from:
-        query = query.filter(CalendarEvent.starts_at >= date_from)
+        statement = statement.where(CalendarEvent.starts_at >= date_from)
     if date_to:
-        query = query.filter(CalendarEvent.starts_at <= date_to)
-    rows = query.order_by(CalendarEvent.starts_at.asc()).limit(limit).all()
+        statement = statement.where(CalendarEvent.starts_at <= date_to)
+    statement = statement.order_by(CalendarEvent.starts_at.asc()).limit(limit)
+    rows = (await db.execute(statement)).scalars().all()
     return [CalendarEventResponse(**serialize_calendar_event(row)) for row in rows]
 
 
@@ -1263,6 +1447,7 @@ def update_admin_user(
         metadata={"updated_by": current_user.email, "role": profile.role, "is_active": user.is_active},
     )
     db.commit()
+    invalidate_principal(user_id=user.id, email=user.email)
     db.refresh(user)
     db.refresh(profile)
     return _serialize_user(user, profile)
@@ -15,7 +15,10 @@ from uuid import uuid4
 import openai
 from sqlalchemy.orm import Session
 
+from llm_cache import cached_chat_completion, llm_cache_offline
 from modules.simulation.reporting import StartupSimulationReportGenerator
+from modules.simulation.reporting.browser_pool import browser_pool_stats
+from modules.simulation.reporting.export_cache import REPORT_RENDERER_VERSION
 from models import (
     AppNotification,
     BusinessInsightReport,
@@ -339,6 +342,7 @@ def get_report_renderer_health() -> Dict[str, Any]:
         "ready": html_ready and pdf_ready,
         "html_error": html_error,
         "pdf_error": pdf_error,
+        "pdf_browser_pool": browser_pool_stats(),
     }
 
 
@@ -925,10 +929,28 @@ def serialize_report(row: BusinessInsightReport, include_content: bool = True) -
     }
 
 
-def serialize_report_list_item(row: BusinessInsightReport) -> Dict[str, Any]:
-    sections = row.sections if isinstance(row.sections, list) else []
-    key_findings = row.key_findings if isinstance(row.key_findings, list) else []
-    recommended_actions = row.recommended_actions if isinstance(row.recommended_actions, list) else []
+# Everything serialize_report_list_item reads; listings select only these.
+REPORT_LIST_COLUMNS = (
+    BusinessInsightReport.id,
+    BusinessInsightReport.simulation_id,
+    BusinessInsightReport.workspace_id,
+    BusinessInsightReport.report_name,
+    BusinessInsightReport.report_type,
+    BusinessInsightReport.template_id,
+    BusinessInsightReport.status,
+    BusinessInsightReport.summary,
+    BusinessInsightReport.sections_count,
+    BusinessInsightReport.key_findings_count,
+    BusinessInsightReport.recommended_actions_count,
+    BusinessInsightReport.published_version_id,
+    BusinessInsightReport.latest_draft_version_id,
+    BusinessInsightReport.created_at,
+    BusinessInsightReport.updated_at,
+)
+
+
+def serialize_report_list_item(row: Any) -> Dict[str, Any]:
+    """List fields of a BusinessInsightReport, or of a row selected with REPORT_LIST_COLUMNS."""
     return {
         "report_id": row.id,
         "simulation_id": row.simulation_id,
@@ -938,9 +960,9 @@ def serialize_report_list_item(row: BusinessInsightReport) -> Dict[str, Any]:
         "template_id": str(getattr(row, "template_id", "") or "obsidian_board"),
         "status": row.status or "READY",
         "summary": row.summary or "",
-        "sections_count": len(sections),
-        "key_findings_count": len(key_findings),
-        "recommended_actions_count": len(recommended_actions),
+        "sections_count": row.sections_count or 0,
+        "key_findings_count": row.key_findings_count or 0,
+        "recommended_actions_count": row.recommended_actions_count or 0,
         "published_version_id": row.published_version_id,
         "latest_draft_version_id": row.latest_draft_version_id,
         "created_at": row.created_at,
@@ -1797,7 +1819,7 @@ def generate_business_report(
     else:
         section_titles = _report_section_blueprint(normalized_report_type)
 
-    if client is None:
+    if client is None and not llm_cache_offline():
         raise RuntimeError("Report generation is unavailable because the OpenAI client is not configured.")
 
     try:
@@ -1808,7 +1830,8 @@ def generate_business_report(
                      for i, item in enumerate(outline)]
             outline_context = "Approved outline (use these headings verbatim):\n" + "\n".join(lines) + "\n\n"
 
-        response = client.chat.completions.create(
+        raw = cached_chat_completion(
+            client,
             model=os.getenv("SIMULATION_MODEL", "gpt-4o-mini"),
             temperature=0.2,
             response_format={"type": "json_object"},
@@ -1840,7 +1863,6 @@ def generate_business_report(
                 },
             ],
         )
-        raw = (response.choices[0].message.content or "").strip()
         parsed = json.loads(raw) if raw else {}
         if not isinstance(parsed, dict):
             raise RuntimeError("Report generation returned invalid JSON.")
@@ -3285,6 +3307,16 @@ def build_report_pdf(
         return _build_legacy_report_pdf(report, simulation)
 
 
+def report_renderer_version(export_format: str) -> str:
+    if export_format != "pdf":
+        return REPORT_RENDERER_VERSION
+    try:
+        renderer = report_generator._select_pdf_renderer()
+    except Exception:
+        renderer = "unavailable"
+    return f"{REPORT_RENDERER_VERSION}:{renderer}"
+
+
 def build_report_pdf_from_html(
     html: str,
 ) -> bytes:
@@ -0,0 +1,179 @@
+"""
+Short-lived in-process cache of authenticated principals.
+
+get_current_user() and get_or_create_access_profile() run on nearly every
+request. Their rows are cached here as column snapshots:
+
+- users are keyed by a sha256 of the bearer token, so a cached user is only
+  ever served to the exact token that was validated for it
+- access profiles are keyed by user id
+
+Entries live for PRINCIPAL_CACHE_TTL_SECONDS (0 disables the cache), and at
+most PRINCIPAL_CACHE_MAX_ENTRIES of each kind are kept, least recently used
+first out. Changes to a user's role, status or password must call
+invalidate_principal() so the next request reloads from the database. Other
+worker processes keep serving their copy until the TTL runs out.
+
+Snapshots are attached to the caller's session with merge(load=False). That
+emits no SELECT, and routes can still modify and commit the instances as if
+they had been queried.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+PRINCIPAL_CACHE_TTL_SECONDS = max(0.0, float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30")))
+PRINCIPAL_CACHE_MAX_ENTRIES = max(0, int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "4096")))
+
+
+def token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def snapshot(instance: Any) -> Dict[str, Any]:
+    """Column values of a loaded ORM instance."""
+    return {
+        attr.key: copy.deepcopy(getattr(instance, attr.key))
+        for attr in sa_inspect(type(instance)).column_attrs
+    }
+
+
+def attach(session: Session, model: type, values: Dict[str, Any]) -> Any:
+    """A persistent ``model`` instance in ``session`` built from a snapshot, without a SELECT."""
+    key = identity_key(model, values["id"])
+    existing = session.identity_map.get(key)
+    if existing is not None:
+        return existing
+    instance = model(**copy.deepcopy(values))
+    make_transient_to_detached(instance)
+    return session.merge(instance, load=False)
+
+
+class PrincipalCache:
+    def __init__(
+        self,
+        ttl_seconds: float = PRINCIPAL_CACHE_TTL_SECONDS,
+        max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._users: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._profiles: "OrderedDict[int, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._counters = {
+            "user_hits": 0,
+            "user_misses": 0,
+            "profile_hits": 0,
+            "profile_misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def _get(self, entries: OrderedDict, key: Any, kind: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                entries.move_to_end(key)
+                self._counters[f"{kind}_hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del entries[key]
+            self._counters[f"{kind}_misses"] += 1
+            return None
+
+    def _put(self, entries: OrderedDict, key: Any, values: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            entries[key] = (self._clock() + self.ttl_seconds, values)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def get_user(self, token: str) -> Optional[Dict[str, Any]]:
+        return self._get(self._users, token_cache_key(token), "user")
+
+    def put_user(self, token: str, values: Dict[str, Any]) -> None:
+        self._put(self._users, token_cache_key(token), values)
+
+    def get_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._get(self._profiles, user_id, "profile")
+
+    def put_profile(self, user_id: int, values: Dict[str, Any]) -> None:
+        self._put(self._profiles, user_id, values)
+
+    def invalidate(self, user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+        """Drop every cached token and the profile of the given user."""
+        with self._lock:
+            stale = [
+                key
+                for key, (_, values) in self._users.items()
+                if (user_id is not None and values.get("id") == user_id) or (email and values.get("email") == email)
+            ]
+            for key in stale:
+                del self._users[key]
+            if user_id is not None:
+                self._profiles.pop(user_id, None)
+            self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._counters["user_hits"] + self._counters["profile_hits"]
+            lookups = hits + self._counters["user_misses"] + self._counters["profile_misses"]
+            return {
+                **self._counters,
+                "enabled": self.enabled,
+                "users": len(self._users),
+                "profiles": len(self._profiles),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+            self._profiles.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+_shared_cache: PrincipalCache | None = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Return the process-wide cache configured from PRINCIPAL_CACHE_* settings."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = PrincipalCache()
+        return _shared_cache
+
+
+def invalidate_principal(user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+    get_principal_cache().invalidate(user_id=user_id, email=email)
+
+
+def principal_cache_stats() -> Dict[str, Any]:
+    return get_principal_cache().stats()
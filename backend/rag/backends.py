@@ -0,0 +1,88 @@
+"""
+Pluggable retrieval backends.
+
+tools.retrieve_docs / retrieve_docs_batch and rag.retrieval.retrieve_context
+search through the backend named by RETRIEVAL_BACKEND:
+
+- pgvector (default): document_chunks in Postgres, queries embedded with
+  OpenAI (tools.py)
+- local: a memory-mapped float32 matrix plus a JSONL metadata sidecar on
+  disk, searched exactly with NumPy (rag/local_index.py); needs no database
+  and, with the local hashed embedding, no OpenAI key
+
+A backend takes query texts and returns one list of retrieve_docs()-shaped
+dicts (chunk_text, document_id, similarity, source, metadata and optionally
+embedding) per query.
+"""
+
+import importlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+RETRIEVAL_BACKEND = os.environ.get("RETRIEVAL_BACKEND", "pgvector").strip().lower()
+RETRIEVAL_FILTER_KEYS = ("document_type", "user_id", "source", "metadata")
+
+# Modules that register the built-in backends when imported.
+_BUILTIN_BACKEND_MODULES = {"pgvector": "tools", "local": "rag.local_index"}
+
+
+class RetrievalBackend(ABC):
+    """Base class for retrieval backends."""
+
+    name = "base"
+
+    @abstractmethod
+    def search(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+        **options: Any,
+    ) -> List[List[Dict[str, Any]]]:
+        """One list of retrieve_docs()-shaped results per query."""
+
+
+def check_retrieval_filters(filters: Optional[Dict[str, Any]]) -> None:
+    """Raise ValueError for unknown filter keys, so a misspelt tenant filter fails loudly."""
+    for key in filters or {}:
+        if key not in RETRIEVAL_FILTER_KEYS:
+            raise ValueError(f"Unsupported retrieval filter '{key}'. Use one of {RETRIEVAL_FILTER_KEYS}.")
+
+
+_factories: Dict[str, Callable[[], RetrievalBackend]] = {}
+_instances: Dict[str, RetrievalBackend] = {}
+_instances_lock = threading.Lock()
+
+
+def register_retrieval_backend(name: str):
+    """Decorator registering a zero-argument backend factory (or class) under name."""
+    def decorator(factory: Callable[[], RetrievalBackend]):
+        _factories[name] = factory
+        return factory
+
+    return decorator
+
+
+def get_retrieval_backend(name: Optional[str] = None) -> RetrievalBackend:
+    """Return the shared backend instance for name (default RETRIEVAL_BACKEND)."""
+    name = (name or RETRIEVAL_BACKEND).strip().lower()
+    backend = _instances.get(name)
+    if backend is not None:
+        return backend
+    with _instances_lock:
+        if name not in _instances:
+            if name not in _factories and name in _BUILTIN_BACKEND_MODULES:
+                importlib.import_module(_BUILTIN_BACKEND_MODULES[name])
+            if name not in _factories:
+                raise ValueError(f"Unknown retrieval backend '{name}'. Registered: {sorted(_factories)}")
+            _instances[name] = _factories[name]()
+        return _instances[name]
+
+
+def reset_retrieval_backends() -> None:
+    """Drop cached backend instances (e.g. after rebuilding a local index)."""
+    with _instances_lock:
+        _instances.clear()
@@ -0,0 +1,229 @@
+"""
+Bulk directory ingestion with concurrency, checkpointing and resume.
+
+Walks a directory and ingests every supported file through
+rag.ingestion.ingest_document_with_stats, several documents at a time.
+Each finished file is checkpointed to a JSON manifest (path -> fingerprint,
+status, document id, chunk counts), so a crashed or interrupted run picks up
+where it stopped: files already recorded as done with the same fingerprint
+are skipped, failed ones are retried. A document that was cut off mid-way is
+reconciled chunk by chunk on the next run.
+
+Concurrency:
+- --workers documents are processed at once (embedding calls and DB writes
+  overlap across documents)
+- --extraction-workers sets DOCUMENT_EXTRACTION_WORKERS, the process pool that
+  PDF page ranges are sharded across
+- RAG connections are checked out per batch write and returned while pages
+  are extracted and embedded, so --workers does not need a pool that large
+- DOCUMENT_EXTRACTION_MAX_QUEUE is raised to at least --workers times the
+  extraction workers, so every document's page-range jobs fit in the queue
+
+Usage (from backend/):
+    python -m rag.bulk_ingest ../data/study_material_agentics
+    python -m rag.bulk_ingest ../data/docs --workers 8 --extraction-workers 4 --manifest /tmp/docs.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".ingest_manifest.json"
+
+
+class IngestManifest:
+    """JSON checkpoint of per-file ingestion results, rewritten atomically."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+
+    def is_done(self, relative_path: str, fingerprint: str) -> bool:
+        entry = self.files.get(relative_path)
+        return bool(entry) and entry.get("status") == "done" and entry.get("fingerprint") == fingerprint
+
+    def record(self, relative_path: str, **entry: Any) -> None:
+        with self._lock:
+            self.files[relative_path] = {**entry, "updated_at": datetime.now(timezone.utc).isoformat()}
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=self.path.parent, delete=False, encoding="utf-8") as handle:
+            json.dump({"version": 1, "files": self.files}, handle, indent=2, sort_keys=True)
+            temp_name = handle.name
+        os.replace(temp_name, self.path)
+
+
+def discover_files(root: Path, extensions: Iterable[str], exclude: Iterable[Path] = ()) -> List[Path]:
+    """Supported files under root in a stable order; hidden files are skipped."""
+    extensions = {extension.lower() for extension in extensions}
+    excluded = {Path(path).resolve() for path in exclude}
+    return sorted(
+        path
+        for path in root.rglob("*")
+        if path.is_file()
+        and path.suffix.lower() in extensions
+        and not any(part.startswith(".") for part in path.relative_to(root).parts)
+        and path.resolve() not in excluded
+    )
+
+
+def run_bulk_ingest(
+    root: Path,
+    ingest: Callable[..., Dict[str, Any]],
+    fingerprint: Callable[[str], str],
+    manifest: IngestManifest,
+    extensions: Iterable[str],
+    workers: int = 4,
+    tokens_used: Callable[[], int] = lambda: 0,
+    progress: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """
+    Ingest every supported file under root that the manifest has not
+    completed and return run totals with throughput rates.
+    """
+    root = Path(root)
+    started = time.perf_counter()
+    tokens_before = tokens_used()
+    totals = {
+        "discovered": 0,
+        "resumed": 0,
+        "created": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "failed": 0,
+        "chunks_total": 0,
+        "chunks_added": 0,
+        "embeddings_computed": 0,
+    }
+
+    pending = []
+    for path in discover_files(root, extensions, exclude=[manifest.path]):
+        totals["discovered"] += 1
+        relative_path = path.relative_to(root).as_posix()
+        file_fingerprint = fingerprint(str(path))
+        if manifest.is_done(relative_path, file_fingerprint):
+            totals["resumed"] += 1
+        else:
+            pending.append((path, relative_path, file_fingerprint))
+    progress(f"{totals['discovered']} files found, {totals['resumed']} already ingested, {len(pending)} to process")
+
+    def ingest_one(path: Path, relative_path: str) -> Dict[str, Any]:
+        return ingest(
+            local_file_path=str(path),
+            title=relative_path.rsplit(".", 1)[0],
+            source_type=path.suffix.lower().lstrip("."),
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="bulk-ingest") as executor:
+        futures = {
+            executor.submit(ingest_one, path, relative_path): (relative_path, file_fingerprint)
+            for path, relative_path, file_fingerprint in pending
+        }
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                relative_path, file_fingerprint = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    totals["failed"] += 1
+                    manifest.record(relative_path, fingerprint=file_fingerprint, status="failed", error=str(exc))
+                    progress(f"[{done}/{len(futures)}] FAILED {relative_path}: {exc}")
+                    continue
+                dedup = result.get("dedup", {})
+                totals[result["status"]] += 1
+                if result["status"] != "unchanged":
+                    totals["chunks_total"] += dedup.get("chunks_total", 0)
+                totals["chunks_added"] += dedup.get("chunks_added", 0)
+                totals["embeddings_computed"] += dedup.get("embeddings_computed", 0)
+                manifest.record(
+                    relative_path,
+                    fingerprint=file_fingerprint,
+                    status="done",
+                    document_id=str(result["document_id"]),
+                    result=result["status"],
+                    dedup=dedup,
+                )
+                progress(f"[{done}/{len(futures)}] {result['status']} {relative_path} ({dedup.get('chunks_total', 0)} chunks)")
+        except KeyboardInterrupt:
+            # Completed files are already in the manifest; the next run resumes from there.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    processed = totals["created"] + totals["updated"] + totals["unchanged"]
+    totals["embedding_tokens"] = tokens_used() - tokens_before
+    totals["seconds"] = round(elapsed, 2)
+    totals["docs_per_second"] = round(processed / elapsed, 3)
+    totals["chunks_per_second"] = round(totals["chunks_total"] / elapsed, 2)
+    totals["embed_tokens_per_second"] = round(totals["embedding_tokens"] / elapsed, 1)
+    return totals
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--workers", type=int, default=4, help="documents ingested concurrently")
+    parser.add_argument("--extraction-workers", type=int, default=None, help="PDF extraction processes")
+    parser.add_argument("--manifest", type=Path, default=None, help=f"checkpoint file (default: <directory>/{MANIFEST_NAME})")
+    args = parser.parse_args(argv)
+
+    root = args.directory.resolve()
+    if not root.is_dir():
+        parser.error(f"{args.directory} is not a directory")
+
+    # Pool sizes are read at import time, so set them before loading the pipeline.
+    if args.extraction_workers:
+        os.environ["DOCUMENT_EXTRACTION_WORKERS"] = str(args.extraction_workers)
+    extraction_workers = max(1, int(os.environ.get("DOCUMENT_EXTRACTION_WORKERS", "2")))
+    max_queue = max(args.workers * extraction_workers, int(os.environ.get("DOCUMENT_EXTRACTION_MAX_QUEUE", "16")))
+    os.environ["DOCUMENT_EXTRACTION_MAX_QUEUE"] = str(max_queue)
+
+    from rag import ingestion
+    from rag.extraction_pool import shutdown_extraction_pool
+
+    manifest = IngestManifest(args.manifest or root / MANIFEST_NAME)
+    try:
+        totals = run_bulk_ingest(
+            root,
+            ingest=ingestion.ingest_document_with_stats,
+            fingerprint=ingestion.file_fingerprint,
+            manifest=manifest,
+            extensions=ingestion.ALLOWED_EXTENSIONS,
+            workers=args.workers,
+            tokens_used=ingestion.embedding_tokens_used,
+        )
+    finally:
+        shutdown_extraction_pool()
+
+    print(
+        f"\n{totals['created']} created, {totals['updated']} updated, {totals['unchanged']} unchanged, "
+        f"{totals['resumed']} resumed, {totals['failed']} failed in {totals['seconds']:.1f}s"
+    )
+    print(
+        f"{totals['docs_per_second']:.2f} docs/s, {totals['chunks_per_second']:.1f} chunks/s, "
+        f"{totals['embed_tokens_per_second']:.0f} embed tokens/s "
+        f"({totals['chunks_added']} chunks embedded or reused, {totals['embedding_tokens']} tokens)"
+    )
+    print(f"Manifest: {manifest.path}")
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    raise SystemExit(main())
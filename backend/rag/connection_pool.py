@@ -0,0 +1,230 @@
+"""
+Shared psycopg2 connection pool for the RAG paths (tools.py, rag/retrieval.py,
+rag/ingestion.py).
+
+The pool is thread-safe, bounded by PG_POOL_MAX_CONN and created lazily on
+first checkout. When every connection is in use, checkout blocks for up to
+PG_POOL_WAIT_TIMEOUT_SECONDS and then raises PoolTimeoutError instead of
+failing immediately. Connections idle for longer than
+PG_POOL_PING_IDLE_SECONDS are pinged on checkout and replaced if dead;
+broken connections are discarded on return.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.environ.get("DATABASE_URL")
+PG_POOL_MIN_CONN = max(0, int(os.environ.get("PG_POOL_MIN_CONN", os.environ.get("RAG_DB_POOL_MIN_CONN", "1"))))
+PG_POOL_MAX_CONN = max(1, PG_POOL_MIN_CONN, int(os.environ.get("PG_POOL_MAX_CONN", "10")))
+PG_POOL_WAIT_TIMEOUT_SECONDS = float(os.environ.get("PG_POOL_WAIT_TIMEOUT_SECONDS", "10"))
+PG_POOL_PING_IDLE_SECONDS = float(os.environ.get("PG_POOL_PING_IDLE_SECONDS", "30"))
+
+
+class PoolTimeoutError(psycopg2.pool.PoolError):
+    """Raised when no connection frees up within the wait timeout."""
+
+
+def build_database_url(value: str) -> str:
+    """Append TCP keepalive and connect-timeout options to a Postgres URL."""
+    if "?" in value:
+        return value + "&keepalives=1&keepalives_idle=30&keepalives_interval=10&keepalives_count=5&connect_timeout=10"
+    return value + "?keepalives=1&keepalives_idle=30&keepalives_interval=10&keepalives_count=5&connect_timeout=10"
+
+
+class SharedConnectionPool:
+    def __init__(
+        self,
+        dsn: str,
+        minconn: int = PG_POOL_MIN_CONN,
+        maxconn: int = PG_POOL_MAX_CONN,
+        wait_timeout: float = PG_POOL_WAIT_TIMEOUT_SECONDS,
+        ping_idle_seconds: float = PG_POOL_PING_IDLE_SECONDS,
+    ):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.wait_timeout = wait_timeout
+        self.ping_idle_seconds = ping_idle_seconds
+        self._last_returned: Dict[int, float] = {}
+        self._pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+        self._init_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._counters = {
+            "checkouts": 0,
+            "in_use": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "discarded": 0,
+            "pings": 0,
+            "failed_pings": 0,
+            "wait_seconds_total": 0.0,
+        }
+
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        if self._pool is None:
+            with self._init_lock:
+                if self._pool is None:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(self.minconn, self.maxconn, self.dsn)
+                    logger.info(f"Shared database pool created (min={self.minconn}, max={self.maxconn})")
+        return self._pool
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self._counters[name] += amount
+
+    def _acquire_slot(self, timeout: float) -> None:
+        if self._slots.acquire(blocking=False):
+            return
+        self._count("waits")
+        started = time.monotonic()
+        acquired = self._slots.acquire(timeout=timeout)
+        self._count("wait_seconds_total", time.monotonic() - started)
+        if not acquired:
+            self._count("timeouts")
+            raise PoolTimeoutError(
+                f"No database connection became available within {timeout:.1f}s "
+                f"(pool max={self.maxconn})"
+            )
+
+    def _is_alive(self, conn) -> bool:
+        if conn.closed:
+            return False
+        with self._stats_lock:
+            last_returned = self._last_returned.get(id(conn))
+        if last_returned is not None and time.monotonic() - last_returned < self.ping_idle_seconds:
+            return True
+        self._count("pings")
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            conn.rollback()
+            return True
+        except (psycopg2.DatabaseError, psycopg2.InterfaceError) as e:
+            self._count("failed_pings")
+            logger.warning(f"Discarding dead pooled connection: {e}")
+            return False
+
+    def _checkout_live_connection(self):
+        pool = self._get_pool()
+        # Every idle connection may be stale after a network blip; the last
+        # attempt always opens a fresh one.
+        for _ in range(self.maxconn + 1):
+            conn = pool.getconn()
+            if self._is_alive(conn):
+                return conn
+            self._forget(conn)
+            self._count("discarded")
+            pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Could not obtain a live database connection")
+
+    def _forget(self, conn) -> None:
+        with self._stats_lock:
+            self._last_returned.pop(id(conn), None)
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        Check out a live connection, waiting up to timeout seconds for a free
+        slot. Connections idle past ping_idle_seconds are pinged first.
+        """
+        self._acquire_slot(self.wait_timeout if timeout is None else timeout)
+        try:
+            conn = self._checkout_live_connection()
+        except Exception:
+            self._slots.release()
+            raise
+        self._count("checkouts")
+        self._count("in_use")
+        return conn
+
+    def putconn(self, conn, close: bool = False) -> None:
+        """Return a connection; broken or mid-transaction connections are reset or discarded."""
+        if conn is None:
+            return
+        try:
+            if not close:
+                if conn.closed:
+                    close = True
+                elif conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    close = True
+                elif conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+        except Exception:
+            close = True
+        if close:
+            self._count("discarded")
+            self._forget(conn)
+        else:
+            with self._stats_lock:
+                self._last_returned[id(conn)] = time.monotonic()
+        try:
+            self._get_pool().putconn(conn, close=close)
+        finally:
+            self._count("in_use", -1)
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        conn = self.getconn(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self) -> None:
+        with self._init_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            counters = dict(self._counters)
+        counters["wait_seconds_total"] = round(counters["wait_seconds_total"], 4)
+        pool = self._pool
+        return {
+            **counters,
+            "idle": len(getattr(pool, "_pool", [])) if pool is not None else 0,
+            "max_connections": self.maxconn,
+            "wait_timeout_seconds": self.wait_timeout,
+        }
+
+
+_shared_pool: Optional[SharedConnectionPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_pool() -> SharedConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                if not DATABASE_URL:
+                    raise ValueError("DATABASE_URL environment variable not set")
+                _shared_pool = SharedConnectionPool(build_database_url(DATABASE_URL))
+    return _shared_pool
+
+
+@contextmanager
+def pooled_connection(timeout: Optional[float] = None):
+    """Context manager yielding a connection from the shared pool."""
+    with get_pool().connection(timeout=timeout) as conn:
+        yield conn
+
+
+def pool_stats() -> Dict[str, float]:
+    if _shared_pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_shared_pool.stats()}
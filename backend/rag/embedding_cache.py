@@ -0,0 +1,175 @@
+"""
+Shared embedding cache keyed by (model, sha256(text)).
+
+Two tiers:
+- an in-process LRU bounded by EMBEDDING_CACHE_MAX_ENTRIES
+- an optional SQLite file at EMBEDDING_CACHE_PATH that survives restarts
+
+Vectors are held as float32 arrays to keep the LRU compact.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_MAX_ENTRIES = max(0, int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "5000")))
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", "").strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES, path: str = EMBEDDING_CACHE_PATH):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "persistent_hits": 0, "misses": 0, "evictions": 0}
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS embeddings (
+                        model TEXT NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        vector BLOB NOT NULL,
+                        PRIMARY KEY (model, content_hash)
+                    )
+                    """
+                )
+                self._db.commit()
+                logger.info(f"Persistent embedding cache enabled at {path}")
+            except sqlite3.Error as e:
+                logger.error(f"Persistent embedding cache unavailable: {e}")
+                self._db = None
+
+    def _remember(self, key: tuple, vector: array) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        keys = [(model, content_hash(text)) for text in texts]
+        found: Dict[tuple, array] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing and self._db is not None:
+                try:
+                    placeholders = ",".join("?" for _ in missing)
+                    rows = self._db.execute(
+                        f"SELECT content_hash, vector FROM embeddings WHERE model = ? AND content_hash IN ({placeholders})",
+                        [model, *[key[1] for key in missing]],
+                    ).fetchall()
+                except sqlite3.Error as e:
+                    logger.warning(f"Persistent embedding cache read failed: {e}")
+                    rows = []
+                for digest, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[(model, digest)] = vector
+                    self._remember((model, digest), vector)
+                    self._counters["persistent_hits"] += 1
+
+            results = []
+            for key in keys:
+                vector = found.get(key)
+                if vector is None:
+                    self._counters["misses"] += 1
+                    results.append(None)
+                else:
+                    self._counters["hits"] += 1
+                    results.append(vector.tolist())
+            return results
+
+    def put_many(self, model: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        rows = []
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = (model, content_hash(text))
+                vector = array("f", embedding)
+                self._remember(key, vector)
+                rows.append((model, key[1], vector.tobytes()))
+            if rows and self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (model, content_hash, vector) VALUES (?, ?, ?)",
+                        rows,
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Persistent embedding cache write failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._db is not None,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache()
+    return _cache
+
+
+def cached_embeddings(
+    texts: Sequence[str],
+    model: str,
+    embed: Callable[[List[str]], List[List[float]]],
+) -> List[List[float]]:
+    """
+    Return embeddings for texts, calling embed() only for uncached texts.
+
+    Duplicate texts in one call are embedded once.
+    """
+    cache = get_embedding_cache()
+    results = cache.get_many(model, texts)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, results) if vector is None))
+    if missing:
+        fresh = embed(missing)
+        cache.put_many(model, missing, fresh)
+        by_text = dict(zip(missing, fresh))
+        results = [vector if vector is not None else list(by_text[text]) for text, vector in zip(texts, results)]
+    return results
+
+
+def embedding_cache_stats() -> Dict[str, float]:
+    return get_embedding_cache().stats()
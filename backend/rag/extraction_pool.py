@@ -0,0 +1,337 @@
+"""
+Bounded process pool for document text extraction.
+
+pdfplumber and docx2txt parsing is CPU-bound and holds the GIL, so running it
+inside an async handler (or even a thread) stalls the whole worker. Uploads
+and RAG ingestion submit extraction functions here instead:
+
+- at most DOCUMENT_EXTRACTION_WORKERS jobs run at once, in child processes
+- at most DOCUMENT_EXTRACTION_MAX_QUEUE more wait; beyond that submissions are
+  rejected with ExtractionQueueFullError (the page-range jobs of
+  iter_pdf_pages wait for a slot instead, up to the job timeout)
+- each job gets DOCUMENT_EXTRACTION_TIMEOUT_SECONDS; on timeout the worker
+  processes are recycled so a runaway parse cannot hold a slot forever
+- DOCUMENT_EXTRACTION_MAX_PAGES is the page limit the upload endpoints hand
+  to extraction functions as their max_pages guard; other callers pass their
+  own limit (None = no limit)
+
+PDFs are extracted page-range by page-range: iter_pdf_pages shards the page
+range across the workers and yields pages back in order.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pdfplumber
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_EXTRACTION_WORKERS = max(1, int(os.environ.get("DOCUMENT_EXTRACTION_WORKERS", "2")))
+DOCUMENT_EXTRACTION_MAX_QUEUE = max(0, int(os.environ.get("DOCUMENT_EXTRACTION_MAX_QUEUE", "16")))
+DOCUMENT_EXTRACTION_TIMEOUT_SECONDS = float(os.environ.get("DOCUMENT_EXTRACTION_TIMEOUT_SECONDS", "60"))
+DOCUMENT_EXTRACTION_MAX_PAGES = max(1, int(os.environ.get("DOCUMENT_EXTRACTION_MAX_PAGES", "300")))
+DOCUMENT_EXTRACTION_START_METHOD = os.environ.get("DOCUMENT_EXTRACTION_START_METHOD", "spawn")
+DOCUMENT_EXTRACTION_PDF_PAGES_PER_JOB = max(1, int(os.environ.get("DOCUMENT_EXTRACTION_PDF_PAGES_PER_JOB", "16")))
+
+# Set in pool worker processes so nested calls extract sequentially instead of
+# submitting back to a pool.
+_in_worker = False
+
+
+class DocumentTooLargeError(ValueError):
+    """Raised by extraction functions when a document exceeds the page limit."""
+
+
+class ExtractionQueueFullError(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class ExtractionTimeoutError(TimeoutError):
+    """Raised when an extraction job runs past its timeout."""
+
+
+def check_page_limit(page_count: int, max_pages: Optional[int]) -> None:
+    if max_pages is not None and page_count > max_pages:
+        raise DocumentTooLargeError(f"Document has {page_count} pages; the limit is {max_pages}.")
+
+
+def _mark_worker() -> None:
+    global _in_worker
+    _in_worker = True
+
+
+def count_pdf_pages(file_path: str) -> int:
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pdf_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) of a PDF; pages without text come back as ''."""
+    with pdfplumber.open(file_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages[start:stop]]
+
+
+def join_pages(pages: Sequence[str], separator: str = "\n") -> Tuple[str, List[int]]:
+    """Join page texts and return the character offset where each page starts."""
+    offsets: List[int] = []
+    position = 0
+    for index, page in enumerate(pages):
+        if index:
+            position += len(separator)
+        offsets.append(position)
+        position += len(page)
+    return separator.join(pages), offsets
+
+
+def page_for_offset(page_offsets: Sequence[int], offset: int) -> int:
+    """1-based page number containing a character offset of join_pages output."""
+    return max(1, bisect.bisect_right(page_offsets, offset))
+
+
+class DocumentExtractionPool:
+    def __init__(
+        self,
+        workers: int = DOCUMENT_EXTRACTION_WORKERS,
+        max_queue: int = DOCUMENT_EXTRACTION_MAX_QUEUE,
+        timeout_seconds: float = DOCUMENT_EXTRACTION_TIMEOUT_SECONDS,
+        max_pages: int = DOCUMENT_EXTRACTION_MAX_PAGES,
+        start_method: str = DOCUMENT_EXTRACTION_START_METHOD,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.max_pages = max_pages
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._stats_lock = threading.Lock()
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "pool_restarts": 0,
+            "seconds_total": 0.0,
+        }
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self._counters[name] += amount
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_mark_worker,
+                )
+            return self._executor
+
+    def _restart_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Kill the worker processes of a pool that has a runaway job."""
+        with self._executor_lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        # ProcessPoolExecutor cannot cancel a running task, so terminate its
+        # processes directly; queued jobs on this pool fail with BrokenProcessPool.
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._count("pool_restarts")
+        logger.warning("Document extraction pool restarted after a timeout")
+
+    def _submit(
+        self, fn: Callable[..., Any], args: tuple, kwargs: dict, *, wait: bool = False, optional: bool = False
+    ) -> Optional[tuple]:
+        """
+        Take a slot and submit the job. wait blocks up to the job timeout for
+        a free slot; optional returns None instead of raising when none is free.
+        """
+        acquired = self._slots.acquire(timeout=self.timeout_seconds) if wait else self._slots.acquire(blocking=False)
+        if not acquired:
+            if optional:
+                return None
+            self._count("rejected")
+            raise ExtractionQueueFullError(
+                f"Document extraction queue is full ({self.workers} running, {self.max_queue} waiting)."
+            )
+        self._count("submitted")
+        self._count("in_flight")
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(time.monotonic(), failed=True)
+            raise
+        return executor, future, time.monotonic()
+
+    def _release(self, started: float, *, failed: bool) -> None:
+        self._count("in_flight", -1)
+        self._count("failed" if failed else "completed")
+        self._count("seconds_total", time.monotonic() - started)
+        self._slots.release()
+
+    def _on_timeout(self, executor: ProcessPoolExecutor, future: Future, timeout: float) -> ExtractionTimeoutError:
+        self._count("timeouts")
+        if not future.cancel():
+            self._restart_executor(executor)
+        return ExtractionTimeoutError(f"Document extraction did not finish within {timeout:.0f}s.")
+
+    def _result(self, submission: tuple, timeout: float) -> Any:
+        executor, future, started = submission
+        failed = True
+        try:
+            result = future.result(timeout=timeout)
+            failed = False
+            return result
+        except FutureTimeoutError:
+            raise self._on_timeout(executor, future, timeout) from None
+        finally:
+            self._release(started, failed=failed)
+
+    def run_sync(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) in a worker process and wait for the result."""
+        timeout = self.timeout_seconds if timeout is None else timeout
+        return self._result(self._submit(fn, args, kwargs), timeout)
+
+    def iter_pdf_pages(
+        self,
+        file_path: str,
+        max_pages: Optional[int] = None,
+        pages_per_job: int = DOCUMENT_EXTRACTION_PDF_PAGES_PER_JOB,
+    ) -> Iterator[str]:
+        """
+        Yield the text of every PDF page in order.
+
+        The page range is split into jobs of at most pages_per_job pages (fewer
+        for short documents, so every worker gets a share) and up to `workers`
+        jobs run at once. Only the jobs in flight are held in memory.
+
+        A busy pool slows the document down rather than failing it: with no
+        job in flight the next one waits for a slot, otherwise more are only
+        submitted while slots are free. Waiting only while holding no slot
+        keeps concurrent documents from blocking each other for good.
+
+        PDFs longer than max_pages are rejected; None means no limit.
+        """
+        page_count = self._result(self._submit(count_pdf_pages, (file_path,), {}, wait=True), self.timeout_seconds)
+        check_page_limit(page_count, max_pages)
+        if page_count == 0:
+            return
+        per_job = max(1, min(pages_per_job, math.ceil(page_count / self.workers)))
+        ranges = deque((start, min(start + per_job, page_count)) for start in range(0, page_count, per_job))
+        in_flight: deque = deque()
+
+        def fill() -> None:
+            while ranges and len(in_flight) < self.workers:
+                submission = self._submit(
+                    extract_pdf_page_range, (file_path, *ranges[0]), {}, wait=not in_flight, optional=bool(in_flight)
+                )
+                if submission is None:
+                    return
+                ranges.popleft()
+                in_flight.append(submission)
+
+        try:
+            fill()
+            while in_flight:
+                pages = self._result(in_flight.popleft(), self.timeout_seconds)
+                fill()
+                yield from pages
+        finally:
+            # The consumer stopped early or a job failed: drop the rest.
+            while in_flight:
+                _, future, started = in_flight.popleft()
+                future.cancel()
+                self._release(started, failed=True)
+
+    def extract_pdf_pages(self, file_path: str, max_pages: Optional[int] = None) -> List[str]:
+        return list(self.iter_pdf_pages(file_path, max_pages=max_pages))
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Async variant of run_sync that never blocks the event loop."""
+        timeout = self.timeout_seconds if timeout is None else timeout
+        executor, future, started = self._submit(fn, args, kwargs)
+        failed = True
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+            failed = False
+            return result
+        except asyncio.TimeoutError:
+            raise self._on_timeout(executor, future, timeout) from None
+        finally:
+            self._release(started, failed=failed)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counters = dict(self._counters)
+        counters["seconds_total"] = round(counters["seconds_total"], 4)
+        return {
+            **counters,
+            "queued": max(0, counters["in_flight"] - self.workers),
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.timeout_seconds,
+            "max_pages": self.max_pages,
+        }
+
+
+_shared_pool: Optional[DocumentExtractionPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> DocumentExtractionPool:
+    """Return the process-wide extraction pool, creating it on first use."""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = DocumentExtractionPool()
+    return _shared_pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def extract_pdf_pages(file_path: str, max_pages: Optional[int] = None) -> List[str]:
+    """
+    Page texts of a PDF, in order. Sharded across the shared pool from the
+    main process; sequential when already running inside a pool worker.
+    """
+    if _in_worker:
+        page_count = count_pdf_pages(file_path)
+        check_page_limit(page_count, max_pages)
+        return extract_pdf_page_range(file_path, 0, page_count)
+    return get_extraction_pool().extract_pdf_pages(file_path, max_pages=max_pages)
+
+
+def extraction_pool_stats() -> Dict[str, Any]:
+    if _shared_pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_shared_pool.stats()}
@@ -1,20 +1,24 @@
 # backend/rag/ingestions.py 
 
 import os
+import hashlib
 import logging
+import threading
 import time
+from bisect import bisect_right
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 from supabase import create_client, Client
-import psycopg2
-from psycopg2 import pool, DatabaseError, OperationalError
-from psycopg2.extras import execute_values
+from psycopg2.extras import Json, execute_values
 import openai
-import pdfplumber
 import docx2txt
 
+from rag.connection_pool import get_pool
+from rag.embedding_cache import cached_embeddings, content_hash
+from rag.extraction_pool import extract_pdf_pages, get_extraction_pool
 
 
 try:
@@ -55,12 +59,9 @@ SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 DATABASE_URL = os.environ.get("DATABASE_URL")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-RAG_DB_POOL_MIN_CONN = max(1, int(os.environ.get("RAG_DB_POOL_MIN_CONN", "1")))
-RAG_DB_POOL_MAX_CONN = max(RAG_DB_POOL_MIN_CONN, int(os.environ.get("RAG_DB_POOL_MAX_CONN", "2")))
 
 supabase: Client | None = None
 openai_client = None
-connection_pool = None
 
 
 def _require_env(name: str, value: str | None) -> str:
@@ -69,12 +70,6 @@ def _require_env(name: str, value: str | None) -> str:
     return value
 
 
-def _build_database_url(value: str) -> str:
-    if "?" in value:
-        return value + "&keepalives=1&keepalives_idle=30&keepalives_interval=10&keepalives_count=5&connect_timeout=10"
-    return value + "?keepalives=1&keepalives_idle=30&keepalives_interval=10&keepalives_count=5&connect_timeout=10"
-
-
 def _get_supabase_client() -> Client:
     global supabase
     if supabase is None:
@@ -93,15 +88,8 @@ def _get_openai_client():
 
 
 def _get_connection_pool():
-    global connection_pool
-    if connection_pool is None:
-        connection_pool = psycopg2.pool.SimpleConnectionPool(
-            RAG_DB_POOL_MIN_CONN,
-            RAG_DB_POOL_MAX_CONN,
-            _build_database_url(_require_env("DATABASE_URL", DATABASE_URL)),
-        )
-        logger.info("Database connection pool created for ingestion")
-    return connection_pool
+    """Ingestion shares the process-wide pool with retrieval and tools.py."""
+    return get_pool()
 
 
 
@@ -109,40 +97,10 @@ def _get_connection_pool():
 
 def get_db_connection():
     """
-    Get a connection from the pool and verify it's alive.
-    If the connection is broken, discard it and try again up to 3 times.
+    Get a live connection from the shared pool.
+    The pool pings idle connections on checkout and replaces dead ones.
     """
-    max_attempts = 3
-    for attempt in range(max_attempts):
-        conn = None
-        try:
-            conn = _get_connection_pool().getconn()
-            
-            # simple query test to verify connection
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
-                cur.fetchone()
-            return conn
-        
-        except (DatabaseError, OperationalError) as e:
-            logger.warning(f"Database connection test failed (attempt {attempt+1}/{max_attempts}): {e}")
-            
-            
-            if conn:
-                # Release the broken connection and have the pool discard it
-                _get_connection_pool().putconn(conn, close=True)
-            
-            if attempt == max_attempts - 1:
-                logger.error("Max attempts reached, could not get a valid database connection")
-                raise
-            
-            # Exponential backoff before retry
-            time.sleep(0.5 * (2 ** attempt))
-    
-    raise Exception("Failed to obtain a valid database connection")
-
-
-
+    return _get_connection_pool().getconn()
 
 
 def release_db_connection(conn, close=False):
@@ -157,6 +115,27 @@ def release_db_connection(conn, close=False):
             logger.error(f"Error releasing DB connection: {e}")
 
 
+@contextmanager
+def pooled_cursor():
+    """
+    Check out a connection for one transaction: commit on success, roll back
+    on error, and return the connection to the pool either way.
+    """
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            yield cur
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_db_connection(conn)
+
+
+ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt', '.md', '.rtf'}
+
+
 def validate_file(file_path: str, max_size_mb: int = 100) -> Tuple[bool, str]:
     """
     Validate file existence, size, and extension.
@@ -170,23 +149,16 @@ def validate_file(file_path: str, max_size_mb: int = 100) -> Tuple[bool, str]:
     if file_size_mb > max_size_mb:
         return False, f"File size {file_size_mb:.2f} MB exceeds limit of {max_size_mb} MB"
     
-    allowed_extensions = {'.pdf', '.doc', '.docx', '.txt', '.md', '.rtf'}
-    if path.suffix.lower() not in allowed_extensions:
-        return False, f"Unsupported file type: {path.suffix}. Allowed: {allowed_extensions}"
+    if path.suffix.lower() not in ALLOWED_EXTENSIONS:
+        return False, f"Unsupported file type: {path.suffix}. Allowed: {ALLOWED_EXTENSIONS}"
     
     return True, ""
 
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from a PDF file using pdfplumber."""
-    text_pages = []
+def extract_text_from_pdf(file_path: str, max_pages: int | None = None) -> str:
+    """Extract text from a PDF file using pdfplumber, page ranges in parallel."""
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_pages.append(page_text)
-        return " ".join(text_pages)
+        return " ".join(page for page in extract_pdf_pages(file_path, max_pages=max_pages) if page)
     except Exception as e:
         logger.error(f"PDF extraction failed for {file_path}: {e}")
         raise
@@ -220,15 +192,16 @@ def extract_text_from_doc(file_path: str) -> str:
         raise
 
 
-def extract_text(file_path: str) -> str:
+def extract_text(file_path: str, max_pages: int | None = None) -> str:
     """
     Extract text based on file extension.
     Uses pdfplumber for PDFs, simple read for .txt/.md.
+    PDFs longer than max_pages are rejected.
     """
     path = Path(file_path)
     suffix = path.suffix.lower()
     if suffix == '.pdf':
-        text = extract_text_from_pdf(file_path)
+        text = extract_text_from_pdf(file_path, max_pages=max_pages)
     elif suffix == '.docx':
         text = extract_text_from_docx(file_path)
     elif suffix == '.doc':
@@ -241,6 +214,138 @@ def extract_text(file_path: str) -> str:
     return text
 
 
+INGEST_TEXT_BLOCK_CHARS = 64 * 1024
+# Page limit for ingested PDFs/DOCX; 0 = no limit. Uploads use DOCUMENT_EXTRACTION_MAX_PAGES instead.
+RAG_INGEST_MAX_PAGES = max(0, int(os.environ.get("RAG_INGEST_MAX_PAGES", "0"))) or None
+
+# (page number or None, text) as produced by iter_document_text.
+TextPiece = Tuple[Optional[int], str]
+# (chunk text, first page, last page); pages are None for non-PDF sources.
+PageChunk = Tuple[str, Optional[int], Optional[int]]
+
+
+def _iter_text_file_blocks(file_path: str) -> Iterator[str]:
+    block: List[str] = []
+    size = 0
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            block.append(line)
+            size += len(line)
+            if size >= INGEST_TEXT_BLOCK_CHARS:
+                yield "".join(block)
+                block, size = [], 0
+    if block:
+        yield "".join(block)
+
+
+def iter_document_text(file_path: str) -> Iterator[TextPiece]:
+    """
+    Yield the document text as whitespace-normalized (page, text) pieces.
+
+    PDF page ranges are extracted in parallel across the shared extraction pool
+    and yielded in page order with their 1-based page number; text files are
+    read in blocks, so only a few pieces are held in memory at once. DOC/DOCX
+    parsers have no streaming API and yield the whole text. Non-PDF pieces
+    carry no page number.
+    """
+    extraction_pool = get_extraction_pool()
+    suffix = Path(file_path).suffix.lower()
+    if suffix == '.pdf':
+        for page_number, page_text in enumerate(
+            extraction_pool.iter_pdf_pages(file_path, max_pages=RAG_INGEST_MAX_PAGES), 1
+        ):
+            normalized = " ".join(page_text.split())
+            if normalized:
+                yield page_number, normalized
+    elif suffix in ('.docx', '.doc'):
+        text = extraction_pool.run_sync(extract_text, file_path, max_pages=RAG_INGEST_MAX_PAGES)
+        if text:
+            yield None, text
+    else:
+        for block in _iter_text_file_blocks(file_path):
+            normalized = " ".join(block.split())
+            if normalized:
+                yield None, normalized
+
+
+def iter_chunks(
+    pieces: Iterable[TextPiece],
+    chunk_size: int = 1000,
+    overlap: int = 200,
+    window_chunks: int = 8,
+) -> Iterator[PageChunk]:
+    """
+    Incremental version of chunk_text_semantic over a stream of (page, text)
+    pieces, yielding (chunk, page_start, page_end).
+
+    Text is buffered until it spans about window_chunks chunks; everything but
+    the last chunk is emitted and the last chunk seeds the next window, so
+    chunk boundaries and overlap match what the splitter would produce inside
+    the window. The buffer keeps the offset where each page begins so every
+    chunk can be traced back to the pages it was cut from.
+    """
+    buffer = ""
+    # Parallel lists: page_offsets[i] is where page_numbers[i] starts in buffer.
+    page_offsets: List[int] = []
+    page_numbers: List[Optional[int]] = []
+    window = chunk_size * window_chunks
+
+    def page_at(offset: int) -> Optional[int]:
+        return page_numbers[max(0, bisect_right(page_offsets, offset) - 1)] if page_numbers else None
+
+    def split() -> List[Tuple[str, int]]:
+        located = []
+        cursor = 0
+        for chunk in chunk_text_semantic(buffer, chunk_size=chunk_size, overlap=overlap):
+            start = buffer.find(chunk, cursor)
+            if start < 0:
+                start = cursor
+            located.append((chunk, start))
+            cursor = start + 1
+        return located
+
+    def with_pages(chunk: str, start: int) -> PageChunk:
+        return chunk, page_at(start), page_at(start + max(0, len(chunk) - 1))
+
+    for page, piece in pieces:
+        if buffer:
+            buffer += " "
+        page_offsets.append(len(buffer))
+        page_numbers.append(page)
+        buffer += piece
+        if len(buffer) < window:
+            continue
+        located = split()
+        if not located:
+            buffer, page_offsets, page_numbers = "", [], []
+            continue
+        for chunk, start in located[:-1]:
+            yield with_pages(chunk, start)
+        last, last_start = located[-1]
+        carried = [(0, page_at(last_start))] + [
+            (offset - last_start, number)
+            for offset, number in zip(page_offsets, page_numbers)
+            if last_start < offset < last_start + len(last)
+        ]
+        buffer = last
+        page_offsets = [offset for offset, _ in carried]
+        page_numbers = [number for _, number in carried]
+    if buffer:
+        for chunk, start in split():
+            yield with_pages(chunk, start)
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    batch: List = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 def chunk_text_semantic(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
     """
     Split text into semantically coherent chunks.
@@ -289,32 +394,55 @@ else:
 
 
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+_embedding_tokens = 0
+_embedding_tokens_lock = threading.Lock()
+
+
+def embedding_tokens_used() -> int:
+    """Total prompt tokens billed for embeddings by this process."""
+    return _embedding_tokens
+
+
 @retry_decorator
+def _embed_texts(texts: List[str]) -> List[List[float]]:
+    global _embedding_tokens
+    response = _get_openai_client().embeddings.create(
+        model=EMBEDDING_MODEL,
+        input=texts
+    )
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        with _embedding_tokens_lock:
+            _embedding_tokens += usage.total_tokens
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
 def generate_embeddings_batch(texts: List[str], batch_size: int = 100) -> List[List[float]]:
     """
     Generate embeddings for a list of texts in batches using the new OpenAI client.
+    Chunks already in the shared embedding cache are not sent to OpenAI.
     """
-    all_embeddings = []
+    def embed_missing(missing: List[str]) -> List[List[float]]:
+        all_embeddings = []
 
-    for i in range(0, len(texts), batch_size):
+        for i in range(0, len(missing), batch_size):
 
-        batch = texts[i:i+batch_size]
+            batch = missing[i:i+batch_size]
 
-        try:
-            response = _get_openai_client().embeddings.create(
-                model="text-embedding-3-small",
-                input=batch
-            )
+            try:
+                all_embeddings.extend(_embed_texts(batch))
+                logger.debug(f"Generated embeddings for batch {i//batch_size + 1}")
 
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
-            logger.debug(f"Generated embeddings for batch {i//batch_size + 1}")
-        
-        except Exception as e:
-            logger.error(f"OpenAI embedding error for batch: {e}")
-            raise
+            except Exception as e:
+                logger.error(f"OpenAI embedding error for batch: {e}")
+                raise
+
+        return all_embeddings
 
-    return all_embeddings
+    return cached_embeddings(texts, EMBEDDING_MODEL, embed_missing)
 
 
 
@@ -326,11 +454,10 @@ def upload_to_storage(local_file_path: str, source_type: str) -> str:
     file_name = Path(local_file_path).name
     storage_path = f"{source_type}/{file_name}"
 
-    with open(local_file_path, "rb") as f:
-        data = f.read()
-
     try:
-        _get_supabase_client().storage.from_(bucket).upload(storage_path, data)
+        # Pass the open file so the client streams it instead of holding it in memory.
+        with open(local_file_path, "rb") as f:
+            _get_supabase_client().storage.from_(bucket).upload(storage_path, f)
     except Exception as e:
         logger.error(f"Supabase upload error: {e}")
         raise Exception(f"Supabase upload failed: {e}")
@@ -345,87 +472,303 @@ def upload_to_storage(local_file_path: str, source_type: str) -> str:
 
 # Main Ingestion Function
 
-def ingest_document(local_file_path: str, title: str, source_type: str = "pdf") -> str:
-    """
-    Full ingestion pipeline with robust database connection handling.
-    """
-    start_time = time.time()
-    conn = None
-    cur = None
+INGEST_BATCH_SIZE = max(1, int(os.environ.get("INGEST_BATCH_SIZE", "64")))
+FINGERPRINT_BLOCK_BYTES = 1024 * 1024
 
-    try:
-        
-        is_valid, error_msg = validate_file(local_file_path)
-
-        if not is_valid:
-            raise ValueError(error_msg)
-
-        
-        storage_path = upload_to_storage(local_file_path, source_type)
+# Additive columns for fingerprints and chunk hashes. The RAG tables live
+# outside the SQLAlchemy models, so they are migrated here on first ingest.
+INGESTION_SCHEMA_STATEMENTS = (
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS fingerprint TEXT",
+    "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS content_hash TEXT",
+    "CREATE INDEX IF NOT EXISTS ix_documents_fingerprint ON documents (fingerprint)",
+    "CREATE INDEX IF NOT EXISTS ix_document_chunks_content_hash ON document_chunks (content_hash)",
+)
+_ingestion_schema_ready = False
+_ingestion_schema_lock = threading.Lock()
+
+
+def file_fingerprint(file_path: str) -> str:
+    """sha256 of the file bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(FINGERPRINT_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def ensure_ingestion_schema(conn) -> None:
+    global _ingestion_schema_ready
+    if _ingestion_schema_ready:
+        return
+    with _ingestion_schema_lock:
+        if _ingestion_schema_ready:
+            return
+        with conn.cursor() as cur:
+            for statement in INGESTION_SCHEMA_STATEMENTS:
+                cur.execute(statement)
+        conn.commit()
+        _ingestion_schema_ready = True
 
-       
-        conn = get_db_connection()  # now returns a tested connection
-        cur = conn.cursor()
 
+def _find_document(cur, fingerprint: str, title: str, source_type: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return (document_id, stored fingerprint) of an earlier ingestion of this
+    content, or failing that of a document with the same title and source
+    type; (None, None) for a new document.
+    """
+    cur.execute("SELECT id, fingerprint FROM documents WHERE fingerprint = %s LIMIT 1", (fingerprint,))
+    row = cur.fetchone()
+    if row is None:
         cur.execute(
+            "SELECT id, fingerprint FROM documents WHERE title = %s AND source_type = %s LIMIT 1",
+            (title, source_type),
+        )
+        row = cur.fetchone()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def _load_chunk_hashes(cur, document_id) -> Dict[str, List[str]]:
+    """Map content hash -> chunk row ids for a document, backfilling missing hashes."""
+    cur.execute(
+        """
+        SELECT id::text, content_hash, CASE WHEN content_hash IS NULL THEN chunk_text END
+        FROM document_chunks
+        WHERE document_id = %s
+        """,
+        (document_id,)
+    )
+    by_hash: Dict[str, List[str]] = {}
+    backfill = []
+    for row_id, chunk_hash, chunk_text in cur.fetchall():
+        if chunk_hash is None:
+            chunk_hash = content_hash(chunk_text or "")
+            backfill.append((row_id, chunk_hash))
+        by_hash.setdefault(chunk_hash, []).append(row_id)
+    if backfill:
+        execute_values(
+            cur,
             """
-            INSERT INTO documents (title, file_path, source_type)
-            VALUES (%s, %s, %s)
-            RETURNING id
+            UPDATE document_chunks AS dc SET content_hash = v.content_hash
+            FROM (VALUES %s) AS v(id, content_hash)
+            WHERE dc.id::text = v.id
             """,
-            (title, storage_path, source_type)
+            backfill
         )
+    return by_hash
+
+
+def _stored_embeddings(cur, hashes: Iterable[str]) -> Dict[str, str]:
+    """Embeddings already stored for any of these chunk hashes, in any document."""
+    hashes = list(set(hashes))
+    if not hashes:
+        return {}
+    cur.execute(
+        """
+        SELECT DISTINCT ON (content_hash) content_hash, embedding::text
+        FROM document_chunks
+        WHERE content_hash = ANY(%s) AND embedding IS NOT NULL
+        """,
+        (hashes,)
+    )
+    return dict(cur.fetchall())
 
-        document_id = cur.fetchone()[0]
+
+def _discard_partial_document(conn, document_id) -> None:
+    """Remove a document whose chunks were only partly committed."""
+    try:
+        with conn.cursor() as cleanup:
+            cleanup.execute("DELETE FROM document_chunks WHERE document_id = %s", (document_id,))
+            cleanup.execute("DELETE FROM documents WHERE id = %s", (document_id,))
         conn.commit()
-        logger.info(f"Document metadata inserted with ID: {document_id}")
+    except Exception as e:
+        logger.error(f"Could not remove partially ingested document {document_id}: {e}")
+        conn.rollback()
 
-       
-        text = extract_text(local_file_path)
-        logger.info(f"Text extracted, length: {len(text)} characters")
 
-       
-        chunks = chunk_text_semantic(text)
-        logger.info(f"Text split into {len(chunks)} chunks")
+def _chunk_metadata(page_start: Optional[int], page_end: Optional[int]) -> dict:
+    """Citation metadata stored with each chunk; empty for sources without pages."""
+    if page_start is None:
+        return {}
+    return {"page_start": page_start, "page_end": page_end}
 
-        
-        embeddings = generate_embeddings_batch(chunks)
-        logger.info(f"Generated {len(embeddings)} embeddings")
 
+def ingest_document_with_stats(local_file_path: str, title: str, source_type: str = "pdf") -> Dict[str, Any]:
+    """
+    Streaming, incremental ingestion pipeline: page stream -> incremental
+    chunker -> embedding micro-batches -> inserts committed per batch.
+
+    The file fingerprint (sha256) identifies content already ingested, in which
+    case nothing is uploaded, extracted or embedded. Otherwise an earlier
+    document with the same title and source type is updated in place: chunks
+    whose content hash is already stored are kept (only their position is
+    refreshed), new chunks are embedded and inserted, and chunks no longer
+    present are deleted. Embeddings stored for identical chunks of other
+    documents are reused instead of calling OpenAI.
+
+    A pooled connection is checked out per database step and returned before
+    extraction and embedding calls, so a slow document does not pin one.
+
+    Returns {"document_id", "status", "message", "dedup"} where status is
+    "created", "updated" or "unchanged".
+    """
+    start_time = time.time()
+    document_id = None
+    is_new_document = False
+    stats = {
+        "chunks_total": 0,
+        "chunks_unchanged": 0,
+        "chunks_added": 0,
+        "chunks_removed": 0,
+        "embeddings_computed": 0,
+        "embeddings_reused": 0,
+    }
+
+    try:
         
-        chunk_records = [
-            (document_id, chunk, embedding, idx)
-            for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings))
-        ]
+        is_valid, error_msg = validate_file(local_file_path)
 
-        # Insert chunks
-        execute_values(
-            cur,
-            """
-            INSERT INTO document_chunks (document_id, chunk_text, embedding, chunk_index)
-            VALUES %s
-            """,
-            chunk_records
-        )
-        conn.commit()
-        logger.info(f"Inserted {len(chunk_records)} chunks into database")
+        if not is_valid:
+            raise ValueError(error_msg)
+
+        fingerprint = file_fingerprint(local_file_path)
+
+        with pooled_cursor() as cur:
+            ensure_ingestion_schema(cur.connection)
+            document_id, stored_fingerprint = _find_document(cur, fingerprint, title, source_type)
+            unchanged = document_id is not None and stored_fingerprint == fingerprint
+            if unchanged:
+                cur.execute("SELECT count(*) FROM document_chunks WHERE document_id = %s", (document_id,))
+                stats["chunks_total"] = stats["chunks_unchanged"] = cur.fetchone()[0]
+
+        if unchanged:
+            elapsed = time.time() - start_time
+            return {
+                "document_id": document_id,
+                "status": "unchanged",
+                "message": (f"Document '{title}' is unchanged since its last ingestion. "
+                            f"ID: {document_id}, Chunks: 0 new, Time: {elapsed:.2f}s"),
+                "dedup": stats,
+            }
+
+        storage_path = upload_to_storage(local_file_path, source_type)
+
+        is_new_document = document_id is None
+        with pooled_cursor() as cur:
+            if is_new_document:
+                cur.execute(
+                    """
+                    INSERT INTO documents (title, file_path, source_type)
+                    VALUES (%s, %s, %s)
+                    RETURNING id
+                    """,
+                    (title, storage_path, source_type)
+                )
+                document_id = cur.fetchone()[0]
+                existing_chunks: Dict[str, List[str]] = {}
+            else:
+                existing_chunks = _load_chunk_hashes(cur, document_id)
+        if is_new_document:
+            logger.info(f"Document metadata inserted with ID: {document_id}")
+        else:
+            logger.info(f"Re-ingesting changed document {document_id}")
+
+        chunk_count = 0
+        chunks = iter_chunks(iter_document_text(local_file_path))
+        for batch_number, batch in enumerate(_batched(chunks, INGEST_BATCH_SIZE), 1):
+            kept = []
+            added = []
+            for offset, (chunk, page_start, page_end) in enumerate(batch):
+                chunk_hash = content_hash(chunk)
+                metadata = Json(_chunk_metadata(page_start, page_end))
+                row_ids = existing_chunks.get(chunk_hash)
+                if row_ids:
+                    kept.append((row_ids.pop(), chunk_count + offset, metadata))
+                else:
+                    added.append((chunk, chunk_hash, chunk_count + offset, metadata))
+
+            stored: Dict[str, str] = {}
+            if added:
+                with pooled_cursor() as cur:
+                    stored = _stored_embeddings(cur, [chunk_hash for _, chunk_hash, _, _ in added])
+            to_embed = [chunk for chunk, chunk_hash, _, _ in added if chunk_hash not in stored]
+            fresh = iter(generate_embeddings_batch(to_embed) if to_embed else [])
+            rows = [
+                (document_id, chunk, stored.get(chunk_hash) or next(fresh), index, metadata, chunk_hash)
+                for chunk, chunk_hash, index, metadata in added
+            ]
+
+            # Commit per batch so early chunks are searchable while later pages are processed.
+            with pooled_cursor() as cur:
+                if kept:
+                    execute_values(
+                        cur,
+                        """
+                        UPDATE document_chunks AS dc SET chunk_index = v.chunk_index, metadata = v.metadata
+                        FROM (VALUES %s) AS v(id, chunk_index, metadata)
+                        WHERE dc.id::text = v.id
+                        """,
+                        kept,
+                        template="(%s, %s::int, %s::jsonb)"
+                    )
+                if rows:
+                    execute_values(
+                        cur,
+                        """
+                        INSERT INTO document_chunks (document_id, chunk_text, embedding, chunk_index, metadata, content_hash)
+                        VALUES %s
+                        """,
+                        rows
+                    )
+            stats["embeddings_computed"] += len(to_embed)
+            stats["embeddings_reused"] += len(added) - len(to_embed)
+            chunk_count += len(batch)
+            stats["chunks_unchanged"] += len(kept)
+            stats["chunks_added"] += len(added)
+            logger.info(
+                f"Batch {batch_number}: {len(added)} new, {len(kept)} unchanged chunks ({chunk_count} total)"
+            )
+
+        removed = [row_id for row_ids in existing_chunks.values() for row_id in row_ids]
+        with pooled_cursor() as cur:
+            if removed:
+                cur.execute(
+                    "DELETE FROM document_chunks WHERE document_id = %s AND id::text = ANY(%s)",
+                    (document_id, removed)
+                )
+            # The fingerprint is written last, so an interrupted run is never mistaken for a complete one.
+            cur.execute(
+                "UPDATE documents SET fingerprint = %s, file_path = %s WHERE id = %s",
+                (fingerprint, storage_path, document_id)
+            )
+        stats["chunks_total"] = chunk_count
+        stats["chunks_removed"] = len(removed)
 
         elapsed = time.time() - start_time
-        return (f"Document '{title}' ingested successfully. "
-                f"ID: {document_id}, Chunks: {len(chunks)}, Time: {elapsed:.2f}s")
+        return {
+            "document_id": document_id,
+            "status": "created" if is_new_document else "updated",
+            "message": (f"Document '{title}' ingested successfully. "
+                        f"ID: {document_id}, Chunks: {chunk_count}, New: {stats['chunks_added']}, "
+                        f"Unchanged: {stats['chunks_unchanged']}, Removed: {stats['chunks_removed']}, "
+                        f"Time: {elapsed:.2f}s"),
+            "dedup": stats,
+        }
 
     except Exception as e:
         logger.error(f"Ingestion failed: {e}")
-        if conn:
-            conn.rollback()
+        # A failed update keeps the previous version; the next run reconciles it by chunk hash.
+        if is_new_document and document_id is not None:
+            conn = get_db_connection()
+            try:
+                _discard_partial_document(conn, document_id)
+            finally:
+                release_db_connection(conn)
         raise
 
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            release_db_connection(conn)  # return healthy connection to pool
-        logger.debug("Database connection released")
+
+def ingest_document(local_file_path: str, title: str, source_type: str = "pdf") -> str:
+    """Ingest a document and return a human-readable summary."""
+    return ingest_document_with_stats(local_file_path, title, source_type)["message"]
 
 
 
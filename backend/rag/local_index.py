@@ -0,0 +1,347 @@
+"""
+Offline vector index: memory-mapped float32 embeddings + JSONL metadata.
+
+Layout of LOCAL_INDEX_DIR:
+- manifest.json    {"version", "dim", "rows", "embedding_model"}
+- embeddings.f32   rows x dim float32, L2-normalized, row-major
+- chunks.jsonl     one {"chunk_text", "document_id", "source", "metadata",
+                   "document_type", "user_id"} object per row
+
+The matrix is opened with np.memmap, so loading is zero-copy and pages are
+read on demand. Search is exact cosine top-k: queries are scored against the
+matrix in blocks of LOCAL_INDEX_BLOCK_ROWS with one matmul per block and the
+running top-k is merged with argpartition. Appends write rows first and bump
+manifest.json last, so readers never see a half-written row.
+
+hashed_embeddings is a deterministic, dependency-free embedding (signed
+feature hashing of words and word bigrams). It only captures lexical
+overlap, but lets the whole retrieval path run without OpenAI.
+
+Usage (from backend/):
+    python -m rag.local_index build ../data/docs
+    python -m rag.local_index build ../data/docs --embedding openai
+    python -m rag.local_index export           # copy pgvector document_chunks
+    python -m rag.local_index search "pricing for SMEs" --top-k 5
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from rag.backends import RetrievalBackend, check_retrieval_filters, register_retrieval_backend
+
+logger = logging.getLogger(__name__)
+
+LOCAL_INDEX_DIR = os.environ.get("LOCAL_INDEX_DIR", "local_index").strip()
+LOCAL_EMBEDDING_DIM = max(8, int(os.environ.get("LOCAL_EMBEDDING_DIM", "256")))
+LOCAL_INDEX_BLOCK_ROWS = max(1, int(os.environ.get("LOCAL_INDEX_BLOCK_ROWS", "65536")))
+HASHED_EMBEDDING_PREFIX = "local-hash-"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def hashed_embedding_model(dim: int = LOCAL_EMBEDDING_DIM) -> str:
+    return f"{HASHED_EMBEDDING_PREFIX}{dim}"
+
+
+def hashed_embeddings(texts: Sequence[str], dim: int = LOCAL_EMBEDDING_DIM) -> np.ndarray:
+    """L2-normalized (len(texts), dim) float32 feature-hash embeddings."""
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = _TOKEN_PATTERN.findall((text or "").lower())
+        features = tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            matrix[row, digest % dim] += 1.0 if digest >> 63 else -1.0
+    return _normalize(matrix)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12)
+
+
+def _matches(row: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Same semantics as tools._filter_clause, evaluated in Python."""
+    for key, value in filters.items():
+        if value is None:
+            continue
+        if key in ("document_type", "user_id"):
+            allowed = value if isinstance(value, (list, tuple, set)) else [value]
+            if row.get(key) not in allowed:
+                return False
+        elif key == "source":
+            if str(value).lower() not in str(row.get("source") or "").lower():
+                return False
+        else:
+            metadata = row.get("metadata") or {}
+            if any(metadata.get(name) != expected for name, expected in value.items()):
+                return False
+    return True
+
+
+class LocalVectorIndex:
+    def __init__(self, directory: str, dim: Optional[int] = None, embedding_model: Optional[str] = None):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        manifest_path = self.directory / "manifest.json"
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        else:
+            dim = dim or LOCAL_EMBEDDING_DIM
+            manifest = {"version": 1, "dim": dim, "rows": 0, "embedding_model": embedding_model or hashed_embedding_model(dim)}
+        self.dim = int(manifest["dim"])
+        self.rows = int(manifest["rows"])
+        self.embedding_model = manifest["embedding_model"]
+        self.chunks: List[Dict[str, Any]] = []
+        # Bytes of chunks.jsonl covered by the manifest; anything after is an interrupted append.
+        self._chunks_bytes = 0
+        chunks_path = self.directory / "chunks.jsonl"
+        if chunks_path.exists():
+            with open(chunks_path, "rb") as f:
+                for line in f:
+                    if len(self.chunks) >= self.rows:
+                        break
+                    self.chunks.append(json.loads(line))
+                    self._chunks_bytes += len(line)
+        self.matrix = self._map()
+
+    def _map(self) -> np.ndarray:
+        if not self.rows:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(self.directory / "embeddings.f32", dtype=np.float32, mode="r", shape=(self.rows, self.dim))
+
+    def _write_manifest(self) -> None:
+        manifest = {"version": 1, "dim": self.dim, "rows": self.rows, "embedding_model": self.embedding_model}
+        with tempfile.NamedTemporaryFile("w", dir=self.directory, delete=False, encoding="utf-8") as handle:
+            json.dump(manifest, handle)
+            temp_name = handle.name
+        os.replace(temp_name, self.directory / "manifest.json")
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """Embed queries with the same model the index was built with."""
+        if self.embedding_model.startswith(HASHED_EMBEDDING_PREFIX):
+            return hashed_embeddings(queries, self.dim)
+        from tools import generate_embeddings
+
+        return _normalize(np.asarray(generate_embeddings(list(queries), model=self.embedding_model)))
+
+    def add(self, chunks: Sequence[Dict[str, Any]], embeddings) -> None:
+        """Append chunks (dicts with chunk_text, document_id, source, ...) and their embeddings."""
+        matrix = _normalize(np.asarray(embeddings, dtype=np.float32).reshape(len(chunks), -1))
+        if matrix.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match index dimension {self.dim}.")
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / "embeddings.f32", "r+b" if self.rows else "wb") as f:
+                # Drop any tail left by an interrupted append before writing.
+                f.truncate(self.rows * self.dim * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(matrix).tobytes())
+            rows = [
+                {
+                    "chunk_text": chunk.get("chunk_text", ""),
+                    "document_id": chunk.get("document_id"),
+                    "source": chunk.get("source"),
+                    "metadata": chunk.get("metadata") or {},
+                    "document_type": chunk.get("document_type"),
+                    "user_id": chunk.get("user_id"),
+                }
+                for chunk in chunks
+            ]
+            lines = b"".join((json.dumps(row) + "\n").encode("utf-8") for row in rows)
+            with open(self.directory / "chunks.jsonl", "r+b" if self._chunks_bytes else "wb") as f:
+                f.truncate(self._chunks_bytes)
+                f.seek(0, os.SEEK_END)
+                f.write(lines)
+            self._chunks_bytes += len(lines)
+            self.rows += len(rows)
+            self.chunks.extend(rows)
+            self._write_manifest()
+            self.matrix = self._map()
+
+    def search_vectors(
+        self,
+        query_matrix: np.ndarray,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        """Exact cosine top-k for each row of query_matrix."""
+        queries = _normalize(np.atleast_2d(query_matrix))
+        check_retrieval_filters(filters)
+        # The matrix is swapped after chunks are appended, so its length bounds a consistent view.
+        matrix, chunks = self.matrix, self.chunks
+        total = len(matrix)
+        allowed = None
+        if filters:
+            allowed = np.fromiter((_matches(chunks[row], filters) for row in range(total)), dtype=bool, count=total)
+
+        count = len(queries)
+        best_scores = np.empty((count, 0), dtype=np.float32)
+        best_rows = np.empty((count, 0), dtype=np.int64)
+        for start in range(0, total, LOCAL_INDEX_BLOCK_ROWS):
+            block = matrix[start:start + LOCAL_INDEX_BLOCK_ROWS]
+            scores = queries @ block.T
+            if allowed is not None:
+                scores[:, ~allowed[start:start + len(block)]] = -np.inf
+            rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, rows], axis=1)
+            if best_scores.shape[1] > top_k:
+                keep = np.argpartition(-best_scores, top_k - 1, axis=1)[:, :top_k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        results: List[List[Dict[str, Any]]] = []
+        for scores, rows in zip(best_scores, best_rows):
+            docs = []
+            for position in np.argsort(-scores, kind="stable"):
+                if not np.isfinite(scores[position]):
+                    continue
+                chunk = chunks[rows[position]]
+                doc = {
+                    "chunk_text": chunk["chunk_text"],
+                    "document_id": chunk["document_id"],
+                    "similarity": float(scores[position]),
+                    "source": chunk["source"],
+                    "metadata": chunk["metadata"],
+                }
+                if include_embeddings:
+                    doc["embedding"] = matrix[rows[position]].tolist()
+                docs.append(doc)
+            results.append(docs)
+        return results
+
+
+class LocalIndexBackend(RetrievalBackend):
+    name = "local"
+
+    def __init__(self, directory: str = LOCAL_INDEX_DIR):
+        self.index = LocalVectorIndex(directory)
+
+    def search(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+        **options: Any,
+    ) -> List[List[Dict[str, Any]]]:
+        # ANN options (ef_search, probes, prefilter) do not apply to exact search.
+        if not queries:
+            return []
+        return self.index.search_vectors(self.index.embed_queries(queries), top_k, filters, include_embeddings)
+
+
+register_retrieval_backend("local")(LocalIndexBackend)
+
+
+def _embed_for_index(index: LocalVectorIndex, texts: List[str]):
+    if index.embedding_model.startswith(HASHED_EMBEDDING_PREFIX):
+        return hashed_embeddings(texts, index.dim)
+    from rag.ingestion import generate_embeddings_batch
+
+    return generate_embeddings_batch(texts)
+
+
+def build_from_directory(index: LocalVectorIndex, root: Path, batch_size: int = 256) -> int:
+    """Chunk every supported file under root into the index; returns chunks added."""
+    from rag.ingestion import ALLOWED_EXTENSIONS, _batched, iter_chunks, iter_document_text
+
+    added = 0
+    for path in sorted(p for p in root.rglob("*") if p.is_file() and p.suffix.lower() in ALLOWED_EXTENSIONS):
+        relative = path.relative_to(root).as_posix()
+        for batch in _batched(iter_chunks(iter_document_text(str(path))), batch_size):
+            chunks = [
+                {
+                    "chunk_text": chunk,
+                    "document_id": relative,
+                    "source": relative,
+                    "metadata": {"page_start": page_start, "page_end": page_end} if page_start else {},
+                    "document_type": path.suffix.lower().lstrip("."),
+                }
+                for chunk, page_start, page_end in batch
+            ]
+            index.add(chunks, _embed_for_index(index, [chunk["chunk_text"] for chunk in chunks]))
+            added += len(chunks)
+        logger.info(f"Indexed {relative} ({index.rows} rows total)")
+    return added
+
+
+def export_from_pgvector(index: LocalVectorIndex, batch_size: int = 1000) -> int:
+    """Copy document_chunks (with their stored embeddings) into the index."""
+    from rag.connection_pool import pooled_connection
+
+    added = 0
+    with pooled_connection() as conn:
+        with conn.cursor(name="local_index_export") as cur:
+            cur.itersize = batch_size
+            cur.execute(
+                """
+                SELECT chunk_text::text, document_id::text, source::text, metadata,
+                       document_type::text, user_id::text, embedding::text
+                FROM public.document_chunks
+                WHERE embedding IS NOT NULL
+                """
+            )
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                chunks = [
+                    dict(zip(("chunk_text", "document_id", "source", "metadata", "document_type", "user_id"), row[:6]))
+                    for row in rows
+                ]
+                index.add(chunks, [json.loads(row[6]) for row in rows])
+                added += len(rows)
+        conn.rollback()
+    return added
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build", "export", "search"])
+    parser.add_argument("target", nargs="?", help="directory to build from, or the search query")
+    parser.add_argument("--index-dir", default=LOCAL_INDEX_DIR)
+    parser.add_argument("--embedding", choices=["local", "openai"], default="local")
+    parser.add_argument("--dim", type=int, default=LOCAL_EMBEDDING_DIM)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "search":
+        index = LocalVectorIndex(args.index_dir)
+        for doc in index.search_vectors(index.embed_queries([args.target or ""]), args.top_k)[0]:
+            print(f"{doc['similarity']:.3f}  {doc['source']}  {doc['chunk_text'][:100]!r}")
+        return
+
+    if args.command == "export":
+        from rag.ingestion import EMBEDDING_MODEL
+
+        index = LocalVectorIndex(args.index_dir, dim=1536, embedding_model=EMBEDDING_MODEL)
+        added = export_from_pgvector(index)
+    else:
+        if not args.target:
+            parser.error("build needs a directory")
+        if args.embedding == "openai":
+            from rag.ingestion import EMBEDDING_MODEL
+
+            index = LocalVectorIndex(args.index_dir, dim=1536, embedding_model=EMBEDDING_MODEL)
+        else:
+            index = LocalVectorIndex(args.index_dir, dim=args.dim)
+        added = build_from_directory(index, Path(args.target))
+    print(f"Added {added} chunks; {index.rows} rows x {index.dim} dims ({index.embedding_model}) in {index.directory}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -9,6 +9,9 @@ import logging
 from typing import List, Optional, Tuple
 
 import openai
+
+from rag.embedding_cache import cached_embeddings
+
 try:
     import numpy as np
 except Exception:
@@ -63,16 +66,19 @@ def generate_embedding(
     model: str = "text-embedding-3-small"
 ) -> List[float]:
     """
-    Generate embedding vector for given text.
+    Generate embedding vector for given text, reusing cached vectors.
     """
-    try:
+    def embed(texts: List[str]) -> List[List[float]]:
         if client is None:
             raise ValueError("OPENAI_API_KEY environment variable not set")
         response = client.embeddings.create(
             model=model,
-            input=text
+            input=texts
         )
-        return response.data[0].embedding
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    try:
+        return cached_embeddings([text], model, embed)[0]
     except Exception as e:
         logger.error(f"Embedding generation failed: {e}")
         raise
@@ -92,6 +98,72 @@ def cosine_similarity(a, b) -> float:
     return numerator / (denom_a * denom_b)
 
 
+def _unit(vector):
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector] if norm else [0.0 for _ in vector]
+
+
+def _mmr_order_python(
+    query_embedding: List[float],
+    embeddings: List[List[float]],
+    top_k: int,
+    lambda_param: float
+) -> List[int]:
+    """Pure-Python MMR used when numpy is unavailable."""
+    query_vec = _unit(query_embedding)
+    vectors = [_unit(emb) for emb in embeddings]
+    relevance = [sum(q * x for q, x in zip(query_vec, vec)) for vec in vectors]
+    max_sim_to_selected = [0.0] * len(vectors)
+    remaining = set(range(len(vectors)))
+    selected = []
+
+    while remaining and len(selected) < top_k:
+        idx = max(
+            remaining,
+            key=lambda i: lambda_param * relevance[i] - (1 - lambda_param) * max_sim_to_selected[i]
+        )
+        selected.append(idx)
+        remaining.discard(idx)
+        chosen = vectors[idx]
+        for i in remaining:
+            sim = sum(a * b for a, b in zip(vectors[i], chosen))
+            if sim > max_sim_to_selected[i]:
+                max_sim_to_selected[i] = sim
+
+    return selected
+
+
+def _mmr_order_numpy(
+    query_embedding: List[float],
+    embeddings: List[List[float]],
+    top_k: int,
+    lambda_param: float
+) -> List[int]:
+    """
+    Vectorized MMR: the candidate matrix is normalized once, relevance is a
+    single matvec, and each pick updates a running max-similarity vector.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+    query_vec = np.asarray(query_embedding, dtype=np.float32)
+    query_vec /= np.linalg.norm(query_vec) + 1e-12
+
+    relevance = matrix @ query_vec
+    max_sim_to_selected = np.zeros(len(matrix), dtype=np.float32)
+    available = np.ones(len(matrix), dtype=bool)
+    selected = []
+
+    for _ in range(min(top_k, len(matrix))):
+        scores = lambda_param * relevance - (1 - lambda_param) * max_sim_to_selected
+        scores[~available] = -np.inf
+        idx = int(np.argmax(scores))
+        selected.append(idx)
+        available[idx] = False
+        np.maximum(max_sim_to_selected, matrix @ matrix[idx], out=max_sim_to_selected)
+
+    return selected
+
+
 def mmr_select(
     query_embedding: List[float],
     candidate_chunks: List[Tuple[str, List[float], str]],
@@ -113,61 +185,16 @@ def mmr_select(
         ...
     ]
     """
+    if not candidate_chunks or top_k <= 0:
+        return []
 
-    query_vec = np.array(query_embedding) if np is not None else query_embedding
-    candidates = [
-        (text, np.array(emb) if np is not None else emb, doc_id)
-        for text, emb, doc_id in candidate_chunks
-    ]
-
-    selected = []
-    selected_indices = []
-
-    # Compute similarity of each candidate to query
-    similarities = [
-        cosine_similarity(query_vec, emb)
-        for _, emb, _ in candidates
-    ]
-
-    while len(selected) < min(top_k, len(candidates)):
-
-        if len(selected) == 0:
-            idx = int(np.argmax(similarities)) if np is not None else max(
-                range(len(similarities)), key=lambda i: similarities[i]
-            )
-            selected.append(candidates[idx])
-            selected_indices.append(idx)
-            continue
-
-        mmr_scores = []
-
-        for i, (text_i, emb_i, doc_id_i) in enumerate(candidates):
-
-            if i in selected_indices:
-                mmr_scores.append(-1)
-                continue
-
-            relevance = cosine_similarity(query_vec, emb_i)
-
-            diversity = max(
-                cosine_similarity(emb_i, candidates[j][1])
-                for j in selected_indices
-            )
-
-            mmr_score = (
-                lambda_param * relevance
-                - (1 - lambda_param) * diversity
-            )
-
-            mmr_scores.append(mmr_score)
-
-        idx = int(np.argmax(mmr_scores)) if np is not None else max(
-            range(len(mmr_scores)), key=lambda i: mmr_scores[i]
-        )
-        selected.append(candidates[idx])
-        selected_indices.append(idx)
+    embeddings = [emb for _, emb, _ in candidate_chunks]
+    if np is not None:
+        order = _mmr_order_numpy(query_embedding, embeddings, top_k, lambda_param)
+    else:
+        order = _mmr_order_python(query_embedding, embeddings, top_k, lambda_param)
 
-    return [(text, doc_id) for text, _, doc_id in selected]
+    return [(candidate_chunks[i][0], candidate_chunks[i][2]) for i in order]
 
 
 
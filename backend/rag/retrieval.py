@@ -1,22 +1,31 @@
 
 
-import os
-import psycopg2
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+from rag import backends
+from rag.connection_pool import pooled_connection
 from rag.model import generate_embedding
-
-DATABASE_URL = os.environ.get("DATABASE_URL")
+from rag.vector_index import apply_search_params
 
 
 
 # RAG Retriever
 
-def retrieve_context(question: str, top_k: int = 5) -> List[Tuple[str, str]]:
+def retrieve_context(
+    question: str,
+    top_k: int = 5,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+) -> List[Tuple[str, str]]:
     """
     Returns top-k chunks for a question.
+    ef_search / probes tune ANN recall for this call (see rag/vector_index.py).
     Output: List of tuples (chunk_text, document_id)
     """
 
+    if backends.RETRIEVAL_BACKEND != "pgvector":
+        docs = backends.get_retrieval_backend().search([question], top_k, ef_search=ef_search, probes=probes)[0]
+        return [(doc["chunk_text"], doc["document_id"]) for doc in docs]
+
     # Generate embedding
     query_embedding = generate_embedding(question)
 
@@ -24,11 +33,9 @@ def retrieve_context(question: str, top_k: int = 5) -> List[Tuple[str, str]]:
     # Format: '[0.123,0.456,...]'
     embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
 
-
-    conn = psycopg2.connect(DATABASE_URL)
-
-    try:
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
+            apply_search_params(cur, ef_search=ef_search, probes=probes)
             cur.execute(
                 """
                 SELECT chunk_text, document_id
@@ -41,10 +48,7 @@ def retrieve_context(question: str, top_k: int = 5) -> List[Tuple[str, str]]:
 
             results = cur.fetchall()
 
-        return results
-
-    finally:
-        conn.close()
+    return results
 
 
 
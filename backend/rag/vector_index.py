@@ -0,0 +1,275 @@
+"""
+pgvector ANN index management for document_chunks.embedding.
+
+Retrieval ranks chunks by cosine distance (`<=>`), so the index uses
+vector_cosine_ops. Two index types are supported:
+
+- hnsw: best recall/latency trade-off, slower to build. Build parameters
+  VECTOR_INDEX_HNSW_M and VECTOR_INDEX_HNSW_EF_CONSTRUCTION; query-time
+  hnsw.ef_search (VECTOR_SEARCH_EF_SEARCH or per call)
+- ivfflat: fast to build, needs data before it is built. Build parameter
+  VECTOR_INDEX_IVFFLAT_LISTS (0 = rows/1000, or sqrt(rows) past 1M rows);
+  query-time ivfflat.probes (VECTOR_SEARCH_PROBES or per call)
+
+Filtered search (tools.retrieve_docs filters) is backed by B-tree indexes on
+user_id/document_type, a pg_trgm GIN index for the `source` substring match
+and a GIN index for metadata containment (ensure_filter_indexes). Searches
+scoped to a tenant (user_id) pre-filter through the B-tree index and rank
+the tenant's rows exactly, so their cost follows the tenant's corpus rather
+than the global one (VECTOR_SEARCH_TENANT_PREFILTER, default on).
+
+Indexes are built CONCURRENTLY so ingestion and search keep running.
+VECTOR_INDEX_MAINTENANCE_WORK_MEM and VECTOR_INDEX_BUILD_WORKERS tune the
+build session. The embedding column must have a fixed dimension
+(vector(1536)) for either index type.
+
+Usage (from backend/):
+    python -m rag.vector_index status
+    python -m rag.vector_index create --method hnsw --m 16 --ef-construction 64
+    python -m rag.vector_index create --method ivfflat --lists 200 --rebuild
+    python -m rag.vector_index drop --method ivfflat
+    python -m rag.vector_index filters
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_METHODS = ("hnsw", "ivfflat")
+VECTOR_INDEX_METHOD = os.environ.get("VECTOR_INDEX_METHOD", "hnsw").strip().lower()
+VECTOR_INDEX_HNSW_M = max(2, int(os.environ.get("VECTOR_INDEX_HNSW_M", "16")))
+VECTOR_INDEX_HNSW_EF_CONSTRUCTION = max(4, int(os.environ.get("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", "64")))
+VECTOR_INDEX_IVFFLAT_LISTS = max(0, int(os.environ.get("VECTOR_INDEX_IVFFLAT_LISTS", "0")))
+VECTOR_INDEX_MAINTENANCE_WORK_MEM = os.environ.get("VECTOR_INDEX_MAINTENANCE_WORK_MEM", "").strip()
+VECTOR_INDEX_BUILD_WORKERS = max(0, int(os.environ.get("VECTOR_INDEX_BUILD_WORKERS", "0")))
+# Query-time defaults; 0 keeps the server setting (pgvector defaults: ef_search 40, probes 1).
+VECTOR_SEARCH_EF_SEARCH = max(0, int(os.environ.get("VECTOR_SEARCH_EF_SEARCH", "0")))
+VECTOR_SEARCH_PROBES = max(0, int(os.environ.get("VECTOR_SEARCH_PROBES", "0")))
+VECTOR_SEARCH_TENANT_PREFILTER = os.getenv("VECTOR_SEARCH_TENANT_PREFILTER", "1").strip().lower() not in {"0", "false", "no"}
+
+VECTOR_OPCLASS = "vector_cosine_ops"
+
+FILTER_INDEX_STATEMENTS = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # user_id leads so tenant-only filters use it as well.
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_chunks_user_id_document_type "
+    "ON document_chunks (user_id, document_type)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_chunks_document_type ON document_chunks (document_type)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_chunks_source_trgm "
+    "ON document_chunks USING gin (source gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_chunks_metadata "
+    "ON document_chunks USING gin (metadata jsonb_path_ops)",
+)
+
+
+def index_name(method: str, table: str = "document_chunks", column: str = "embedding") -> str:
+    return f"ix_{table}_{column}_{method}"
+
+
+def ivfflat_lists_for(row_count: int) -> int:
+    """pgvector's guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond."""
+    if row_count <= 1_000_000:
+        return max(1, row_count // 1000)
+    return max(1, int(math.sqrt(row_count)))
+
+
+def build_index_sql(
+    method: str,
+    *,
+    table: str = "document_chunks",
+    column: str = "embedding",
+    m: int = VECTOR_INDEX_HNSW_M,
+    ef_construction: int = VECTOR_INDEX_HNSW_EF_CONSTRUCTION,
+    lists: int = 100,
+    concurrently: bool = True,
+) -> str:
+    if method == "hnsw":
+        options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+    elif method == "ivfflat":
+        options = f"lists = {int(lists)}"
+    else:
+        raise ValueError(f"Unknown vector index method '{method}'. Use one of {VECTOR_INDEX_METHODS}.")
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index_name(method, table, column)} "
+        f"ON {table} USING {method} ({column} {VECTOR_OPCLASS}) WITH ({options})"
+    )
+
+
+def apply_search_params(cur, ef_search: Optional[int] = None, probes: Optional[int] = None) -> None:
+    """
+    Set hnsw.ef_search / ivfflat.probes for the current transaction only.
+
+    None falls back to VECTOR_SEARCH_EF_SEARCH / VECTOR_SEARCH_PROBES; 0 keeps
+    the server setting. Settings are transaction-local, so they are undone
+    when the connection goes back to the pool.
+    """
+    ef_search = VECTOR_SEARCH_EF_SEARCH if ef_search is None else ef_search
+    probes = VECTOR_SEARCH_PROBES if probes is None else probes
+    settings = []
+    if ef_search:
+        settings += ["hnsw.ef_search", str(int(ef_search))]
+    if probes:
+        settings += ["ivfflat.probes", str(int(probes))]
+    if settings:
+        calls = ", ".join("set_config(%s, %s, true)" for _ in range(len(settings) // 2))
+        cur.execute(f"SELECT {calls}", settings)
+
+
+def vector_indexes(conn, table: str = "document_chunks") -> List[Dict[str, Any]]:
+    """
+    ANN indexes on table with their definition, on-disk size and validity. A
+    CONCURRENTLY build that failed leaves an invalid index the planner ignores.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT i.indexname, i.indexdef, pg_relation_size(x.indexrelid), x.indisvalid
+            FROM pg_indexes i
+            JOIN pg_index x ON x.indexrelid = format('%%I.%%I', i.schemaname, i.indexname)::regclass
+            WHERE i.tablename = %s AND (i.indexdef ILIKE '%%USING hnsw%%' OR i.indexdef ILIKE '%%USING ivfflat%%')
+            ORDER BY i.indexname
+            """,
+            (table,)
+        )
+        rows = cur.fetchall()
+    conn.rollback()
+    return [
+        {"name": name, "definition": definition, "size_bytes": size, "valid": valid}
+        for name, definition, size, valid in rows
+    ]
+
+
+def ensure_vector_index(
+    conn,
+    method: str = VECTOR_INDEX_METHOD,
+    *,
+    m: int = VECTOR_INDEX_HNSW_M,
+    ef_construction: int = VECTOR_INDEX_HNSW_EF_CONSTRUCTION,
+    lists: Optional[int] = None,
+    rebuild: bool = False,
+    drop_other_methods: bool = True,
+) -> Dict[str, Any]:
+    """
+    Create the ANN index for method unless a valid one already exists
+    (rebuild=True drops and recreates it, e.g. after changing build
+    parameters; an invalid one left by a failed build is always recreated).
+    Indexes of the other method are dropped once the new one is built, so the
+    planner has a single choice and search never runs without an index.
+    """
+    if method not in VECTOR_INDEX_METHODS:
+        raise ValueError(f"Unknown vector index method '{method}'. Use one of {VECTOR_INDEX_METHODS}.")
+    name = index_name(method)
+    indexes = vector_indexes(conn)
+    existing = {index["name"] for index in indexes}
+    invalid = {index["name"] for index in indexes if not index["valid"]}
+    summary: Dict[str, Any] = {"index": name, "method": method, "created": False, "dropped": []}
+
+    previous_autocommit = conn.autocommit
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block.
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            if name in invalid:
+                logger.warning(f"Dropping invalid index {name} left by a failed build")
+            if name in existing and (rebuild or name in invalid):
+                cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                summary["dropped"].append(name)
+                existing.discard(name)
+
+            if name not in existing:
+                if method == "ivfflat" and not lists:
+                    lists = VECTOR_INDEX_IVFFLAT_LISTS
+                    if not lists:
+                        cur.execute("SELECT count(*) FROM document_chunks")
+                        lists = ivfflat_lists_for(cur.fetchone()[0])
+                if VECTOR_INDEX_MAINTENANCE_WORK_MEM:
+                    cur.execute("SELECT set_config('maintenance_work_mem', %s, false)", (VECTOR_INDEX_MAINTENANCE_WORK_MEM,))
+                if VECTOR_INDEX_BUILD_WORKERS:
+                    cur.execute(
+                        "SELECT set_config('max_parallel_maintenance_workers', %s, false)",
+                        (str(VECTOR_INDEX_BUILD_WORKERS),)
+                    )
+
+                started = time.perf_counter()
+                cur.execute(build_index_sql(method, m=m, ef_construction=ef_construction, lists=lists or 100))
+                cur.execute("ANALYZE document_chunks")
+                summary["created"] = True
+                summary["build_seconds"] = round(time.perf_counter() - started, 2)
+                summary["params"] = {"m": m, "ef_construction": ef_construction} if method == "hnsw" else {"lists": lists}
+                logger.info(f"Built {method} index {name} in {summary['build_seconds']}s with {summary['params']}")
+
+            if drop_other_methods:
+                for other in VECTOR_INDEX_METHODS:
+                    if other != method and index_name(other) in existing:
+                        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(other)}")
+                        summary["dropped"].append(index_name(other))
+            return summary
+    finally:
+        conn.autocommit = previous_autocommit
+
+
+def ensure_filter_indexes(conn) -> List[str]:
+    """Create the indexes behind retrieval filters; returns the statements run."""
+    previous_autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for statement in FILTER_INDEX_STATEMENTS:
+                cur.execute(statement)
+            cur.execute("ANALYZE document_chunks")
+    finally:
+        conn.autocommit = previous_autocommit
+    return list(FILTER_INDEX_STATEMENTS)
+
+
+def drop_vector_index(conn, method: str) -> None:
+    previous_autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(method)}")
+    finally:
+        conn.autocommit = previous_autocommit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["status", "create", "drop", "filters"])
+    parser.add_argument("--method", choices=VECTOR_INDEX_METHODS, default=VECTOR_INDEX_METHOD)
+    parser.add_argument("--m", type=int, default=VECTOR_INDEX_HNSW_M)
+    parser.add_argument("--ef-construction", type=int, default=VECTOR_INDEX_HNSW_EF_CONSTRUCTION)
+    parser.add_argument("--lists", type=int, default=VECTOR_INDEX_IVFFLAT_LISTS, help="ivfflat lists (0 = auto)")
+    parser.add_argument("--rebuild", action="store_true", help="drop and recreate an existing index")
+    args = parser.parse_args()
+
+    from rag.connection_pool import pooled_connection
+
+    with pooled_connection() as conn:
+        if args.command == "create":
+            result: Any = ensure_vector_index(
+                conn,
+                args.method,
+                m=args.m,
+                ef_construction=args.ef_construction,
+                lists=args.lists,
+                rebuild=args.rebuild,
+            )
+        elif args.command == "filters":
+            result = {"statements": ensure_filter_indexes(conn)}
+        elif args.command == "drop":
+            drop_vector_index(conn, args.method)
+            result = {"dropped": index_name(args.method)}
+        else:
+            result = vector_indexes(conn)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -24,6 +24,7 @@ from auth import (
 from database import get_db
 from email_utils import send_password_reset_email
 from models import User, UserAccessProfile
+from principal_cache import invalidate_principal
 from schemas import (
     ChangePassword,
     PasswordResetRequest,
@@ -208,6 +209,7 @@ def update_profile(
     db.add(current_user)
     db.add(profile)
     db.commit()
+    invalidate_principal(user_id=current_user.id, email=current_user.email)
     db.refresh(current_user)
     db.refresh(profile)
     return _serialize_user(current_user, profile)
@@ -299,6 +301,7 @@ def change_password(
         current_user.updated_at = datetime.utcnow()
         db.add(current_user)
         db.commit()
+        invalidate_principal(user_id=current_user.id, email=current_user.email)
         return {
             "message": "Password changed successfully.",
             "email": current_user.email,
@@ -316,12 +319,12 @@ rag_router = APIRouter(prefix="/api/v1", tags=["Ingestion"])
 
 def _load_rag_runtime():
     try:
-        from rag.ingestion import ingest_document
+        from rag.ingestion import ingest_document_with_stats
         from rag.model import generate_answer
         from rag.retrieval import build_context, retrieve_context
 
         return {
-            "ingest_document": ingest_document,
+            "ingest_document": ingest_document_with_stats,
             "generate_answer": generate_answer,
             "build_context": build_context,
             "retrieve_context": retrieve_context,
@@ -374,7 +377,14 @@ async def ingest_document_endpoint(
         if os.path.exists(tmp_path):
             os.unlink(tmp_path)
 
-    return JSONResponse(content={"message": result})
+    return JSONResponse(
+        content={
+            "message": result["message"],
+            "document_id": str(result["document_id"]),
+            "status": result["status"],
+            "dedup": result["dedup"],
+        }
+    )
 
 
 @rag_router.post("/rag/search")
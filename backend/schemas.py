@@ -13,6 +13,7 @@ ReportType = Literal[
     "business_report",
 ]
 ReportScope = Literal["targeted", "full"]
+BackgroundJobStatus = Literal["QUEUED", "RUNNING", "SUCCEEDED", "FAILED", "CANCELLED"]
 
 
 class UserBase(BaseModel):
@@ -226,8 +227,10 @@ class BusinessReportListResponse(BaseModel):
     items: List[BusinessReportListItem]
     page: int
     page_size: int
-    total: int
-    total_pages: int
+    # Omitted for cursor requests, which skip the COUNT.
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class CalendarEventCreate(BaseModel):
@@ -346,3 +349,18 @@ class BusinessReportPublishRequest(BaseModel):
 class BusinessReportPublishResponse(BaseModel):
     report: BusinessReportResponse
     version: BusinessReportVersionResponse
+
+
+class BackgroundJobResponse(BaseModel):
+    job_id: str
+    job_type: str
+    status: BackgroundJobStatus
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool = False
+    progress: List[Dict[str, Any]] = Field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    error: str = ""
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, BusinessInsightReport, RenderedArtifact, SimulationRun, User
+from modules.simulation.reporting import artifact_store
+from modules.simulation.reporting.artifact_store import (
+    artifact_values,
+    drop_legacy_export_html,
+    load_artifact_text,
+    move_legacy_export_html,
+    release_artifact,
+    report_export_html,
+    set_report_export_html,
+)
+
+HTML = "<html><body>" + "<section><h2>Market</h2><p>Demand is growing.</p></section>" * 200 + "</body></html>"
+
+
+class ArtifactEncodingTests(unittest.TestCase):
+    def test_gzip_round_trips_and_is_content_addressed(self) -> None:
+        with patch.dict(os.environ, {"REPORT_ARTIFACT_COMPRESSION": "gzip"}):
+            first = artifact_values(HTML)
+            second = artifact_values(HTML)
+
+        self.assertEqual(first["encoding"], "gzip")
+        self.assertEqual(first["id"], second["id"])
+        self.assertEqual(first["data"], second["data"])
+        self.assertLess(first["stored_bytes"], first["size_bytes"] // 10)
+        self.assertEqual(artifact_store.decompress(first["data"], "gzip").decode("utf-8"), HTML)
+        self.assertNotEqual(artifact_values(HTML + " ")["id"], first["id"])
+
+    @unittest.skipUnless(artifact_store.ZSTD_AVAILABLE, "zstandard is not installed")
+    def test_zstd_is_the_default_when_available(self) -> None:
+        with patch.dict(os.environ, {"REPORT_ARTIFACT_COMPRESSION": ""}):
+            values = artifact_values(HTML)
+
+        self.assertEqual(values["encoding"], "zstd")
+        self.assertEqual(artifact_store.decompress(values["data"], "zstd").decode("utf-8"), HTML)
+
+    def test_unknown_compression_is_rejected(self) -> None:
+        with patch.dict(os.environ, {"REPORT_ARTIFACT_COMPRESSION": "brotli"}):
+            with self.assertRaises(ValueError):
+                artifact_values(HTML)
+
+
+class ReportArtifactTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://")
+        self.addCleanup(self.engine.dispose)
+        Base.metadata.create_all(
+            self.engine,
+            tables=[
+                User.__table__,
+                SimulationRun.__table__,
+                RenderedArtifact.__table__,
+                BusinessInsightReport.__table__,
+            ],
+        )
+        self.db = sessionmaker(bind=self.engine, autoflush=False)()
+        self.addCleanup(self.db.close)
+        owner = User(email="founder@example.com", full_name="Founder", hashed_password="x")
+        self.db.add(owner)
+        self.db.flush()
+        run = SimulationRun(owner_email=owner.email, startup_name="Atlas")
+        self.db.add(run)
+        self.db.flush()
+        self.reports = []
+        for index in range(2):
+            report = BusinessInsightReport(owner_user_id=owner.id, simulation_id=run.id, summary=f"Report {index}")
+            self.db.add(report)
+            self.reports.append(report)
+        self.db.flush()
+
+    def artifact_count(self) -> int:
+        return self.db.query(RenderedArtifact).count()
+
+    def test_identical_html_is_stored_once(self) -> None:
+        for report in self.reports:
+            set_report_export_html(self.db, report, HTML)
+        self.db.commit()
+
+        self.assertEqual(self.artifact_count(), 1)
+        self.assertEqual(self.reports[0].export_artifact_id, self.reports[1].export_artifact_id)
+        self.assertEqual(report_export_html(self.db, self.reports[1]), HTML)
+
+    def test_rerender_releases_the_previous_artifact_only_when_unused(self) -> None:
+        first, second = self.reports
+        set_report_export_html(self.db, first, HTML)
+        set_report_export_html(self.db, second, HTML)
+        shared = first.export_artifact_id
+
+        set_report_export_html(self.db, first, HTML.replace("growing", "flat"))
+        self.db.commit()
+        self.assertEqual(self.artifact_count(), 2)
+        self.assertEqual(load_artifact_text(self.db, shared), HTML)
+
+        set_report_export_html(self.db, second, HTML.replace("growing", "flat"))
+        self.db.commit()
+        self.assertEqual(self.artifact_count(), 1)
+        self.assertIsNone(load_artifact_text(self.db, shared))
+
+    def test_deleting_the_last_report_releases_its_artifact(self) -> None:
+        report = self.reports[0]
+        set_report_export_html(self.db, report, HTML)
+        self.db.commit()
+        artifact_id = report.export_artifact_id
+
+        self.db.delete(report)
+        self.db.flush()
+        release_artifact(self.db, artifact_id)
+        self.db.commit()
+
+        self.assertEqual(self.artifact_count(), 0)
+
+
+class LegacyExportHtmlMigrationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://")
+        self.addCleanup(self.engine.dispose)
+        Base.metadata.create_all(
+            self.engine,
+            tables=[
+                User.__table__,
+                SimulationRun.__table__,
+                RenderedArtifact.__table__,
+                BusinessInsightReport.__table__,
+            ],
+        )
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        with Session() as db:
+            owner = User(email="founder@example.com", full_name="Founder", hashed_password="x")
+            db.add(owner)
+            db.flush()
+            run = SimulationRun(owner_email=owner.email, startup_name="Atlas")
+            db.add(run)
+            db.flush()
+            self.owner_id, self.run_id = owner.id, run.id
+            db.commit()
+        # The pre-artifact schema kept the rendered HTML inline.
+        with self.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE business_insight_reports ADD COLUMN export_html TEXT NOT NULL DEFAULT ''"))
+        for summary, html in (("a", HTML), ("b", HTML), ("c", HTML.replace("growing", "flat")), ("d", "")):
+            self.insert_legacy_report(summary, html)
+
+    def insert_legacy_report(self, summary: str, html: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                BusinessInsightReport.__table__.insert().values(
+                    id=summary,
+                    owner_user_id=self.owner_id,
+                    simulation_id=self.run_id,
+                    summary=summary,
+                    sections=[],
+                    key_findings=[],
+                    recommended_actions=[],
+                )
+            )
+            conn.execute(
+                text("UPDATE business_insight_reports SET export_html = :html WHERE id = :id"),
+                {"html": html, "id": summary},
+            )
+
+    def columns(self) -> set:
+        return {column["name"] for column in inspect(self.engine).get_columns("business_insight_reports")}
+
+    def test_export_html_is_moved_in_batches_and_deduplicated(self) -> None:
+        self.assertEqual(move_legacy_export_html(self.engine, batch_size=2), 3)
+        self.assertEqual(move_legacy_export_html(self.engine, batch_size=2), 0)
+
+        with sessionmaker(bind=self.engine)() as db:
+            self.assertEqual(db.query(RenderedArtifact).count(), 2)
+            reports = {report.id: report for report in db.query(BusinessInsightReport)}
+            self.assertEqual(reports["a"].export_artifact_id, reports["b"].export_artifact_id)
+            self.assertIsNone(reports["d"].export_artifact_id)
+            self.assertEqual(report_export_html(db, reports["b"]), HTML)
+            self.assertEqual(report_export_html(db, reports["c"]), HTML.replace("growing", "flat"))
+
+    def test_column_is_dropped_only_once_every_export_is_moved(self) -> None:
+        self.assertFalse(drop_legacy_export_html(self.engine))
+        self.assertIn("export_html", self.columns())
+
+        move_legacy_export_html(self.engine)
+        self.assertTrue(drop_legacy_export_html(self.engine))
+        self.assertNotIn("export_html", self.columns())
+
+
+if __name__ == "__main__":
+    unittest.main()
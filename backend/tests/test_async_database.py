@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import db_pool
+from db_pool import InstrumentedAsyncNullPool, InstrumentedAsyncQueuePool, async_database_url, async_engine_options
+from models import Base, User, UserAccessProfile
+
+
+class AsyncEngineOptionsTests(unittest.TestCase):
+    def test_database_url_is_rewritten_for_an_async_driver(self) -> None:
+        self.assertEqual(
+            async_database_url("postgresql://u:p@db.example.com:5432/postgres"),
+            "postgresql+asyncpg://u:p@db.example.com:5432/postgres",
+        )
+        self.assertEqual(
+            async_database_url("postgresql+psycopg2://u:p@h/db"),
+            "postgresql+asyncpg://u:p@h/db",
+        )
+        self.assertEqual(async_database_url("sqlite:///tmp/app.db"), "sqlite+aiosqlite:///tmp/app.db")
+
+    def test_asyncpg_options_follow_pool_mode_and_pooler(self) -> None:
+        pooler = "postgresql://u:p@aws-0-eu.pooler.supabase.com:6543/postgres"
+        with patch.dict(os.environ, {"DATABASE_TRANSACTION_POOLER": "", "DATABASE_SSLMODE": "require"}):
+            options = async_engine_options(pooler, "queue")
+            direct = async_engine_options("postgresql://u:p@h:5432/db", "null")
+
+        self.assertIs(options["poolclass"], InstrumentedAsyncQueuePool)
+        self.assertEqual(options["pool_reset_on_return"], "rollback")
+        self.assertEqual(options["connect_args"]["ssl"], "require")
+        self.assertEqual(options["connect_args"]["statement_cache_size"], 0)
+        self.assertIs(direct["poolclass"], InstrumentedAsyncNullPool)
+        self.assertNotIn("statement_cache_size", direct["connect_args"])
+
+
+@unittest.skipUnless(importlib.util.find_spec("aiosqlite"), "aiosqlite is not installed")
+class AsyncSessionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.url = f"sqlite:///{os.path.join(temp_dir.name, 'app.db')}"
+        sync_engine = create_engine(self.url)
+        Base.metadata.create_all(sync_engine, tables=[User.__table__, UserAccessProfile.__table__])
+        sync_engine.dispose()
+        db_pool.async_pool_metrics.reset()
+        self.addCleanup(db_pool.async_pool_metrics.reset)
+
+    async def _read_back(self, mode: str) -> tuple[list[str], int]:
+        engine = create_async_engine(async_database_url(self.url), **async_engine_options(self.url, mode))
+        session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        try:
+            async with session_factory() as db:
+                db.add_all(
+                    User(email=f"user{index}@example.com", full_name=f"User {index}", hashed_password="x")
+                    for index in range(3)
+                )
+                await db.commit()
+            async with session_factory() as db:
+                result = await db.execute(select(User.email).where(User.email != "user1@example.com").order_by(User.id))
+                emails = list(result.scalars().all())
+                profiles = len((await db.execute(select(UserAccessProfile))).scalars().all())
+        finally:
+            await engine.dispose()
+        return emails, profiles
+
+    def test_async_sessions_use_their_own_pool_metrics(self) -> None:
+        db_pool.pool_metrics.reset()
+        emails, profiles = asyncio.run(self._read_back("queue"))
+
+        self.assertEqual((emails, profiles), (["user0@example.com", "user2@example.com"], 0))
+        stats = db_pool.async_pool_metrics.snapshot()
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["connects"], 1)
+        self.assertEqual(db_pool.pool_metrics.snapshot()["checkouts"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from benchmarks.pdf_extraction import build_text_pdf
+from rag.bulk_ingest import MANIFEST_NAME, IngestManifest, run_bulk_ingest
+from rag.extraction_pool import DocumentExtractionPool
+
+
+def fingerprint(path: str) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class BulkIngestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        for name in ("a.md", "b.txt", "nested/c.pdf", "nested/skip.ipynb", ".hidden/d.md"):
+            path = self.root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"content of {name}")
+        self.manifest_path = self.root / MANIFEST_NAME
+
+    def run_ingest(self, ingest, workers: int = 2) -> dict:
+        return run_bulk_ingest(
+            self.root,
+            ingest=ingest,
+            fingerprint=fingerprint,
+            manifest=IngestManifest(self.manifest_path),
+            extensions={".pdf", ".md", ".txt"},
+            workers=workers,
+            progress=lambda message: None,
+        )
+
+    def test_files_are_ingested_concurrently_with_throughput_stats(self) -> None:
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+        titles = []
+
+        def ingest(local_file_path: str, title: str, source_type: str) -> dict:
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+                titles.append((title, source_type))
+            time.sleep(0.1)
+            with lock:
+                active["now"] -= 1
+            return {"document_id": title, "status": "created", "dedup": {"chunks_total": 5, "chunks_added": 5}}
+
+        totals = self.run_ingest(ingest, workers=3)
+
+        self.assertEqual(active["peak"], 3)
+        self.assertEqual(sorted(titles), [("a", "md"), ("b", "txt"), ("nested/c", "pdf")])
+        self.assertEqual((totals["discovered"], totals["created"], totals["chunks_total"]), (3, 3, 15))
+        self.assertGreater(totals["docs_per_second"], 0)
+        self.assertGreater(totals["chunks_per_second"], 0)
+
+    def test_rerun_resumes_after_completed_files_and_retries_failures(self) -> None:
+        def flaky(local_file_path: str, title: str, source_type: str) -> dict:
+            if title == "b":
+                raise RuntimeError("embedding quota exceeded")
+            return {"document_id": title, "status": "created", "dedup": {"chunks_total": 1}}
+
+        first = self.run_ingest(flaky)
+        calls = []
+
+        def ingest(local_file_path: str, title: str, source_type: str) -> dict:
+            calls.append(title)
+            return {"document_id": title, "status": "created", "dedup": {"chunks_total": 1}}
+
+        (self.root / "a.md").write_text("edited")
+        second = self.run_ingest(ingest)
+
+        self.assertEqual((first["created"], first["failed"]), (2, 1))
+        self.assertEqual(sorted(calls), ["a", "b"])
+        self.assertEqual((second["resumed"], second["failed"]), (1, 0))
+        manifest = IngestManifest(self.manifest_path)
+        self.assertEqual({entry["status"] for entry in manifest.files.values()}, {"done"})
+        self.assertEqual(manifest.files["a.md"]["fingerprint"], fingerprint(str(self.root / "a.md")))
+
+    def test_more_documents_than_extraction_slots_wait_instead_of_failing(self) -> None:
+        for index in range(6):
+            (self.root / f"deck{index}.pdf").write_bytes(build_text_pdf(5, lines_per_page=2))
+        (self.root / "nested/c.pdf").unlink()
+        pool = DocumentExtractionPool(workers=2, max_queue=0, timeout_seconds=20)
+        self.addCleanup(pool.shutdown)
+        pages = {}
+
+        def ingest(local_file_path: str, title: str, source_type: str) -> dict:
+            if source_type == "pdf":
+                pages[title] = list(pool.iter_pdf_pages(local_file_path, pages_per_job=1))
+            return {"document_id": title, "status": "created", "dedup": {"chunks_total": 1}}
+
+        totals = self.run_ingest(ingest, workers=6)
+
+        self.assertEqual(totals["failed"], 0)
+        self.assertEqual(len(pages), 6)
+        self.assertTrue(all(len(texts) == 5 for texts in pages.values()))
+        self.assertEqual((pool.stats()["rejected"], pool.stats()["in_flight"]), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import psycopg2.extensions
+
+from rag import connection_pool
+from rag.connection_pool import PoolTimeoutError, SharedConnectionPool
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.closed = 0
+        self.dead = False
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self) -> int:
+        return self.status
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        connection = self
+        cursor = MagicMock()
+        if connection.dead:
+            cursor.execute.side_effect = psycopg2.OperationalError("server closed the connection unexpectedly")
+        cursor.__enter__.return_value = cursor
+        return cursor
+
+
+class FakeThreadedPool:
+    def __init__(self, minconn: int, maxconn: int, dsn: str) -> None:
+        self.returned: list[tuple[FakeConnection, bool]] = []
+        self._pool: list[FakeConnection] = []
+
+    def getconn(self) -> FakeConnection:
+        return self._pool.pop() if self._pool else FakeConnection()
+
+    def putconn(self, conn: FakeConnection, close: bool = False) -> None:
+        self.returned.append((conn, close))
+        if not close:
+            self._pool.append(conn)
+
+    def closeall(self) -> None:
+        pass
+
+
+class SharedConnectionPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        pool_patch = patch.object(connection_pool.psycopg2.pool, "ThreadedConnectionPool", FakeThreadedPool)
+        pool_patch.start()
+        self.addCleanup(pool_patch.stop)
+
+    def test_checkout_times_out_when_pool_is_exhausted(self) -> None:
+        pool = SharedConnectionPool("postgresql://test", minconn=0, maxconn=1, wait_timeout=0.05)
+        held = pool.getconn()
+
+        with self.assertRaises(PoolTimeoutError):
+            pool.getconn()
+
+        pool.putconn(held)
+        stats = pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["in_use"], 0)
+
+    def test_waiting_checkout_succeeds_once_a_connection_is_returned(self) -> None:
+        pool = SharedConnectionPool("postgresql://test", minconn=0, maxconn=1, wait_timeout=2)
+        held = pool.getconn()
+        timer = threading.Timer(0.05, pool.putconn, args=(held,))
+        timer.start()
+
+        with pool.connection() as conn:
+            self.assertIsInstance(conn, FakeConnection)
+
+        timer.join()
+        self.assertEqual(pool.stats()["waits"], 1)
+        self.assertEqual(pool.stats()["checkouts"], 2)
+
+    def test_return_rolls_back_open_transactions_and_discards_closed_connections(self) -> None:
+        pool = SharedConnectionPool("postgresql://test", minconn=0, maxconn=2, wait_timeout=1)
+        dirty = pool.getconn()
+        rollbacks_after_ping = dirty.rollbacks
+        dirty.status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        broken = pool.getconn()
+        broken.closed = 2
+
+        pool.putconn(dirty)
+        pool.putconn(broken)
+
+        self.assertEqual(dirty.rollbacks, rollbacks_after_ping + 1)
+        self.assertEqual(pool._pool.returned, [(dirty, False), (broken, True)])
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    def test_checkout_pings_stale_connections_and_replaces_dead_ones(self) -> None:
+        pool = SharedConnectionPool("postgresql://test", minconn=0, maxconn=2, wait_timeout=1, ping_idle_seconds=0)
+        first = pool.getconn()
+        pool.putconn(first)
+        first.dead = True
+
+        replacement = pool.getconn()
+
+        self.assertIsNot(replacement, first)
+        stats = pool.stats()
+        self.assertEqual(stats["failed_pings"], 1)
+        self.assertEqual(stats["discarded"], 1)
+        self.assertEqual(stats["in_use"], 1)
+
+    def test_recently_returned_connections_skip_the_ping(self) -> None:
+        pool = SharedConnectionPool("postgresql://test", minconn=0, maxconn=1, wait_timeout=1, ping_idle_seconds=60)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        pings_after_first_checkout = pool.stats()["pings"]
+
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(pool.stats()["pings"], pings_after_first_checkout)
+        self.assertEqual(pool.stats()["idle"], 0)
+
+    def test_get_pool_requires_database_url(self) -> None:
+        with patch.object(connection_pool, "DATABASE_URL", None), patch.object(connection_pool, "_shared_pool", None):
+            with self.assertRaises(ValueError):
+                connection_pool.get_pool()
+
+
+class RetrieveContextPoolTests(unittest.TestCase):
+    def test_retrieve_context_uses_the_shared_pool(self) -> None:
+        from rag import retrieval
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [("chunk", "doc-1")]
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cursor
+        pooled = MagicMock()
+        pooled.return_value.__enter__.return_value = conn
+
+        with patch.object(retrieval, "generate_embedding", return_value=[0.1, 0.2]), \
+                patch.object(retrieval, "pooled_connection", pooled):
+            results = retrieval.retrieve_context("pricing?", top_k=1)
+
+        pooled.assert_called_once_with()
+        self.assertEqual(results, [("chunk", "doc-1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+import db_pool
+from db_pool import InstrumentedNullPool, InstrumentedQueuePool, database_pool_stats, engine_options
+
+
+class DatabasePoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.url = f"sqlite:///{os.path.join(temp_dir.name, 'app.db')}"
+        db_pool.pool_metrics.reset()
+        self.addCleanup(db_pool.pool_metrics.reset)
+
+    def make_engine(self, mode: str, **env: str):
+        with patch.dict(os.environ, env):
+            engine = create_engine(self.url, **engine_options(self.url, mode))
+        self.addCleanup(engine.dispose)
+        return engine
+
+    def test_mode_defaults_to_null_pool_and_honours_legacy_flag(self) -> None:
+        with patch.dict(os.environ, {"DATABASE_POOL_MODE": "", "DATABASE_USE_NULL_POOL": "1"}):
+            self.assertEqual(db_pool.database_pool_mode(), "null")
+        with patch.dict(os.environ, {"DATABASE_POOL_MODE": "", "DATABASE_USE_NULL_POOL": "0"}):
+            self.assertEqual(db_pool.database_pool_mode(), "queue")
+        with patch.dict(os.environ, {"DATABASE_POOL_MODE": "queue", "DATABASE_USE_NULL_POOL": "1"}):
+            self.assertEqual(db_pool.database_pool_mode(), "queue")
+        with patch.dict(os.environ, {"DATABASE_POOL_MODE": "pgbouncer"}):
+            with self.assertRaises(ValueError):
+                db_pool.database_pool_mode()
+
+    def test_queue_mode_is_lifo_with_rollback_on_return(self) -> None:
+        options = engine_options(self.url, "queue")
+
+        self.assertIs(options["poolclass"], InstrumentedQueuePool)
+        self.assertTrue(options["pool_use_lifo"])
+        self.assertEqual(options["pool_reset_on_return"], "rollback")
+        self.assertIs(engine_options(self.url, "null")["poolclass"], InstrumentedNullPool)
+
+    def test_prepared_statements_are_disabled_behind_a_transaction_pooler(self) -> None:
+        pooler = "postgresql+psycopg://u:p@aws-0-eu.pooler.supabase.com:6543/postgres"
+        direct = "postgresql+psycopg://u:p@db.example.supabase.co:5432/postgres"
+        with patch.dict(os.environ, {"DATABASE_TRANSACTION_POOLER": ""}):
+            self.assertEqual(engine_options(pooler, "queue")["connect_args"]["prepare_threshold"], None)
+            self.assertNotIn("prepare_threshold", engine_options(direct, "queue")["connect_args"])
+            asyncpg_args = db_pool.prepared_statement_connect_args("postgresql+asyncpg://u:p@h:6543/db")
+            self.assertEqual((asyncpg_args["statement_cache_size"], asyncpg_args["prepared_statement_cache_size"]), (0, 0))
+            self.assertNotEqual(asyncpg_args["prepared_statement_name_func"](), asyncpg_args["prepared_statement_name_func"]())
+            self.assertEqual(db_pool.prepared_statement_connect_args("postgresql://u:p@h:6543/db"), {})
+        with patch.dict(os.environ, {"DATABASE_TRANSACTION_POOLER": "1"}):
+            self.assertIn("prepare_threshold", engine_options(direct, "queue")["connect_args"])
+
+    def test_pooled_engine_reuses_connections_and_reports_metrics(self) -> None:
+        engine = self.make_engine("queue", DATABASE_POOL_SIZE="2", DATABASE_MAX_OVERFLOW="1")
+        for _ in range(5):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        stats = database_pool_stats(engine)
+        self.assertEqual(stats["mode"], "queue")
+        self.assertEqual(stats["checkouts"], 5)
+        self.assertEqual(stats["connects"], 1)
+        self.assertEqual((stats["size"], stats["checked_out"], stats["checked_in"]), (2, 0, 1))
+        self.assertGreater(stats["checkout_ms_max"], 0.0)
+        self.assertGreaterEqual(stats["checkout_ms_p95"], stats["checkout_ms_p50"])
+
+    def test_null_pool_opens_a_connection_per_checkout(self) -> None:
+        engine = self.make_engine("null")
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        stats = database_pool_stats(engine)
+        self.assertEqual((stats["mode"], stats["checkouts"], stats["connects"]), ("null", 3, 3))
+
+    def test_overflow_and_timeouts_are_counted(self) -> None:
+        engine = self.make_engine(
+            "queue", DATABASE_POOL_SIZE="1", DATABASE_MAX_OVERFLOW="1", DATABASE_POOL_TIMEOUT_SECONDS="0.05"
+        )
+        first = engine.connect()
+        second = engine.connect()
+        try:
+            with self.assertRaises(PoolTimeoutError):
+                engine.connect()
+        finally:
+            second.close()
+            first.close()
+
+        stats = database_pool_stats(engine)
+        self.assertEqual(stats["peak_overflow"], 1)
+        self.assertEqual(stats["overflow_checkouts"], 1)
+        self.assertEqual(stats["peak_checked_out"], 2)
+        self.assertEqual(stats["timeouts"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
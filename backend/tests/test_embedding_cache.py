@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from rag import embedding_cache
+from rag.embedding_cache import EmbeddingCache, cached_embeddings
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+    def test_lru_evicts_least_recently_used_entry(self) -> None:
+        cache = EmbeddingCache(max_entries=2, path="")
+        cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+        cache.get_many("m", ["a"])
+        cache.put_many("m", ["c"], [[3.0]])
+
+        self.assertEqual(cache.get_many("m", ["a", "b", "c"]), [[1.0], None, [3.0]])
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["entries"], 2)
+
+    def test_keys_include_the_model(self) -> None:
+        cache = EmbeddingCache(max_entries=10, path="")
+        cache.put_many("small", ["text"], [[0.5]])
+
+        self.assertEqual(cache.get_many("large", ["text"]), [None])
+
+    def test_persistent_tier_survives_a_new_cache_instance(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "embeddings.sqlite3")
+            EmbeddingCache(max_entries=10, path=path).put_many("m", ["brief"], [[0.25, -0.5]])
+
+            reopened = EmbeddingCache(max_entries=10, path=path)
+            self.assertEqual(reopened.get_many("m", ["brief"]), [[0.25, -0.5]])
+            self.assertEqual(reopened.stats()["persistent_hits"], 1)
+
+    def test_cached_embeddings_only_embeds_new_unique_texts(self) -> None:
+        calls = []
+
+        def embed(texts):
+            calls.append(list(texts))
+            return [[float(len(text))] for text in texts]
+
+        with patch.object(embedding_cache, "_cache", EmbeddingCache(max_entries=10, path="")):
+            first = cached_embeddings(["aa", "bbb", "aa"], "m", embed)
+            second = cached_embeddings(["bbb", "cccc"], "m", embed)
+            stats = embedding_cache.embedding_cache_stats()
+
+        self.assertEqual(first, [[2.0], [3.0], [2.0]])
+        self.assertEqual(second, [[3.0], [4.0]])
+        self.assertEqual(calls, [["aa", "bbb"], ["cccc"]])
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
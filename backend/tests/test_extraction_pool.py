@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import tempfile
+import time
+import unittest
+
+import pypdfium2
+
+from benchmarks.pdf_extraction import build_text_pdf
+from modules.management.cv_parser import extract_cv_text
+from rag.extraction_pool import (
+    DocumentExtractionPool,
+    DocumentTooLargeError,
+    ExtractionQueueFullError,
+    ExtractionTimeoutError,
+    join_pages,
+    page_for_offset,
+)
+
+
+def worker_pid(_: int = 0) -> int:
+    return os.getpid()
+
+
+def slow_echo(value: str, delay: float) -> str:
+    time.sleep(delay)
+    return value
+
+
+def build_pdf(pages: int) -> bytes:
+    document = pypdfium2.PdfDocument.new()
+    for _ in range(pages):
+        document.new_page(200, 200)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class DocumentExtractionPoolTests(unittest.TestCase):
+    def build_pool(self, **kwargs) -> DocumentExtractionPool:
+        pool = DocumentExtractionPool(**{"workers": 1, "max_queue": 2, "timeout_seconds": 20, **kwargs})
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_jobs_run_outside_the_calling_process(self) -> None:
+        pool = self.build_pool()
+
+        self.assertNotEqual(pool.run_sync(worker_pid), os.getpid())
+        self.assertEqual(pool.stats()["completed"], 1)
+
+    def test_async_run_leaves_the_event_loop_free(self) -> None:
+        pool = self.build_pool()
+        pool.run_sync(worker_pid)
+        ticks = []
+
+        async def ticker() -> None:
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def main() -> str:
+            result, _ = await asyncio.gather(pool.run(slow_echo, "done", 0.3), ticker())
+            return result
+
+        self.assertEqual(asyncio.run(main()), "done")
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[-1] - ticks[0], 0.25)
+
+    def test_timeout_recycles_the_worker_and_pool_keeps_serving(self) -> None:
+        pool = self.build_pool()
+        first_pid = pool.run_sync(worker_pid)
+
+        with self.assertRaises(ExtractionTimeoutError):
+            pool.run_sync(slow_echo, "late", 10, timeout=0.5)
+
+        self.assertNotEqual(pool.run_sync(worker_pid), first_pid)
+        stats = pool.stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["pool_restarts"], 1)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_full_queue_rejects_new_work(self) -> None:
+        pool = self.build_pool(max_queue=0)
+
+        async def main() -> None:
+            running = asyncio.ensure_future(pool.run(slow_echo, "busy", 0.5))
+            await asyncio.sleep(0)
+            with self.assertRaises(ExtractionQueueFullError):
+                await pool.run(worker_pid)
+            await running
+
+        asyncio.run(main())
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+    def test_page_limit_rejects_long_pdfs(self) -> None:
+        pool = self.build_pool(max_pages=2)
+        content = build_pdf(3)
+
+        with self.assertRaises(DocumentTooLargeError):
+            pool.run_sync(extract_cv_text, "cv.pdf", content, max_pages=pool.max_pages)
+        text, extension = pool.run_sync(extract_cv_text, "cv.pdf", build_pdf(2), max_pages=pool.max_pages)
+
+        self.assertEqual((text, extension), ("", ".pdf"))
+        self.assertEqual(pool.stats()["failed"], 1)
+
+    def test_upload_page_limit_does_not_apply_to_sharded_extraction(self) -> None:
+        pool = self.build_pool(max_pages=2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "book.pdf")
+            with open(path, "wb") as handle:
+                handle.write(build_text_pdf(3, lines_per_page=1))
+
+            self.assertEqual(len(list(pool.iter_pdf_pages(path))), 3)
+            with self.assertRaises(DocumentTooLargeError):
+                list(pool.iter_pdf_pages(path, max_pages=pool.max_pages))
+
+    def test_pdf_pages_are_sharded_across_workers_and_reassembled_in_order(self) -> None:
+        pool = self.build_pool(workers=2, max_queue=2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.pdf")
+            with open(path, "wb") as handle:
+                handle.write(build_text_pdf(7, lines_per_page=2))
+
+            pages = list(pool.iter_pdf_pages(path, pages_per_job=2))
+
+        self.assertEqual(len(pages), 7)
+        self.assertEqual([page.split()[1] for page in pages], [str(n) for n in range(1, 8)])
+        # One page count plus four page-range jobs.
+        self.assertEqual(pool.stats()["completed"], 5)
+        self.assertEqual(pool.stats()["in_flight"], 0)
+
+    def test_page_offsets_map_text_back_to_pages(self) -> None:
+        text, offsets = join_pages(["alpha", "beta", "gamma"], separator="\n")
+
+        self.assertEqual(offsets, [0, 6, 11])
+        self.assertEqual(text[offsets[2]:], "gamma")
+        self.assertEqual(
+            [page_for_offset(offsets, offset) for offset in (0, 4, 5, 6, 11, len(text) - 1)],
+            [1, 1, 1, 2, 3, 3],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
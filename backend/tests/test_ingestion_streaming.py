@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from benchmarks.pdf_extraction import build_text_pdf
+from rag import ingestion
+from rag.extraction_pool import DocumentExtractionPool, DocumentTooLargeError
+
+
+def numbered_text(start: int, stop: int) -> str:
+    return " ".join(f"word{n}." for n in range(start, stop))
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.commits = 0
+        self.rollbacks = 0
+        self.cursor_obj = MagicMock()
+        self.cursor_obj.fetchone.return_value = ("doc-1",)
+        self.cursor_obj.__enter__.return_value = self.cursor_obj
+        self.cursor_obj.connection = self
+        self.checked_out = 0
+
+    def cursor(self):
+        return self.cursor_obj
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+def numbered_pages(count: int, words_per_page: int = 500) -> list:
+    return [(page, numbered_text((page - 1) * words_per_page, page * words_per_page)) for page in range(1, count + 1)]
+
+
+class IterChunksTests(unittest.TestCase):
+    def test_streamed_chunks_match_whole_text_chunking(self) -> None:
+        pieces = numbered_pages(24)
+
+        streamed = [chunk for chunk, _, _ in ingestion.iter_chunks(pieces)]
+
+        self.assertEqual(streamed, ingestion.chunk_text_semantic(" ".join(text for _, text in pieces)))
+
+    def test_chunks_carry_the_pages_they_span(self) -> None:
+        words_per_page = 500
+        chunks = list(ingestion.iter_chunks(numbered_pages(24, words_per_page)))
+
+        for chunk, page_start, page_end in chunks:
+            words = [int(number) for number in re.findall(r"word(\d+)", chunk)]
+            self.assertEqual(page_start, words[0] // words_per_page + 1, chunk[:40])
+            self.assertEqual(page_end, words[-1] // words_per_page + 1, chunk[-40:])
+        self.assertTrue(any(start != end for _, start, end in chunks))
+        self.assertEqual(chunks[-1][2], 24)
+
+    def test_sources_without_pages_have_no_page_range(self) -> None:
+        chunks = list(ingestion.iter_chunks([(None, numbered_text(0, 3000))]))
+
+        self.assertTrue(chunks)
+        self.assertTrue(all(start is None and end is None for _, start, end in chunks))
+
+    def test_chunks_are_emitted_before_the_stream_ends(self) -> None:
+        consumed = []
+
+        def pieces():
+            for start in range(0, 12000, 500):
+                consumed.append(start)
+                yield start // 500 + 1, numbered_text(start, start + 500)
+
+        first, page_start, _ = next(ingestion.iter_chunks(pieces()))
+
+        self.assertTrue(first.startswith("word0."))
+        self.assertEqual(page_start, 1)
+        self.assertLess(len(consumed), 5)
+
+
+class DocumentTextTests(unittest.TestCase):
+    def setUp(self) -> None:
+        pool = DocumentExtractionPool(workers=1, max_queue=2, timeout_seconds=20, max_pages=2)
+        self.addCleanup(pool.shutdown)
+        patcher = patch.object(ingestion, "get_extraction_pool", return_value=pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "book.pdf")
+        with open(self.path, "wb") as handle:
+            handle.write(build_text_pdf(3, lines_per_page=1))
+
+    def test_ingestion_ignores_the_upload_page_limit(self) -> None:
+        pages = [page for page, _ in ingestion.iter_document_text(self.path)]
+
+        self.assertEqual(pages, [1, 2, 3])
+
+    def test_ingest_page_limit_applies_when_set(self) -> None:
+        with patch.object(ingestion, "RAG_INGEST_MAX_PAGES", 2):
+            with self.assertRaises(DocumentTooLargeError):
+                list(ingestion.iter_document_text(self.path))
+
+
+class StreamingIngestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = FakeConnection()
+        self.upload = MagicMock(return_value="documents/pdf/guide.pdf")
+        for name, value in (
+            ("validate_file", MagicMock(return_value=(True, ""))),
+            ("upload_to_storage", self.upload),
+            ("get_db_connection", MagicMock(side_effect=self.checkout)),
+            ("release_db_connection", MagicMock(side_effect=self.release)),
+            ("ensure_ingestion_schema", MagicMock()),
+            ("file_fingerprint", MagicMock(return_value="fingerprint-2")),
+            ("_find_document", MagicMock(return_value=(None, None))),
+            ("_stored_embeddings", MagicMock(return_value={})),
+            ("INGEST_BATCH_SIZE", 10),
+        ):
+            patcher = patch.object(ingestion, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def checkout(self):
+        self.conn.checked_out += 1
+        return self.conn
+
+    def release(self, conn):
+        conn.checked_out -= 1
+
+    def ingest(self, pieces, embed=None):
+        embed = embed or (lambda batch: [[0.0]] * len(batch))
+        with patch.object(ingestion, "iter_document_text", return_value=iter(pieces)), \
+                patch.object(ingestion, "generate_embeddings_batch", side_effect=embed), \
+                patch.object(ingestion, "execute_values") as execute_values:
+            result = ingestion.ingest_document_with_stats("guide.pdf", "Guide")
+        return result, execute_values
+
+    def test_each_batch_is_embedded_inserted_and_committed(self) -> None:
+        embedded_batches = []
+
+        def embed(batch):
+            embedded_batches.append(len(batch))
+            return [[0.0]] * len(batch)
+
+        result, execute_values = self.ingest(numbered_pages(12), embed)
+
+        total = sum(embedded_batches)
+        self.assertIn(f"Chunks: {total}", result["message"])
+        self.assertEqual(result["status"], "created")
+        self.assertEqual(result["dedup"]["chunks_added"], total)
+        self.assertTrue(all(size <= 10 for size in embedded_batches))
+        self.assertEqual(execute_values.call_count, len(embedded_batches))
+        # Lookup, document row, an embedding lookup and a write per batch, then the fingerprint.
+        self.assertEqual(self.conn.commits, 3 + 2 * len(embedded_batches))
+        self.assertEqual(self.conn.checked_out, 0)
+        rows = [row for call in execute_values.call_args_list for row in call.args[2]]
+        self.assertEqual([row[3] for row in rows], list(range(total)))
+        self.assertEqual(rows[0][4].adapted, {"page_start": 1, "page_end": 1})
+        self.assertEqual(rows[-1][4].adapted["page_end"], 12)
+        self.assertEqual(rows[0][5], ingestion.content_hash(rows[0][1]))
+
+    def test_no_connection_is_held_while_embedding(self) -> None:
+        held = []
+
+        def embed(batch):
+            held.append(self.conn.checked_out)
+            return [[0.0]] * len(batch)
+
+        self.ingest(numbered_pages(4), embed)
+
+        self.assertTrue(held)
+        self.assertEqual(set(held), {0})
+        self.assertEqual(self.conn.checked_out, 0)
+
+    def test_unchanged_file_skips_upload_extraction_and_embedding(self) -> None:
+        self.conn.cursor_obj.fetchone.return_value = (42,)
+        with patch.object(ingestion, "_find_document", return_value=("doc-1", "fingerprint-2")), \
+                patch.object(ingestion, "iter_document_text") as iter_document_text, \
+                patch.object(ingestion, "generate_embeddings_batch") as embed:
+            result = ingestion.ingest_document_with_stats("guide.pdf", "Guide")
+
+        self.assertEqual(result["status"], "unchanged")
+        self.assertEqual(result["dedup"]["chunks_unchanged"], 42)
+        self.upload.assert_not_called()
+        iter_document_text.assert_not_called()
+        embed.assert_not_called()
+
+    def test_changed_file_only_embeds_new_chunks_and_drops_stale_ones(self) -> None:
+        pieces = numbered_pages(6)
+        previous = [chunk for chunk, _, _ in ingestion.iter_chunks(pieces[:4])][:-1]
+        known = {ingestion.content_hash(chunk): [f"row-{index}"] for index, chunk in enumerate(previous)}
+        known["stale-hash"] = ["row-stale"]
+        embedded = []
+
+        def embed(batch):
+            embedded.extend(batch)
+            return [[0.0]] * len(batch)
+
+        with patch.object(ingestion, "_find_document", return_value=("doc-1", "fingerprint-1")), \
+                patch.object(ingestion, "_load_chunk_hashes", return_value=known):
+            result, execute_values = self.ingest(pieces, embed)
+
+        stats = result["dedup"]
+        self.assertEqual(result["status"], "updated")
+        self.assertEqual(stats["chunks_unchanged"], len(previous))
+        self.assertEqual(stats["chunks_added"], stats["chunks_total"] - len(previous))
+        self.assertEqual(stats["chunks_removed"], 1)
+        self.assertEqual(stats["embeddings_computed"], len(embedded))
+        self.assertFalse(set(embedded) & set(previous))
+        updates = [call for call in execute_values.call_args_list if "UPDATE document_chunks" in call.args[1]]
+        self.assertEqual(sorted(row[0] for call in updates for row in call.args[2]), sorted(f"row-{i}" for i in range(len(previous))))
+        deletes = [call.args for call in self.conn.cursor_obj.execute.call_args_list if "DELETE FROM document_chunks" in call.args[0]]
+        self.assertEqual(deletes[0][1], ("doc-1", ["row-stale"]))
+
+    def test_embeddings_stored_for_other_documents_are_reused(self) -> None:
+        pieces = numbered_pages(2)
+        chunks = [chunk for chunk, _, _ in ingestion.iter_chunks(pieces)]
+        stored = {ingestion.content_hash(chunks[0]): "[0.5]"}
+
+        with patch.object(ingestion, "_stored_embeddings", return_value=stored):
+            result, execute_values = self.ingest(pieces)
+
+        rows = execute_values.call_args_list[0].args[2]
+        self.assertEqual(rows[0][2], "[0.5]")
+        self.assertEqual(result["dedup"]["embeddings_reused"], 1)
+        self.assertEqual(result["dedup"]["embeddings_computed"], len(chunks) - 1)
+
+    def test_failure_mid_stream_removes_the_partial_document(self) -> None:
+        def pieces():
+            yield 1, numbered_text(0, 4000)
+            raise RuntimeError("extraction crashed")
+
+        with self.assertRaisesRegex(RuntimeError, "extraction crashed"):
+            self.ingest(pieces())
+
+        statements = [call.args[0] for call in self.conn.cursor_obj.execute.call_args_list]
+        self.assertIn("DELETE FROM document_chunks WHERE document_id = %s", statements)
+        self.assertIn("DELETE FROM documents WHERE id = %s", statements)
+        self.assertFalse(any(statement.startswith("UPDATE documents SET fingerprint") for statement in statements))
+        self.assertEqual(self.conn.checked_out, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
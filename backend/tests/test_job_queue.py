@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import job_queue
+from job_queue import JobQueue, register_job_handler
+from models import BackgroundJob
+
+
+def wait_for_status(session_factory, job_id: str, statuses: set[str], timeout: float = 5.0) -> BackgroundJob:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with session_factory() as db:
+            job = db.get(BackgroundJob, job_id)
+            if job is not None and job.status in statuses:
+                db.expunge(job)
+                return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} never reached {statuses}")
+
+
+class JobQueueTests(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        engine = create_engine(f"sqlite:///{os.path.join(directory.name, 'jobs.db')}")
+        self.addCleanup(engine.dispose)
+        BackgroundJob.__table__.create(bind=engine)
+        self.session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+        handlers_patch = patch.dict(job_queue._handlers, {})
+        handlers_patch.start()
+        self.addCleanup(handlers_patch.stop)
+
+    def build_queue(self, **kwargs) -> JobQueue:
+        queue = JobQueue(session_factory=self.session_factory, retry_backoff_seconds=0, **kwargs)
+        self.addCleanup(queue.stop)
+        return queue
+
+    def test_job_reports_progress_and_result(self) -> None:
+        @register_job_handler("test.echo")
+        def echo(db, job, context):
+            context.log("WORKER", "Starting.", phase="start", status="running")
+            context.log("WORKER", "Finished.", phase="finish")
+            return {"echo": job.payload["value"]}
+
+        queue = self.build_queue()
+        queue.start()
+        submitted = queue.submit("test.echo", {"value": 42}, owner_user_id=1)
+
+        self.assertEqual(submitted["status"], "QUEUED")
+        job = wait_for_status(self.session_factory, submitted["job_id"], {"SUCCEEDED"})
+        self.assertEqual(job.result, {"echo": 42})
+        self.assertEqual([entry["sequence"] for entry in job.progress], [1, 2])
+        self.assertEqual(job.progress[0]["status"], "running")
+        self.assertEqual(job.attempts, 1)
+
+    def test_transient_failures_are_retried(self) -> None:
+        calls = []
+
+        @register_job_handler("test.flaky")
+        def flaky(db, job, context):
+            calls.append(job.attempts)
+            if len(calls) == 1:
+                raise RuntimeError("upstream timeout")
+            return {"ok": True}
+
+        queue = self.build_queue(max_attempts=2)
+        queue.start()
+        job_id = queue.submit("test.flaky", {}, owner_user_id=1)["job_id"]
+
+        job = wait_for_status(self.session_factory, job_id, {"SUCCEEDED", "FAILED"})
+        self.assertEqual(job.status, "SUCCEEDED")
+        self.assertEqual(calls, [1, 2])
+
+    def test_client_errors_are_not_retried(self) -> None:
+        calls = []
+
+        @register_job_handler("test.invalid")
+        def invalid(db, job, context):
+            calls.append(job.attempts)
+            raise ValueError("bad request")
+
+        queue = self.build_queue(max_attempts=3)
+        queue.start()
+        job_id = queue.submit("test.invalid", {}, owner_user_id=1)["job_id"]
+
+        job = wait_for_status(self.session_factory, job_id, {"FAILED"})
+        self.assertEqual(job.error, "bad request")
+        self.assertEqual(calls, [1])
+
+    def test_queued_job_cancelled_before_it_runs(self) -> None:
+        @register_job_handler("test.never")
+        def never(db, job, context):
+            raise AssertionError("cancelled job must not run")
+
+        queue = self.build_queue()
+        job_id = queue.submit("test.never", {}, owner_user_id=1)["job_id"]
+        with self.session_factory() as db:
+            queue.cancel(db, db.get(BackgroundJob, job_id))
+        queue.start()
+
+        job = wait_for_status(self.session_factory, job_id, {"CANCELLED"})
+        self.assertEqual(job.attempts, 0)
+
+    def test_running_job_stops_at_next_progress_entry(self) -> None:
+        started = threading.Event()
+        release = threading.Event()
+
+        @register_job_handler("test.long")
+        def long_running(db, job, context):
+            context.log("WORKER", "Step 1.", phase="work")
+            started.set()
+            release.wait(5)
+            context.log("WORKER", "Step 2.", phase="work")
+            return {"finished": True}
+
+        queue = self.build_queue()
+        queue.start()
+        job_id = queue.submit("test.long", {}, owner_user_id=1)["job_id"]
+        self.assertTrue(started.wait(5))
+        with self.session_factory() as db:
+            cancelled = queue.cancel(db, db.get(BackgroundJob, job_id))
+            self.assertTrue(cancelled.cancel_requested)
+        release.set()
+
+        job = wait_for_status(self.session_factory, job_id, {"CANCELLED", "SUCCEEDED"})
+        self.assertEqual(job.status, "CANCELLED")
+        self.assertIsNone(job.result)
+
+    def test_start_requeues_jobs_left_running(self) -> None:
+        @register_job_handler("test.recover")
+        def recover(db, job, context):
+            return {"recovered": True}
+
+        with self.session_factory() as db:
+            db.add(BackgroundJob(id="stale-job", owner_user_id=1, job_type="test.recover", status="RUNNING", attempts=1, max_attempts=2))
+            db.commit()
+
+        queue = self.build_queue()
+        queue.start()
+
+        job = wait_for_status(self.session_factory, "stale-job", {"SUCCEEDED"})
+        self.assertEqual(job.attempts, 2)
+
+    def test_start_leaves_jobs_with_a_live_heartbeat_alone(self) -> None:
+        @register_job_handler("test.elsewhere")
+        def elsewhere(db, job, context):
+            raise AssertionError("a job another process is running must not run twice")
+
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            db.add(
+                BackgroundJob(
+                    id="live-job",
+                    owner_user_id=1,
+                    job_type="test.elsewhere",
+                    status="RUNNING",
+                    attempts=1,
+                    max_attempts=2,
+                    started_at=now - timedelta(hours=1),
+                    heartbeat_at=now,
+                )
+            )
+            db.commit()
+
+        queue = self.build_queue(lease_seconds=60)
+        queue.start()
+        queue._pending.join()
+
+        with self.session_factory() as db:
+            job = db.get(BackgroundJob, "live-job")
+            self.assertEqual((job.status, job.attempts), ("RUNNING", 1))
+
+    def test_a_job_is_claimed_by_one_worker_only(self) -> None:
+        calls = []
+
+        @register_job_handler("test.once")
+        def once(db, job, context):
+            calls.append(job.id)
+            time.sleep(0.1)
+            return {"ok": True}
+
+        # Two queues over one table stand in for two processes that both saw the job.
+        first, second = self.build_queue(workers=2), self.build_queue(workers=2)
+        job_id = first.submit("test.once", {}, owner_user_id=1)["job_id"]
+        for instance in (first, second):
+            instance._pending.put(job_id)
+            instance._pending.put(job_id)
+        first.start()
+        second.start()
+
+        job = wait_for_status(self.session_factory, job_id, {"SUCCEEDED"})
+        first._pending.join()
+        second._pending.join()
+        self.assertEqual(calls, [job_id])
+        self.assertEqual(job.attempts, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import llm_cache
+import modules.simulation.service as simulation_service
+from llm_cache import LLMCacheMissError, LLMResponseCache, cached_chat_completion, llm_cache_key
+
+MESSAGES = [{"role": "system", "content": "Return JSON."}, {"role": "user", "content": "Score this idea."}]
+
+
+def completion(content: str, finish_reason: str = "stop") -> SimpleNamespace:
+    choice = SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)
+    return SimpleNamespace(choices=[choice])
+
+
+def fake_client(*contents: str) -> MagicMock:
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [completion(content) for content in contents]
+    return client
+
+
+class LLMResponseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.now = [1_000.0]
+
+    def use_cache(self, **kwargs) -> LLMResponseCache:
+        cache = LLMResponseCache(clock=lambda: self.now[0], **kwargs)
+        patcher = patch.object(llm_cache, "_shared_cache", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return cache
+
+    def call(self, client, temperature: float = 0.2, messages=MESSAGES) -> str:
+        return cached_chat_completion(
+            client,
+            model="gpt-4o-mini",
+            temperature=temperature,
+            messages=messages,
+            response_format={"type": "json_object"},
+        )
+
+    def test_key_covers_model_temperature_messages_and_response_format(self) -> None:
+        base = llm_cache_key("gpt-4o-mini", 0.2, MESSAGES, {"type": "json_object"})
+
+        self.assertEqual(base, llm_cache_key("gpt-4o-mini", 0.2, [dict(item) for item in MESSAGES], {"type": "json_object"}))
+        self.assertNotEqual(base, llm_cache_key("gpt-4o", 0.2, MESSAGES, {"type": "json_object"}))
+        self.assertNotEqual(base, llm_cache_key("gpt-4o-mini", 0.7, MESSAGES, {"type": "json_object"}))
+        self.assertNotEqual(base, llm_cache_key("gpt-4o-mini", 0.2, MESSAGES[:1], {"type": "json_object"}))
+        self.assertNotEqual(base, llm_cache_key("gpt-4o-mini", 0.2, MESSAGES, None))
+
+    def test_identical_request_skips_the_network_until_ttl_expires(self) -> None:
+        cache = self.use_cache(mode="cache", ttl_seconds=60, max_entries=8, directory="")
+        client = fake_client('{"score": 1}', '{"score": 2}', '{"score": 3}')
+
+        self.assertEqual(self.call(client), '{"score": 1}')
+        self.assertEqual(self.call(client), '{"score": 1}')
+        self.assertEqual(self.call(client, temperature=0.7), '{"score": 2}')
+        self.now[0] += 61
+        self.assertEqual(self.call(client), '{"score": 3}')
+
+        self.assertEqual(client.chat.completions.create.call_count, 3)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expired"]), (1, 3, 1))
+
+    def test_memory_is_bounded_and_unusable_responses_are_not_cached(self) -> None:
+        cache = self.use_cache(mode="cache", ttl_seconds=60, max_entries=2, directory="")
+        for index in range(3):
+            self.call(fake_client('{"ok": true}'), messages=[{"role": "user", "content": f"prompt {index}"}])
+        self.assertEqual((cache.stats()["entries"], cache.stats()["evictions"]), (2, 1))
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [
+            completion("not json"),
+            completion('{"partial": ', finish_reason="length"),
+            completion('{"ok": true}'),
+        ]
+        for _ in range(3):
+            self.call(client, temperature=0.0)
+        self.assertEqual(client.chat.completions.create.call_count, 3)
+
+    def test_record_then_replay_runs_offline(self) -> None:
+        fixtures = Path(self.temp_dir.name) / "fixtures"
+        self.use_cache(mode="record", ttl_seconds=60, max_entries=8, directory=str(fixtures))
+        client = fake_client('{"score": 1}', '{"score": 2}')
+        self.call(client)
+        # Record mode always refreshes from the API and overwrites the fixture.
+        self.call(client)
+
+        recorded = list(fixtures.glob("*.json"))
+        self.assertEqual(len(recorded), 1)
+        fixture = json.loads(recorded[0].read_text(encoding="utf-8"))
+        self.assertEqual(fixture["content"], '{"score": 2}')
+        self.assertEqual(fixture["request"]["messages"], MESSAGES)
+
+        self.use_cache(mode="replay", ttl_seconds=60, max_entries=8, directory=str(fixtures))
+        self.now[0] += 10 * 365 * 24 * 3600
+        self.assertEqual(self.call(None), '{"score": 2}')
+        with self.assertRaises(LLMCacheMissError):
+            self.call(None, temperature=0.9)
+
+    def test_disk_cache_survives_restart_within_ttl(self) -> None:
+        directory = str(Path(self.temp_dir.name) / "cache")
+        self.use_cache(mode="cache", ttl_seconds=60, max_entries=8, directory=directory)
+        self.call(fake_client('{"score": 1}'))
+
+        restarted = self.use_cache(mode="cache", ttl_seconds=60, max_entries=8, directory=directory)
+        client = fake_client('{"score": 2}')
+        self.assertEqual(self.call(client), '{"score": 1}')
+        self.assertEqual(restarted.stats()["disk_hits"], 1)
+        self.now[0] += 61
+        restarted.clear()
+        self.assertEqual(self.call(client), '{"score": 2}')
+
+    def test_record_and_replay_require_a_fixture_directory(self) -> None:
+        with self.assertRaises(ValueError):
+            LLMResponseCache(mode="replay", directory="")
+        with self.assertRaises(ValueError):
+            LLMResponseCache(mode="sometimes")
+
+    def test_simulation_agents_replay_without_a_client(self) -> None:
+        fixtures = str(Path(self.temp_dir.name) / "fixtures")
+        self.use_cache(mode="record", ttl_seconds=60, max_entries=8, directory=fixtures)
+        client = fake_client('{"summary": "Solid.", "confidence": 71}')
+        with patch.object(simulation_service, "client", client):
+            recorded = simulation_service._invoke_json("You are a Market Analyst.", "Score Atlas.")
+
+        self.use_cache(mode="replay", ttl_seconds=60, max_entries=8, directory=fixtures)
+        with patch.object(simulation_service, "client", None):
+            replayed = simulation_service._invoke_json("You are a Market Analyst.", "Score Atlas.")
+
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(replayed["confidence"], 71)
+
+
+if __name__ == "__main__":
+    unittest.main()
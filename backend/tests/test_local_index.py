@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+import tools
+from rag import backends, local_index
+from rag.local_index import LocalIndexBackend, LocalVectorIndex, hashed_embeddings
+
+
+def _chunk(text: str, document_id: str, **extra) -> dict:
+    return {"chunk_text": text, "document_id": document_id, "source": f"{document_id}.md", **extra}
+
+
+class LocalVectorIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.directory = Path(self.temp_dir.name) / "index"
+
+    def test_hashed_embeddings_are_deterministic_and_normalized(self) -> None:
+        first = hashed_embeddings(["pricing strategy for SMEs", ""], dim=64)
+        second = hashed_embeddings(["pricing strategy for SMEs", ""], dim=64)
+
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(first.dtype, np.float32)
+        self.assertAlmostEqual(float(np.linalg.norm(first[0])), 1.0, places=5)
+        self.assertEqual(float(np.abs(first[1]).sum()), 0.0)
+
+    def test_search_matches_brute_force_over_memory_mapped_matrix(self) -> None:
+        rng = np.random.default_rng(3)
+        vectors = rng.standard_normal((300, 16)).astype(np.float32)
+        index = LocalVectorIndex(str(self.directory), dim=16)
+        index.add([_chunk(f"chunk {row}", f"doc{row}") for row in range(200)], vectors[:200])
+        index.add([_chunk(f"chunk {row}", f"doc{row}") for row in range(200, 300)], vectors[200:])
+        queries = rng.standard_normal((4, 16)).astype(np.float32)
+
+        with patch.object(local_index, "LOCAL_INDEX_BLOCK_ROWS", 64):
+            results = index.search_vectors(queries, top_k=7, include_embeddings=True)
+
+        self.assertIsInstance(index.matrix, np.memmap)
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        for query, docs in zip(queries, results):
+            scores = normalized @ (query / np.linalg.norm(query))
+            expected = [f"doc{row}" for row in np.argsort(-scores)[:7]]
+            self.assertEqual([doc["document_id"] for doc in docs], expected)
+            self.assertAlmostEqual(docs[0]["similarity"], float(scores.max()), places=5)
+            self.assertEqual(len(docs[0]["embedding"]), 16)
+
+    def test_filters_match_pgvector_semantics_and_reject_unknown_keys(self) -> None:
+        index = LocalVectorIndex(str(self.directory), dim=32)
+        chunks = [
+            _chunk("market sizing for retail", "a", user_id="u1", document_type="pdf", metadata={"page_start": 1}),
+            _chunk("market sizing for retail", "b", user_id="u2", document_type="pdf", metadata={"page_start": 2}),
+            _chunk("market sizing for retail", "c", user_id="u1", document_type="docx"),
+        ]
+        index.add(chunks, hashed_embeddings([chunk["chunk_text"] for chunk in chunks], 32))
+        query = hashed_embeddings(["retail market"], 32)
+
+        def ids(filters):
+            return sorted(doc["document_id"] for doc in index.search_vectors(query, 5, filters)[0])
+
+        self.assertEqual(ids({"user_id": "u1"}), ["a", "c"])
+        self.assertEqual(ids({"user_id": ["u1", "u2"], "document_type": "pdf"}), ["a", "b"])
+        self.assertEqual(ids({"source": "B.MD"}), ["b"])
+        self.assertEqual(ids({"metadata": {"page_start": 2}}), ["b"])
+        self.assertEqual(ids({"user_id": None}), ["a", "b", "c"])
+        self.assertEqual(ids({"user_id": "nobody"}), [])
+        with self.assertRaises(ValueError):
+            index.search_vectors(query, 5, {"tenant": "u1"})
+
+    def test_reopen_restores_rows_and_ignores_interrupted_append(self) -> None:
+        index = LocalVectorIndex(str(self.directory), dim=8)
+        index.add([_chunk("alpha", "a"), _chunk("beta", "b")], np.eye(8, dtype=np.float32)[:2])
+        # Simulate a crash after the data files were written but before the manifest was updated.
+        with open(self.directory / "embeddings.f32", "ab") as f:
+            f.write(np.ones(8, dtype=np.float32).tobytes())
+        with open(self.directory / "chunks.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"chunk_text": "partial"')
+
+        reopened = LocalVectorIndex(str(self.directory))
+        self.assertEqual((reopened.rows, reopened.dim), (2, 8))
+        reopened.add([_chunk("gamma", "c")], np.eye(8, dtype=np.float32)[2:3])
+
+        final = LocalVectorIndex(str(self.directory))
+        self.assertEqual([chunk["chunk_text"] for chunk in final.chunks], ["alpha", "beta", "gamma"])
+        docs = final.search_vectors(np.eye(8, dtype=np.float32)[2], top_k=1)[0]
+        self.assertEqual(docs[0]["document_id"], "c")
+        with self.assertRaises(ValueError):
+            final.add([_chunk("wrong", "d")], np.ones((1, 4), dtype=np.float32))
+
+
+class LocalBackendRetrievalTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        index = LocalVectorIndex(temp_dir.name, dim=128)
+        texts = [
+            "Customer acquisition cost falls when referral programs reward existing users.",
+            "Unit economics: gross margin must cover support and hosting costs.",
+            "Regulatory approval timelines for medical devices can exceed eighteen months.",
+        ]
+        index.add([_chunk(text, f"doc{row}") for row, text in enumerate(texts)], hashed_embeddings(texts, 128))
+
+        backend = LocalIndexBackend.__new__(LocalIndexBackend)
+        backend.index = index
+        backends.reset_retrieval_backends()
+        self.addCleanup(backends.reset_retrieval_backends)
+        backends._instances["local"] = backend
+        patcher = patch.object(backends, "RETRIEVAL_BACKEND", "local")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_retrieve_docs_uses_local_backend_without_database_or_openai(self) -> None:
+        with patch.object(tools, "DATABASE_URL", None), patch.object(tools, "get_db") as get_db, patch.object(
+            tools, "_get_openai_client"
+        ) as get_client:
+            docs = tools.retrieve_docs("medical devices regulatory approval", top_k=2)
+            batches = tools.retrieve_docs_batch(["referral programs", "gross margin"], top_k=1)
+
+        get_db.assert_not_called()
+        get_client.assert_not_called()
+        self.assertEqual(docs[0]["document_id"], "doc2")
+        self.assertEqual([batch[0]["document_id"] for batch in batches], ["doc0", "doc1"])
+
+    def test_simulation_tool_context_runs_offline(self) -> None:
+        from modules.simulation import service
+
+        context = service._tool_context("How long do medical device regulatory approvals take?", top_k=2)
+
+        self.assertIn("doc2.md", context.splitlines()[0])
+        self.assertIn("eighteen months", context)
+
+    def test_unknown_filter_raises_to_the_caller(self) -> None:
+        with self.assertRaises(ValueError):
+            tools.retrieve_docs_batch(["margin"], filters={"tenant": "x"})
+
+    def test_backend_without_search_fails_when_constructed(self) -> None:
+        class IncompleteBackend(backends.RetrievalBackend):
+            name = "incomplete"
+
+        patcher = patch.dict(backends._factories, {"incomplete": IncompleteBackend})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        with self.assertRaises(TypeError):
+            backends.get_retrieval_backend("incomplete")
+        self.assertNotIn("incomplete", backends._instances)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, BusinessInsightReport, RenderedArtifact, SimulationRun, User
+from pagination import after_cursor, decode_cursor, encode_cursor, newest_first, next_cursor
+from platform_service import REPORT_LIST_COLUMNS, serialize_report_list_item
+
+
+class CursorTests(unittest.TestCase):
+    def test_cursor_round_trips_and_rejects_garbage(self) -> None:
+        created_at = datetime(2026, 3, 1, 12, 30, 15, 250)
+        cursor = encode_cursor(created_at, "3f2b")
+
+        self.assertEqual(decode_cursor(cursor), (created_at, "3f2b"))
+        self.assertEqual(decode_cursor(encode_cursor(None, "3f2b")), (None, "3f2b"))
+        for bad in ("garbage", "", encode_cursor(created_at, "x")[:-6]):
+            with self.assertRaises(ValueError):
+                decode_cursor(bad)
+
+
+class KeysetListingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://")
+        self.addCleanup(self.engine.dispose)
+        Base.metadata.create_all(
+            self.engine,
+            tables=[User.__table__, SimulationRun.__table__, RenderedArtifact.__table__, BusinessInsightReport.__table__],
+        )
+        self.Session = sessionmaker(bind=self.engine, autoflush=False)
+        started = datetime(2026, 1, 1)
+        with self.Session() as db:
+            owner = User(email="founder@example.com", full_name="Founder", hashed_password="x")
+            db.add(owner)
+            db.flush()
+            for index in range(9):
+                # The first three share a timestamp, so the id breaks the tie; the last two are undated.
+                created_at = started if index < 3 else started + timedelta(minutes=index)
+                run = SimulationRun(owner_email=owner.email, startup_name=f"Run {index}", created_at=created_at)
+                db.add(run)
+                db.flush()
+                db.add(
+                    BusinessInsightReport(
+                        owner_user_id=owner.id,
+                        simulation_id=run.id,
+                        summary=f"Report {index}",
+                        sections=[{"title": "s"}] * index,
+                        key_findings=["finding"],
+                        recommended_actions="not a list",
+                        created_at=created_at,
+                    )
+                )
+            db.flush()
+            # A None passed to the constructor gets the column default, so clear the timestamps here.
+            for model in (SimulationRun, BusinessInsightReport):
+                db.query(model).filter(model.created_at >= started + timedelta(minutes=7)).update(
+                    {model.created_at: None}, synchronize_session=False
+                )
+            db.commit()
+
+    def _walk(self, page_size: int) -> list[str]:
+        order = newest_first(BusinessInsightReport.created_at, BusinessInsightReport.id)
+        seen: list[str] = []
+        cursor = None
+        with self.Session() as db:
+            while True:
+                statement = select(*REPORT_LIST_COLUMNS).order_by(*order).limit(page_size + 1)
+                if cursor:
+                    statement = statement.where(
+                        after_cursor(BusinessInsightReport.created_at, BusinessInsightReport.id, cursor)
+                    )
+                rows = db.execute(statement).all()
+                seen.extend(row.summary for row in rows[:page_size])
+                cursor = next_cursor(rows, page_size)
+                if cursor is None:
+                    return seen
+
+    def test_keyset_pages_cover_every_row_once_in_order(self) -> None:
+        with self.Session() as db:
+            expected = db.execute(
+                select(BusinessInsightReport.summary).order_by(
+                    *newest_first(BusinessInsightReport.created_at, BusinessInsightReport.id)
+                )
+            ).scalars().all()
+
+        self.assertEqual(set(expected[-2:]), {"Report 7", "Report 8"})
+        for page_size in (1, 2, 3, 7, 10):
+            self.assertEqual(self._walk(page_size), expected)
+
+    def test_list_projection_skips_the_heavy_columns(self) -> None:
+        statements: list[str] = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        with self.Session() as db:
+            row = db.execute(
+                select(*REPORT_LIST_COLUMNS).where(BusinessInsightReport.summary == "Report 4")
+            ).one()
+        item = serialize_report_list_item(row)
+
+        self.assertEqual(
+            (item["sections_count"], item["key_findings_count"], item["recommended_actions_count"]),
+            (4, 1, 0),
+        )
+        for heavy in ("key_findings,", "sections,", "recommended_actions,"):
+            self.assertNotIn(heavy, statements[0])
+
+    def test_counts_follow_reassigned_lists(self) -> None:
+        with self.Session() as db:
+            report = db.query(BusinessInsightReport).filter(BusinessInsightReport.summary == "Report 2").one()
+            report.sections = []
+            report.recommended_actions = ["ship", "hire"]
+            db.commit()
+            item = serialize_report_list_item(report)
+
+        self.assertEqual((item["sections_count"], item["recommended_actions_count"]), (0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, User, UserAccessProfile
+from principal_cache import PrincipalCache, attach, snapshot
+
+
+class PrincipalCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = [100.0]
+        self.cache = PrincipalCache(ttl_seconds=30, max_entries=2, clock=lambda: self.now[0])
+
+    def test_entries_expire_and_hit_rate_is_reported(self) -> None:
+        self.assertIsNone(self.cache.get_user("token-a"))
+        self.cache.put_user("token-a", {"id": 1, "email": "a@example.com"})
+        self.cache.put_profile(1, {"id": 7, "user_id": 1, "role": "FOUNDER"})
+
+        self.assertEqual(self.cache.get_user("token-a")["email"], "a@example.com")
+        self.assertEqual(self.cache.get_profile(1)["role"], "FOUNDER")
+        self.assertIsNone(self.cache.get_user("token-b"))
+        self.now[0] += 31
+        self.assertIsNone(self.cache.get_user("token-a"))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["user_hits"], stats["user_misses"], stats["profile_hits"]), (1, 3, 1))
+        self.assertEqual(stats["hit_rate"], 0.4)
+        self.assertEqual(stats["users"], 0)
+
+    def test_size_is_bounded_lru(self) -> None:
+        for index in range(3):
+            self.cache.put_user(f"token-{index}", {"id": index, "email": f"u{index}@example.com"})
+
+        self.assertIsNone(self.cache.get_user("token-0"))
+        self.assertIsNotNone(self.cache.get_user("token-2"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_invalidate_drops_every_token_and_the_profile_of_a_user(self) -> None:
+        self.cache = PrincipalCache(ttl_seconds=30, max_entries=8, clock=lambda: self.now[0])
+        self.cache.put_user("laptop", {"id": 1, "email": "a@example.com"})
+        self.cache.put_user("phone", {"id": 1, "email": "a@example.com"})
+        self.cache.put_user("other", {"id": 2, "email": "b@example.com"})
+        self.cache.put_profile(1, {"id": 7, "user_id": 1, "role": "FOUNDER"})
+
+        self.cache.invalidate(user_id=1, email="a@example.com")
+
+        self.assertIsNone(self.cache.get_user("laptop"))
+        self.assertIsNone(self.cache.get_user("phone"))
+        self.assertIsNone(self.cache.get_profile(1))
+        self.assertIsNotNone(self.cache.get_user("other"))
+
+    def test_zero_ttl_disables_the_cache(self) -> None:
+        cache = PrincipalCache(ttl_seconds=0, max_entries=8)
+        cache.put_user("token", {"id": 1, "email": "a@example.com"})
+        self.assertIsNone(cache.get_user("token"))
+        self.assertFalse(cache.stats()["enabled"])
+
+
+class AttachSnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://")
+        self.addCleanup(self.engine.dispose)
+        Base.metadata.create_all(self.engine, tables=[User.__table__, UserAccessProfile.__table__])
+        self.Session = sessionmaker(bind=self.engine, autoflush=False)
+        with self.Session() as db:
+            user = User(email="a@example.com", full_name="Ada", hashed_password="x")
+            db.add(user)
+            db.commit()
+            db.add(UserAccessProfile(user_id=user.id, role="FOUNDER", title=""))
+            db.commit()
+            self.user_values = snapshot(user)
+            self.profile_values = snapshot(db.query(UserAccessProfile).one())
+        self.statements: list[str] = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement.split()[0].upper())
+
+    def test_attached_snapshot_needs_no_select_and_can_be_updated(self) -> None:
+        with self.Session() as db:
+            user = attach(db, User, self.user_values)
+            profile = attach(db, UserAccessProfile, self.profile_values)
+            self.assertEqual((user.email, profile.role), ("a@example.com", "FOUNDER"))
+            self.assertEqual(self.statements, [])
+            self.assertIs(attach(db, User, self.user_values), user)
+
+            profile.title = "CTO"
+            db.commit()
+
+        self.assertNotIn("SELECT", self.statements[:1])
+        self.assertIn("UPDATE", self.statements)
+        with self.Session() as db:
+            self.assertEqual(db.query(UserAccessProfile.title).scalar(), "CTO")
+            self.assertEqual(db.query(User.full_name).scalar(), "Ada")
+
+
+if __name__ == "__main__":
+    unittest.main()
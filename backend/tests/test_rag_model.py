@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import random
+import unittest
+from unittest.mock import patch
+
+from rag import model
+
+
+def build_candidates(count: int, dim: int, seed: int = 3) -> list[tuple[str, list[float], str]]:
+    rng = random.Random(seed)
+    return [
+        (f"chunk-{index}", [rng.uniform(-1, 1) for _ in range(dim)], f"doc-{index}")
+        for index in range(count)
+    ]
+
+
+class MmrSelectTests(unittest.TestCase):
+    def test_first_pick_is_most_relevant_and_near_duplicates_are_skipped(self) -> None:
+        query = [1.0, 0.0, 0.0]
+        candidates = [
+            ("best", [1.0, 0.05, 0.0], "d1"),
+            ("near-duplicate", [1.0, 0.06, 0.0], "d2"),
+            ("different", [0.6, 0.0, 0.8], "d3"),
+        ]
+
+        selected = model.mmr_select(query, candidates, top_k=2, lambda_param=0.5)
+
+        self.assertEqual(selected, [("best", "d1"), ("different", "d3")])
+
+    def test_numpy_and_python_paths_select_the_same_chunks(self) -> None:
+        candidates = build_candidates(60, 24)
+        query = [random.Random(9).uniform(-1, 1) for _ in range(24)]
+
+        vectorized = model.mmr_select(query, candidates, top_k=8, lambda_param=0.6)
+        with patch.object(model, "np", None):
+            fallback = model.mmr_select(query, candidates, top_k=8, lambda_param=0.6)
+
+        self.assertEqual(vectorized, fallback)
+        self.assertEqual(len({doc_id for _, doc_id in vectorized}), 8)
+
+    def test_handles_empty_input_and_top_k_larger_than_candidates(self) -> None:
+        self.assertEqual(model.mmr_select([1.0, 0.0], [], top_k=3), [])
+
+        selected = model.mmr_select([1.0, 0.0], [("a", [1.0, 0.0], "d1"), ("b", [0.0, 0.0], "d2")], top_k=5)
+
+        self.assertEqual(sorted(selected), [("a", "d1"), ("b", "d2")])
+
+
+if __name__ == "__main__":
+    unittest.main()
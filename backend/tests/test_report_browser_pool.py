@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import modules.simulation.reporting.browser_pool as browser_pool_module
+from modules.simulation.reporting.browser_pool import ChromiumBrowserPool
+
+
+class FakePage:
+    def __init__(self, browser: "FakeBrowser") -> None:
+        self.browser = browser
+        self.content = ""
+
+    def set_content(self, html: str, wait_until: str) -> None:
+        self.content = html
+
+    def emulate_media(self, media: str) -> None:
+        pass
+
+    def pdf(self, **options) -> bytes:
+        with self.browser.launcher.lock:
+            self.browser.launcher.active += 1
+            self.browser.launcher.peak = max(self.browser.launcher.peak, self.browser.launcher.active)
+        try:
+            time.sleep(self.browser.launcher.render_delay)
+            if self.content == "crash" and not self.browser.launcher.crashed_once:
+                self.browser.launcher.crashed_once = True
+                self.browser.connected = False
+                raise RuntimeError("Target page, context or browser has been closed")
+            if self.content == "bad":
+                raise ValueError("render error")
+            return f"%PDF {self.content} {options['format']}".encode()
+        finally:
+            with self.browser.launcher.lock:
+                self.browser.launcher.active -= 1
+
+
+class FakeContext:
+    def __init__(self, browser: "FakeBrowser") -> None:
+        self.browser = browser
+
+    def new_page(self) -> FakePage:
+        return FakePage(self.browser)
+
+    def close(self) -> None:
+        self.browser.contexts_closed += 1
+
+
+class FakeBrowser:
+    def __init__(self, launcher: "FakeLauncher") -> None:
+        self.launcher = launcher
+        self.connected = True
+        self.closed = False
+        self.contexts_closed = 0
+
+    def new_context(self) -> FakeContext:
+        return FakeContext(self)
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeLauncher:
+    def __init__(self, render_delay: float = 0.0) -> None:
+        self.render_delay = render_delay
+        self.browsers: list[FakeBrowser] = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.crashed_once = False
+
+    def __call__(self) -> "FakeLauncher":
+        return self
+
+    def start(self) -> "FakeLauncher":
+        return self
+
+    def stop(self) -> None:
+        pass
+
+    @property
+    def chromium(self) -> "FakeLauncher":
+        return self
+
+    def launch(self, args: list[str]) -> FakeBrowser:
+        browser = FakeBrowser(self)
+        self.browsers.append(browser)
+        return browser
+
+
+class ChromiumBrowserPoolTests(unittest.TestCase):
+    def build_pool(self, launcher: FakeLauncher, **kwargs) -> ChromiumBrowserPool:
+        launcher_patch = patch.object(browser_pool_module, "sync_playwright", launcher)
+        launcher_patch.start()
+        self.addCleanup(launcher_patch.stop)
+        pool = ChromiumBrowserPool(render_timeout_seconds=5, **kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_browser_is_reused_and_recycled_after_max_renders(self) -> None:
+        launcher = FakeLauncher()
+        pool = self.build_pool(launcher, size=1, max_renders_per_browser=2)
+
+        outputs = [pool.render_pdf(f"doc-{index}", {"format": "A4"}) for index in range(3)]
+
+        self.assertEqual(outputs[0], b"%PDF doc-0 A4")
+        self.assertEqual(len(launcher.browsers), 2)
+        self.assertTrue(launcher.browsers[0].closed)
+        self.assertEqual(launcher.browsers[0].contexts_closed, 2)
+        self.assertEqual(pool.stats()["recycles"], 1)
+
+    def test_parallel_renders_are_limited_to_pool_size(self) -> None:
+        launcher = FakeLauncher(render_delay=0.05)
+        pool = self.build_pool(launcher, size=2)
+
+        threads = [threading.Thread(target=pool.render_pdf, args=(f"doc-{i}", {"format": "A4"})) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(launcher.peak, 2)
+        self.assertEqual(len(launcher.browsers), 2)
+        self.assertEqual(pool.stats()["renders"], 6)
+
+    def test_crashed_browser_is_relaunched_and_render_retried(self) -> None:
+        launcher = FakeLauncher()
+        pool = self.build_pool(launcher, size=1)
+
+        self.assertEqual(pool.render_pdf("crash", {"format": "A4"}), b"%PDF crash A4")
+        self.assertEqual(len(launcher.browsers), 2)
+        self.assertEqual(pool.stats()["crashes"], 1)
+
+    def test_render_errors_surface_without_relaunching(self) -> None:
+        launcher = FakeLauncher()
+        pool = self.build_pool(launcher, size=1)
+
+        with self.assertRaises(ValueError):
+            pool.render_pdf("bad", {"format": "A4"})
+        pool.render_pdf("ok", {"format": "A4"})
+
+        self.assertEqual(len(launcher.browsers), 1)
+        self.assertEqual(pool.stats()["failures"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
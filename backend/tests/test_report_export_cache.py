@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+
+from modules.simulation.reporting.export_cache import ReportExportCache, build_export_cache_key
+
+
+def cache_key(**overrides: str) -> str:
+    values = {
+        "content_hash": "abc123",
+        "template_id": "obsidian_board",
+        "quality": "standard",
+        "export_format": "pdf",
+        "renderer_version": "1:weasyprint",
+        "context": "sim-1|",
+    }
+    values.update(overrides)
+    return build_export_cache_key(**values)
+
+
+class ReportExportCacheTests(unittest.TestCase):
+    def test_key_changes_with_every_component(self) -> None:
+        base = cache_key()
+
+        self.assertEqual(base, cache_key())
+        for field, value in (
+            ("content_hash", "def456"),
+            ("template_id", "classic"),
+            ("quality", "premium"),
+            ("export_format", "html"),
+            ("renderer_version", "1:playwright"),
+            ("context", "sim-2|"),
+        ):
+            self.assertNotEqual(base, cache_key(**{field: value}), field)
+
+    def test_memory_tier_is_bounded_by_bytes(self) -> None:
+        cache = ReportExportCache(max_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        self.assertEqual(cache.get("a"), b"12345")
+
+        cache.put("c", b"12345")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"12345")
+        stats = cache.stats()
+        self.assertEqual(stats["bytes"], 10)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_oversized_artifacts_skip_memory(self) -> None:
+        cache = ReportExportCache(max_bytes=4)
+        cache.put("big", b"123456")
+
+        self.assertIsNone(cache.get("big"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_disk_tier_survives_a_new_cache_instance(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            ReportExportCache(max_bytes=1024, directory=directory).put(cache_key(), b"%PDF-1.7")
+
+            restarted = ReportExportCache(max_bytes=1024, directory=directory)
+
+            self.assertEqual(restarted.get(cache_key()), b"%PDF-1.7")
+            self.assertEqual(restarted.stats()["disk_hits"], 1)
+            self.assertEqual(restarted.get(cache_key()), b"%PDF-1.7")
+            self.assertEqual(restarted.stats()["disk_hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
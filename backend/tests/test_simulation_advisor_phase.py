@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import modules.simulation.service as service_module
+from modules.simulation.schemas import SimulationRunRequest
+
+
+def build_payload() -> SimulationRunRequest:
+    return SimulationRunRequest(
+        startup_name="Atlas Finance",
+        problem_statement="SMEs struggle to manage fragmented cash positions across markets.",
+        target_audience="Finance leads at cross-border SMEs",
+        primary_target_segment="VC-backed SMEs in West Africa",
+        geography="Nigeria",
+        customer_behavior_pain_points="Manual spreadsheets and delayed FX reconciliation.",
+        monthly_burn="40k",
+        estimated_cac="900",
+        current_cash_in_hand="600k",
+    )
+
+
+def advisor_feedback(confidence: int) -> dict:
+    return {
+        "summary": "Advisor summary.",
+        "risks": ["Risk"],
+        "opportunities": ["Opportunity"],
+        "confidence": confidence,
+    }
+
+
+def chair_feedback() -> dict:
+    return {"go_no_go": "GO", "synthesis": "Proceed with a pilot.", "next_steps": ["Run pilot"]}
+
+
+class SimulationAdvisorPhaseTests(unittest.TestCase):
+    def setUp(self) -> None:
+        context_patch = patch.object(service_module, "_contexts_with_counts", return_value=[("", 0)] * 3)
+        context_patch.start()
+        self.addCleanup(context_patch.stop)
+
+    def _fake_invoke(self, delay: float = 0.0, fail_prefix: str | None = None):
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def invoke(system_prompt: str, user_prompt: str) -> dict:
+            if system_prompt.startswith("You are the Board Chair"):
+                return chair_feedback()
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            try:
+                time.sleep(delay)
+                if fail_prefix and system_prompt.startswith(fail_prefix):
+                    raise ValueError("upstream timeout")
+                return advisor_feedback(70)
+            finally:
+                with lock:
+                    active["now"] -= 1
+
+        return invoke, active
+
+    def test_parallel_advisors_overlap_and_keep_log_order(self) -> None:
+        invoke, active = self._fake_invoke(delay=0.2)
+        with patch.object(service_module, "PARALLEL_ADVISORS", True), patch.object(service_module, "_invoke_json", invoke):
+            started = time.perf_counter()
+            result = service_module.run_simulation(build_payload())
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(active["peak"], 3)
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual([log.sequence for log in result.logs], list(range(1, len(result.logs) + 1)))
+        analysis = [(log.role, log.status) for log in result.logs if log.phase == "analysis"]
+        self.assertEqual(
+            analysis,
+            [
+                ("MARKET ANALYST", "running"),
+                ("CUSTOMER AGENT", "running"),
+                ("INVESTOR AGENT", "running"),
+                ("MARKET ANALYST", "done"),
+                ("CUSTOMER AGENT", "done"),
+                ("INVESTOR AGENT", "done"),
+            ],
+        )
+        self.assertEqual(result.metrics["marketViability"], 70)
+
+    def test_sequential_mode_interleaves_running_and_done_logs(self) -> None:
+        invoke, active = self._fake_invoke()
+        with patch.object(service_module, "PARALLEL_ADVISORS", False), patch.object(service_module, "_invoke_json", invoke):
+            result = service_module.run_simulation(build_payload())
+
+        self.assertEqual(active["peak"], 1)
+        statuses = [log.status for log in result.logs if log.phase == "analysis"]
+        self.assertEqual(statuses, ["running", "done"] * 3)
+
+    def test_on_log_receives_every_log_as_it_is_written(self) -> None:
+        invoke, _ = self._fake_invoke()
+        streamed = []
+        with patch.object(service_module, "PARALLEL_ADVISORS", True), patch.object(service_module, "_invoke_json", invoke):
+            result = service_module.run_simulation(build_payload(), on_log=streamed.append)
+
+        self.assertEqual([log.sequence for log in streamed], [log.sequence for log in result.logs])
+        self.assertIs(type(result.logs), list)
+
+    def test_on_advisor_receives_feedback_as_each_advisor_finishes(self) -> None:
+        delays = {"You are a rigorous Market Analyst": 0.3, "You are a Target Customer": 0.0}
+
+        def invoke(system_prompt: str, user_prompt: str) -> dict:
+            if system_prompt.startswith("You are the Board Chair"):
+                return chair_feedback()
+            time.sleep(next((delay for prefix, delay in delays.items() if system_prompt.startswith(prefix)), 0.15))
+            return advisor_feedback(70)
+
+        finished = []
+        with patch.object(service_module, "PARALLEL_ADVISORS", True), patch.object(service_module, "_invoke_json", invoke):
+            result = service_module.run_simulation(
+                build_payload(),
+                on_advisor=lambda role, feedback: finished.append((role, feedback.perspective, feedback.confidence)),
+            )
+
+        self.assertEqual(
+            finished,
+            [
+                ("CUSTOMER AGENT", "Customer Agent", 70),
+                ("INVESTOR AGENT", "Investor Agent", 70),
+                ("MARKET ANALYST", "Market Analyst", 70),
+            ],
+        )
+        self.assertEqual([agent.perspective for agent in result.agents], ["Market Analyst", "Customer Agent", "Investor Agent"])
+
+    def test_parallel_advisor_failure_fails_the_whole_run(self) -> None:
+        invoke, _ = self._fake_invoke(fail_prefix="You are a Target Customer")
+        with patch.object(service_module, "PARALLEL_ADVISORS", True), patch.object(service_module, "_invoke_json", invoke):
+            with self.assertRaisesRegex(RuntimeError, "Customer agent failed during simulation"):
+                service_module.run_simulation(build_payload())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import unittest
+
+from modules.simulation.schemas import AgentFeedback, SimulationLog, SimulationRunResponse
+from modules.simulation.streaming import SimulationEventStream, SimulationStreamClosed, sse_event
+
+
+def build_result() -> SimulationRunResponse:
+    return SimulationRunResponse(
+        simulation_id="sim-1",
+        startup_name="Atlas Finance",
+        metrics={"marketViability": 70},
+        overall_score=68,
+        recommendations=["Run pilot"],
+        agents=[],
+        synthesis="Proceed.",
+        logs=[],
+    )
+
+
+def parse_frames(frames: list[str]) -> list[tuple[str, dict | None, str | None]]:
+    events = []
+    for frame in frames:
+        if frame.startswith(":"):
+            events.append(("heartbeat", None, None))
+            continue
+        fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+        events.append((fields["event"], json.loads(fields["data"]), fields.get("id")))
+    return events
+
+
+async def collect(stream: SimulationEventStream, run) -> list[str]:
+    return [frame async for frame in stream.run(run)]
+
+
+class SimulationEventStreamTests(unittest.TestCase):
+    def test_sse_event_format(self) -> None:
+        self.assertEqual(sse_event("log", {"a": 1}, "3"), 'event: log\nid: 3\ndata: {"a": 1}\n\n')
+        self.assertEqual(sse_event("result", {"b": 2}), 'event: result\ndata: {"b": 2}\n\n')
+
+    def test_streams_logs_advisor_results_and_final_result_in_order(self) -> None:
+        def run(stream: SimulationEventStream) -> SimulationRunResponse:
+            stream.on_log(SimulationLog(role="SIMULATION ROOM", message="Opened.", phase="briefing", sequence=1))
+            stream.on_advisor(
+                "MARKET ANALYST",
+                AgentFeedback(perspective="Market Analyst", summary="Solid.", risks=[], opportunities=[], confidence=70),
+            )
+            stream.on_log(SimulationLog(role="BOARD CHAIR", message="Done.", phase="synthesis", sequence=2))
+            return build_result()
+
+        async def scenario():
+            stream = SimulationEventStream(asyncio.get_running_loop())
+            return await collect(stream, run), stream
+
+        frames, stream = asyncio.run(scenario())
+        events = parse_frames(frames)
+
+        self.assertEqual([event[0] for event in events], ["log", "advisor", "log", "result"])
+        self.assertEqual([event[2] for event in events], ["1", None, "2", None])
+        self.assertEqual(events[1][1]["feedback"]["confidence"], 70)
+        self.assertEqual(events[3][1]["simulation_id"], "sim-1")
+        self.assertTrue(stream.closed)
+
+    def test_failure_is_reported_as_error_event(self) -> None:
+        def run(stream: SimulationEventStream) -> SimulationRunResponse:
+            stream.on_log(SimulationLog(role="SIMULATION ROOM", message="Opened.", phase="briefing", sequence=1))
+            raise RuntimeError("Customer agent failed during simulation. No score was produced.")
+
+        async def scenario():
+            return await collect(SimulationEventStream(asyncio.get_running_loop()), run)
+
+        events = parse_frames(asyncio.run(scenario()))
+
+        self.assertEqual([event[0] for event in events], ["log", "error"])
+        self.assertIn("Customer agent failed", events[1][1]["detail"])
+
+    def test_heartbeat_while_waiting_for_the_first_log(self) -> None:
+        release = threading.Event()
+
+        def run(stream: SimulationEventStream) -> SimulationRunResponse:
+            release.wait(timeout=5)
+            return build_result()
+
+        async def scenario():
+            stream = SimulationEventStream(asyncio.get_running_loop(), heartbeat_seconds=0.05)
+            frames = []
+            async for frame in stream.run(run):
+                frames.append(frame)
+                release.set()
+            return frames
+
+        events = parse_frames(asyncio.run(scenario()))
+
+        self.assertEqual(events[0][0], "heartbeat")
+        self.assertEqual(events[-1][0], "result")
+
+    def test_client_disconnect_stops_the_run_at_the_next_log(self) -> None:
+        first_sent = threading.Event()
+        disconnected = threading.Event()
+        outcome = {}
+
+        def run(stream: SimulationEventStream) -> SimulationRunResponse:
+            stream.on_log(SimulationLog(role="SIMULATION ROOM", message="Opened.", phase="briefing", sequence=1))
+            first_sent.set()
+            disconnected.wait(timeout=5)
+            try:
+                stream.on_log(SimulationLog(role="ASSUMPTION ENGINE", message="Never sent.", phase="briefing", sequence=2))
+            except SimulationStreamClosed:
+                outcome["stopped"] = True
+                raise
+            return build_result()
+
+        async def scenario():
+            stream = SimulationEventStream(asyncio.get_running_loop())
+            frames = stream.run(run)
+            first = await frames.__anext__()
+            await frames.aclose()
+            disconnected.set()
+            return first
+
+        first = asyncio.run(scenario())
+        first_sent.wait(timeout=5)
+        for _ in range(50):
+            if outcome:
+                break
+            threading.Event().wait(0.02)
+
+        self.assertEqual(parse_frames([first])[0][0], "log")
+        self.assertTrue(outcome.get("stopped"))
+
+
+if __name__ == "__main__":
+    unittest.main()
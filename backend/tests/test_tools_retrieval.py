@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import itertools
+import re
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import tools
+from rag import embedding_cache
+
+
+def embedding_response(vectors: list[list[float]]) -> SimpleNamespace:
+    # OpenAI does not guarantee response order, so hand the items back reversed.
+    items = [SimpleNamespace(index=index, embedding=vector) for index, vector in enumerate(vectors)]
+    return SimpleNamespace(data=list(reversed(items)))
+
+
+class FakeConnection:
+    def __init__(self, rows: list[tuple]) -> None:
+        self.cursor_obj = MagicMock()
+        self.cursor_obj.fetchall.return_value = rows
+
+    def cursor(self):
+        connection = self
+
+        class _Cursor:
+            def __enter__(self_inner):
+                return connection.cursor_obj
+
+            def __exit__(self_inner, *exc):
+                return False
+
+        return _Cursor()
+
+
+class RetrieveDocsBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        cache_patch = patch.object(embedding_cache, "_cache", embedding_cache.EmbeddingCache(max_entries=100, path=""))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+    def test_batch_embeds_once_and_groups_rows_by_query(self) -> None:
+        client = MagicMock()
+        client.embeddings.create.return_value = embedding_response([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+        conn = FakeConnection(
+            [
+                (0, "market chunk", "doc-1", 0.91, "market.pdf", None),
+                (2, "investor chunk", "doc-3", 0.74, "vc.pdf", {"page": 4}),
+                (0, "second market chunk", "doc-2", 0.66, "market.pdf", {}),
+            ]
+        )
+
+        with patch.object(tools, "DATABASE_URL", "postgresql://test"), patch.object(tools, "_get_openai_client", return_value=client), \
+                patch.object(tools, "get_db", return_value=conn), patch.object(tools, "release_db") as release_db:
+            results = tools.retrieve_docs_batch(["market", "customer", "investor"], top_k=2, filters={"user_id": "u-1"})
+
+        client.embeddings.create.assert_called_once()
+        self.assertEqual(client.embeddings.create.call_args.kwargs["input"], ["market", "customer", "investor"])
+        conn.cursor_obj.execute.assert_called_once()
+        sql, params = conn.cursor_obj.execute.call_args.args
+        self.assertEqual(params["query_indexes"], [0, 1, 2])
+        self.assertEqual(params["embeddings"], ["[0.1,0.2]", "[0.3,0.4]", "[0.5,0.6]"])
+        self.assertEqual((params["user_id"], params["top_k"]), ("u-1", 2))
+        self.assertIn("dc.user_id = %(user_id)s", sql)
+        release_db.assert_called_once_with(conn)
+
+        self.assertEqual([doc["chunk_text"] for doc in results[0]], ["market chunk", "second market chunk"])
+        self.assertEqual(results[1], [])
+        self.assertEqual(results[2][0]["metadata"], {"page": 4})
+
+    def test_batch_returns_empty_lists_when_embedding_fails(self) -> None:
+        client = MagicMock()
+        client.embeddings.create.side_effect = RuntimeError("rate limited")
+
+        with patch.object(tools, "DATABASE_URL", "postgresql://test"), patch.object(tools, "_get_openai_client", return_value=client):
+            results = tools.retrieve_docs_batch(["a", "b"])
+
+        self.assertEqual(results, [[], []])
+
+
+FILTER_VALUES = {
+    "document_type": "pricing",
+    "user_id": "u-1",
+    "source": "50%_off.pdf",
+    "metadata": {"page_start": 3},
+}
+
+
+class FilteredRetrievalTests(unittest.TestCase):
+    def search(self, filters: dict, **kwargs) -> tuple[str, dict]:
+        conn = FakeConnection([])
+        with patch.object(tools, "DATABASE_URL", "postgresql://test"), \
+                patch.object(tools, "generate_embedding", return_value=[0.1, 0.2]), \
+                patch.object(tools, "get_db", return_value=conn), patch.object(tools, "release_db"):
+            tools.retrieve_docs("pricing", top_k=4, filters=filters, **kwargs)
+        return conn.cursor_obj.execute.call_args.args
+
+    def test_every_filter_combination_binds_each_placeholder_by_name(self) -> None:
+        for size in range(len(FILTER_VALUES) + 1):
+            for keys in itertools.combinations(FILTER_VALUES, size):
+                with self.subTest(filters=keys):
+                    sql, params = self.search({key: FILTER_VALUES[key] for key in keys})
+
+                    self.assertEqual(set(re.findall(r"%\((\w+)\)s", sql)), {"embedding", "top_k", *keys})
+                    self.assertEqual(params["embedding"], "[0.1,0.2]")
+                    self.assertEqual(params["top_k"], 4)
+                    self.assertEqual(sql.count("WHERE"), 1 if keys else 0)
+                    self.assertEqual(sql.count(" AND "), max(0, len(keys) - 1))
+                    # Tenant-scoped searches rank the tenant's rows exactly.
+                    self.assertEqual("OFFSET 0" in sql, "user_id" in keys)
+
+    def test_filter_values_are_index_friendly(self) -> None:
+        clause, params = tools._filter_clause({**FILTER_VALUES, "user_id": ["u-1", "u-2"]})
+
+        self.assertIn("dc.user_id = ANY(%(user_id)s)", clause)
+        self.assertIn("dc.document_type = %(document_type)s", clause)
+        self.assertIn("dc.metadata @> %(metadata)s::jsonb", clause)
+        self.assertEqual(params["user_id"], ["u-1", "u-2"])
+        self.assertEqual(params["source"], "%50\\%\\_off.pdf%")
+        self.assertEqual(params["metadata"], '{"page_start": 3}')
+
+    def test_none_values_are_ignored_and_unknown_keys_raise_to_the_caller(self) -> None:
+        self.assertEqual(tools._filter_clause({"user_id": None}), ("", {}))
+        with self.assertRaises(ValueError):
+            tools._filter_clause({"tenant": "u-1"})
+        with patch.object(tools, "DATABASE_URL", "postgresql://test"), patch.object(tools, "get_db") as get_db:
+            with self.assertRaises(ValueError):
+                tools.retrieve_docs("pricing", filters={"userid": "u-1"})
+            with self.assertRaises(ValueError):
+                tools.retrieve_docs_batch(["pricing"], filters={"userid": "u-1"})
+        get_db.assert_not_called()
+
+    def test_prefilter_can_be_forced_either_way(self) -> None:
+        sql, _ = self.search({"document_type": "pricing"}, prefilter=True)
+        self.assertIn("OFFSET 0", sql)
+        sql, _ = self.search({"user_id": "u-1"}, prefilter=False)
+        self.assertNotIn("OFFSET 0", sql)
+
+
+class RerankWithMmrTests(unittest.TestCase):
+    def build_candidates(self) -> list[dict]:
+        return [
+            {"chunk_text": "a", "similarity": 0.95, "embedding": [1.0, 0.0, 0.0]},
+            {"chunk_text": "a-duplicate", "similarity": 0.94, "embedding": [0.99, 0.01, 0.0]},
+            {"chunk_text": "b", "similarity": 0.80, "embedding": [0.0, 1.0, 0.0]},
+            {"chunk_text": "c", "similarity": 0.60, "embedding": [0.0, 0.0, 1.0]},
+        ]
+
+    def test_mmr_prefers_diverse_candidates_without_embedding_calls(self) -> None:
+        with patch.object(tools, "generate_embedding") as generate_embedding:
+            ranked = tools.rerank_with_mmr("query", self.build_candidates(), top_k=2)
+
+        generate_embedding.assert_not_called()
+        self.assertEqual([doc["chunk_text"] for doc in ranked], ["a", "b"])
+
+    def test_mmr_falls_back_to_relevance_order_without_stored_embeddings(self) -> None:
+        candidates = [{"chunk_text": str(i), "similarity": 1 - i / 10} for i in range(4)]
+
+        ranked = tools.rerank_with_mmr("query", candidates, top_k=2)
+
+        self.assertEqual([doc["chunk_text"] for doc in ranked], ["0", "1"])
+
+    def test_row_to_doc_parses_pgvector_text(self) -> None:
+        doc = tools._row_to_doc(("text", "doc-1", 0.5, "src", None, "[0.25,-1,3e-2]"))
+
+        self.assertEqual(doc["embedding"], [0.25, -1, 0.03])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import tools
+from rag import embedding_cache, vector_index
+
+
+class FakeConnection:
+    def __init__(self, existing: list[str], invalid: tuple[str, ...] = ()) -> None:
+        self.autocommit = False
+        self.statements: list[str] = []
+        self.autocommit_during: list[bool] = []
+        self.existing = existing
+        self.cursor_obj = MagicMock()
+        self.cursor_obj.__enter__.return_value = self.cursor_obj
+        self.cursor_obj.execute.side_effect = self._execute
+        self.cursor_obj.fetchall.side_effect = lambda: [
+            (name, f"CREATE INDEX {name}", 8192, name not in invalid) for name in self.existing
+        ]
+        self.cursor_obj.fetchone.return_value = (250_000,)
+
+    def _execute(self, sql, params=None) -> None:
+        self.statements.append(sql)
+        self.autocommit_during.append(self.autocommit)
+
+    def cursor(self):
+        return self.cursor_obj
+
+    def rollback(self) -> None:
+        pass
+
+
+class VectorIndexTests(unittest.TestCase):
+    def test_build_sql_carries_method_specific_parameters(self) -> None:
+        hnsw = vector_index.build_index_sql("hnsw", m=24, ef_construction=128)
+        ivfflat = vector_index.build_index_sql("ivfflat", lists=300, concurrently=False)
+
+        self.assertEqual(
+            hnsw,
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_chunks_embedding_hnsw ON document_chunks "
+            "USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 128)",
+        )
+        self.assertIn("USING ivfflat (embedding vector_cosine_ops) WITH (lists = 300)", ivfflat)
+        self.assertNotIn("CONCURRENTLY", ivfflat)
+        with self.assertRaises(ValueError):
+            vector_index.build_index_sql("flat")
+
+    def test_ivfflat_lists_follow_row_count(self) -> None:
+        self.assertEqual(vector_index.ivfflat_lists_for(500), 1)
+        self.assertEqual(vector_index.ivfflat_lists_for(250_000), 250)
+        self.assertEqual(vector_index.ivfflat_lists_for(4_000_000), 2000)
+
+    def test_ensure_switches_method_concurrently_and_sizes_lists_from_rows(self) -> None:
+        conn = FakeConnection(existing=["ix_document_chunks_embedding_hnsw"])
+
+        summary = vector_index.ensure_vector_index(conn, "ivfflat")
+
+        self.assertTrue(summary["created"])
+        self.assertEqual(summary["params"], {"lists": 250})
+        self.assertEqual(summary["dropped"], ["ix_document_chunks_embedding_hnsw"])
+        creates = [sql for sql in conn.statements if sql.startswith("CREATE INDEX")]
+        self.assertEqual(len(creates), 1)
+        self.assertIn("CONCURRENTLY", creates[0])
+        self.assertTrue(conn.autocommit_during[conn.statements.index(creates[0])])
+        self.assertFalse(conn.autocommit)
+        # The old index keeps serving searches until the new one is built.
+        self.assertLess(
+            conn.statements.index(creates[0]),
+            conn.statements.index("DROP INDEX CONCURRENTLY IF EXISTS ix_document_chunks_embedding_hnsw"),
+        )
+
+    def test_ensure_rebuilds_an_invalid_index_left_by_a_failed_build(self) -> None:
+        name = "ix_document_chunks_embedding_hnsw"
+        conn = FakeConnection(existing=[name], invalid=(name,))
+
+        summary = vector_index.ensure_vector_index(conn, "hnsw")
+
+        self.assertTrue(summary["created"])
+        self.assertEqual(summary["dropped"], [name])
+        drop = conn.statements.index(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        create = next(i for i, sql in enumerate(conn.statements) if sql.startswith("CREATE INDEX"))
+        self.assertLess(drop, create)
+
+    def test_ensure_leaves_an_existing_index_alone_unless_rebuilding(self) -> None:
+        conn = FakeConnection(existing=["ix_document_chunks_embedding_hnsw"])
+        self.assertFalse(vector_index.ensure_vector_index(conn, "hnsw")["created"])
+
+        rebuilt = vector_index.ensure_vector_index(conn, "hnsw", m=32, rebuild=True)
+
+        self.assertTrue(rebuilt["created"])
+        self.assertIn("DROP INDEX CONCURRENTLY IF EXISTS ix_document_chunks_embedding_hnsw", conn.statements)
+        self.assertIn("m = 32", conn.statements[-2])
+
+    def test_search_params_are_transaction_local(self) -> None:
+        cur = MagicMock()
+
+        vector_index.apply_search_params(cur, ef_search=80, probes=12)
+
+        cur.execute.assert_called_once_with(
+            "SELECT set_config(%s, %s, true), set_config(%s, %s, true)",
+            ["hnsw.ef_search", "80", "ivfflat.probes", "12"],
+        )
+
+    def test_search_params_default_to_server_settings(self) -> None:
+        cur = MagicMock()
+        with patch.object(vector_index, "VECTOR_SEARCH_EF_SEARCH", 0), patch.object(vector_index, "VECTOR_SEARCH_PROBES", 0):
+            vector_index.apply_search_params(cur)
+
+        cur.execute.assert_not_called()
+
+    def test_retrieve_docs_applies_per_call_ef_search_before_searching(self) -> None:
+        cache_patch = patch.object(embedding_cache, "_cache", embedding_cache.EmbeddingCache(max_entries=10, path=""))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        cur = MagicMock()
+        cur.fetchall.return_value = []
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cur
+
+        with patch.object(tools, "DATABASE_URL", "postgresql://test"), \
+                patch.object(tools, "_embed_uncached", return_value=[[0.1, 0.2]]), \
+                patch.object(tools, "get_db", return_value=conn), patch.object(tools, "release_db"):
+            tools.retrieve_docs("pricing", top_k=3, ef_search=200)
+
+        first, second = cur.execute.call_args_list
+        self.assertEqual(first.args[1], ["hnsw.ef_search", "200"])
+        self.assertIn("ORDER BY dc.embedding <=> %(embedding)s::vector", second.args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
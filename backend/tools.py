@@ -4,12 +4,21 @@ import logging
 from typing import List, Dict, Tuple, Optional, Any
 import json
 
-import psycopg2
-import psycopg2.pool
 import numpy as np
 import openai
 from datetime import datetime
 
+from rag import backends as retrieval_backends
+from rag.backends import (
+    RetrievalBackend,
+    check_retrieval_filters,
+    get_retrieval_backend,
+    register_retrieval_backend,
+)
+from rag.connection_pool import get_pool
+from rag.embedding_cache import cached_embeddings
+from rag.vector_index import VECTOR_SEARCH_TENANT_PREFILTER, apply_search_params
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -32,30 +41,23 @@ def _get_openai_client():
         openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
     return openai_client
 
-# Pool for efficient DB connections
-db_pool = None
-try:
-    db_pool = psycopg2.pool.SimpleConnectionPool(1, 20, DATABASE_URL)
-    logger.info("✓ Database pool initialized")
-except Exception as e:
-    logger.error(f"Pool creation failed: {e}")
-
 
 # ============================================================================
 # HELPER: DB CONNECTION
 # ============================================================================
 
 def get_db():
-    """Get a connection from the pool."""
-    if not db_pool:
-        raise RuntimeError("Database pool not initialized")
-    return db_pool.getconn()
+    """
+    Get a connection from the shared, thread-safe pool (rag/connection_pool.py).
+    The pool is created on first use and pings stale connections on checkout.
+    """
+    return get_pool().getconn()
 
 
 def release_db(conn, close=False):
     """Release connection back to pool."""
-    if db_pool and conn:
-        db_pool.putconn(conn, close=close)
+    if conn:
+        get_pool().putconn(conn, close=close)
 
 
 # ============================================================================
@@ -63,16 +65,31 @@ def release_db(conn, close=False):
 # ============================================================================
 
 def generate_embedding(text: str, model: str = "text-embedding-3-small") -> List[float]:
-    """Generate OpenAI embedding."""
+    """Generate OpenAI embedding (served from the shared embedding cache when possible)."""
     try:
-        client = _get_openai_client()
-        response = client.embeddings.create(model=model, input=text)
-        return response.data[0].embedding
+        return cached_embeddings([text], model, lambda texts: _embed_uncached(texts, model))[0]
     except Exception as e:
         logger.error(f"Embedding failed: {e}")
         raise
 
 
+def generate_embeddings(texts: List[str], model: str = "text-embedding-3-small") -> List[List[float]]:
+    """Generate OpenAI embeddings for several texts with a single request."""
+    if not texts:
+        return []
+    try:
+        return cached_embeddings(list(texts), model, lambda missing: _embed_uncached(missing, model))
+    except Exception as e:
+        logger.error(f"Batch embedding failed: {e}")
+        raise
+
+
+def _embed_uncached(texts: List[str], model: str) -> List[List[float]]:
+    client = _get_openai_client()
+    response = client.embeddings.create(model=model, input=texts)
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     """Compute cosine similarity between two vectors."""
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-12)
@@ -82,78 +99,159 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
 # RETRIEVAL TOOLS
 # ============================================================================
 
+def _vector_literal(embedding: List[float]) -> str:
+    """Format an embedding as a pgvector literal: '[0.1,0.2,...]'."""
+    return "[" + ",".join(map(str, embedding)) + "]"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _filter_clause(filters: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the WHERE clause and its named params for retrieval filters.
+
+    Each filter maps to an indexed predicate (see rag/vector_index.py):
+    - document_type / user_id: equality, or `= ANY` for a list of values (B-tree)
+    - source: case-insensitive substring match (pg_trgm GIN)
+    - metadata: JSON containment, e.g. {"page_start": 3} (GIN jsonb_path_ops)
+
+    None values are ignored. Unknown keys raise ValueError rather than being
+    dropped, so a misspelt tenant filter can never widen a search.
+    """
+    check_retrieval_filters(filters)
+    conditions = []
+    params: Dict[str, Any] = {}
+    for key, val in (filters or {}).items():
+        if val is None:
+            continue
+        if key in ("document_type", "user_id"):
+            if isinstance(val, (list, tuple, set)):
+                conditions.append(f"dc.{key} = ANY(%({key})s)")
+                params[key] = list(val)
+            else:
+                conditions.append(f"dc.{key} = %({key})s")
+                params[key] = val
+        elif key == "source":
+            conditions.append("dc.source ILIKE %(source)s")
+            params["source"] = f"%{_escape_like(str(val))}%"
+        else:
+            conditions.append("dc.metadata @> %(metadata)s::jsonb")
+            params["metadata"] = json.dumps(val)
+    if not conditions:
+        return "", params
+    return "WHERE " + " AND ".join(conditions), params
+
+
+def _chunk_source(where_clause: str, prefilter: bool) -> str:
+    """
+    FROM target for a vector search. With prefilter the filtered rows are
+    fetched through the filter indexes first and ranked exactly; OFFSET 0
+    keeps the planner from pushing the ORDER BY down onto the ANN index,
+    which would post-filter its candidates and could return fewer than k rows.
+    """
+    if prefilter and where_clause:
+        return f"(SELECT dc.* FROM public.document_chunks dc {where_clause} OFFSET 0) dc"
+    return f"public.document_chunks dc {where_clause}"
+
+
+def _use_prefilter(filters: Optional[Dict[str, Any]], prefilter: Optional[bool]) -> bool:
+    """Pre-filter tenant-scoped searches unless told otherwise."""
+    if prefilter is not None:
+        return prefilter
+    return VECTOR_SEARCH_TENANT_PREFILTER and (filters or {}).get("user_id") is not None
+
+
+def _parse_vector(value) -> Optional[List[float]]:
+    """Parse a pgvector value returned as text ('[0.1,0.2,...]') or a sequence."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return json.loads(value)
+    return list(value)
+
+
+def _row_to_doc(row) -> Dict[str, Any]:
+    doc = {
+        "chunk_text": row[0],
+        "document_id": row[1],
+        "similarity": float(row[2]),
+        "source": row[3],
+        "metadata": row[4] or {}
+    }
+    if len(row) > 5:
+        doc["embedding"] = _parse_vector(row[5])
+    return doc
+
+
 def retrieve_docs(
     query: str,
     top_k: int = 5,
-    filters: Optional[Dict[str, Any]] = None
+    filters: Optional[Dict[str, Any]] = None,
+    include_embeddings: bool = False,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    prefilter: Optional[bool] = None
 ) -> List[Dict[str, Any]]:
     """
-    Retrieve top-k documents vector store.
+    Retrieve top-k documents from the configured retrieval backend.
 
     Args:
         query: Search query text
         top_k: Number of results to return
-        filters: Optional dict with 'document_type', 'user_id', etc.
+        filters: Optional dict with 'document_type', 'user_id', 'source', 'metadata'
+        include_embeddings: Also return each chunk's stored embedding (for MMR)
+        ef_search: HNSW candidate list size for this call (recall vs latency)
+        probes: IVFFlat lists scanned for this call (recall vs latency)
+        prefilter: Rank the filtered rows exactly instead of post-filtering
+            ANN candidates (default: on for user_id-scoped searches)
 
     Returns:
         List of dicts with keys: chunk_text, document_id, similarity, source, metadata
+        (plus embedding when include_embeddings is set)
+
+    Raises:
+        ValueError: for an unknown filter key; other failures are logged and
+            return no documents
     """
-    if not db_pool:
+    check_retrieval_filters(filters)
+    if retrieval_backends.RETRIEVAL_BACKEND != "pgvector":
+        return retrieve_docs_batch(
+            [query], top_k, filters, include_embeddings, ef_search=ef_search, probes=probes, prefilter=prefilter
+        )[0]
+    if not DATABASE_URL:
         logger.error("Database not initialized")
         return []
 
     try:
+        where_clause, filter_params = _filter_clause(filters)
         embedding = generate_embedding(query)
-        embedding_str = "[" + ",".join(map(str, embedding)) + "]"
+        embedding_str = _vector_literal(embedding)
 
         conn = get_db()
         results = []
         try:
             with conn.cursor() as cur:
-                # Build WHERE clause if filters provided
-                where_clause = ""
-                params = [embedding_str]
-
-                if filters:
-                    conditions = []
-                    # param_idx = 3
-                    for key, val in filters.items():
-                        if key == "document_type":
-                            conditions.append(f"dc.document_type = %s")
-                            params.append(val)
-                        elif key == "user_id":
-                            conditions.append(f"dc.user_id = %s")
-                            params.append(val)
-                        elif key == "source":
-                            conditions.append(f"dc.source ILIKE %s")
-                            params.append(f"%{val}%")
-                    if conditions:
-                        where_clause = "WHERE " + " AND ".join(conditions)
-
+                apply_search_params(cur, ef_search=ef_search, probes=probes)
                 query_sql = f"""
                     SELECT
                         dc.chunk_text::text,
                         dc.document_id::text,
-                        1 - (dc.embedding <=> %s::vector) as similarity,
+                        1 - (dc.embedding <=> %(embedding)s::vector) as similarity,
                         dc.source::text,
                         dc.metadata
-                    FROM public.document_chunks dc
-                    {where_clause}
-                    ORDER BY dc.embedding <=> %s::vector
-                    LIMIT %s
+                        {", dc.embedding::text" if include_embeddings else ""}
+                    FROM {_chunk_source(where_clause, _use_prefilter(filters, prefilter))}
+                    ORDER BY dc.embedding <=> %(embedding)s::vector
+                    LIMIT %(top_k)s
                 """
-                params.extend([embedding_str, top_k])
+                params = {**filter_params, "embedding": embedding_str, "top_k": top_k}
                 cur.execute(query_sql, params)
                 rows = cur.fetchall()
 
                 for row in rows:
-                    results.append({
-                        "chunk_text": row[0],
-                        "document_id": row[1],
-                        "similarity": float(row[2]),
-                        "source": row[3],
-                        "metadata": row[4] or {}
-                    })
+                    results.append(_row_to_doc(row))
         finally:
             release_db(conn)
 
@@ -165,6 +263,149 @@ def retrieve_docs(
         return []
 
 
+def retrieve_docs_batch(
+    queries: List[str],
+    top_k: int = 5,
+    filters: Optional[Dict[str, Any]] = None,
+    include_embeddings: bool = False,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    prefilter: Optional[bool] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Retrieve top-k documents for several queries in one round-trip each to
+    OpenAI and Postgres.
+
+    All queries are embedded with a single embeddings request and searched
+    with one LATERAL join, so the cost no longer grows with the number of
+    queries. With RETRIEVAL_BACKEND set to another backend (e.g. "local",
+    see rag/backends.py) the search goes there instead.
+
+    Args:
+        queries: Search query texts
+        top_k: Number of results to return per query
+        filters: Optional dict with 'document_type', 'user_id', 'source', 'metadata'
+        include_embeddings: Also return each chunk's stored embedding (for MMR)
+        ef_search: HNSW candidate list size for this call (recall vs latency)
+        probes: IVFFlat lists scanned for this call (recall vs latency)
+        prefilter: Rank the filtered rows exactly instead of post-filtering
+            ANN candidates (default: on for user_id-scoped searches)
+
+    Returns:
+        One list of retrieve_docs()-shaped dicts per query, in query order
+
+    Raises:
+        ValueError: for an unknown filter key, as retrieve_docs
+    """
+    check_retrieval_filters(filters)
+    if retrieval_backends.RETRIEVAL_BACKEND != "pgvector":
+        if not queries:
+            return []
+        try:
+            return get_retrieval_backend().search(
+                queries, top_k, filters, include_embeddings, ef_search=ef_search, probes=probes, prefilter=prefilter
+            )
+        except Exception as e:
+            logger.error(f"Batch retrieval failed: {e}")
+            return [[] for _ in queries]
+    return _pgvector_retrieve_docs_batch(queries, top_k, filters, include_embeddings, ef_search, probes, prefilter)
+
+
+def _pgvector_retrieve_docs_batch(
+    queries: List[str],
+    top_k: int,
+    filters: Optional[Dict[str, Any]],
+    include_embeddings: bool,
+    ef_search: Optional[int],
+    probes: Optional[int],
+    prefilter: Optional[bool]
+) -> List[List[Dict[str, Any]]]:
+    check_retrieval_filters(filters)
+    results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+    if not queries:
+        return results
+    if not DATABASE_URL:
+        logger.error("Database not initialized")
+        return results
+
+    try:
+        where_clause, filter_params = _filter_clause(filters)
+        embeddings = generate_embeddings(queries)
+        embedding_strs = [_vector_literal(embedding) for embedding in embeddings]
+
+        conn = get_db()
+        try:
+            with conn.cursor() as cur:
+                apply_search_params(cur, ef_search=ef_search, probes=probes)
+                query_sql = f"""
+                    SELECT
+                        q.query_index,
+                        hit.chunk_text,
+                        hit.document_id,
+                        hit.similarity,
+                        hit.source,
+                        hit.metadata
+                        {", hit.embedding" if include_embeddings else ""}
+                    FROM unnest(%(query_indexes)s::int[], %(embeddings)s::text[]) AS q(query_index, embedding)
+                    CROSS JOIN LATERAL (
+                        SELECT
+                            dc.chunk_text::text AS chunk_text,
+                            dc.document_id::text AS document_id,
+                            1 - (dc.embedding <=> q.embedding::vector) AS similarity,
+                            dc.source::text AS source,
+                            dc.metadata AS metadata
+                            {", dc.embedding::text AS embedding" if include_embeddings else ""}
+                        FROM {_chunk_source(where_clause, _use_prefilter(filters, prefilter))}
+                        ORDER BY dc.embedding <=> q.embedding::vector
+                        LIMIT %(top_k)s
+                    ) hit
+                    ORDER BY q.query_index, hit.similarity DESC
+                """
+                params = {
+                    **filter_params,
+                    "query_indexes": list(range(len(queries))),
+                    "embeddings": embedding_strs,
+                    "top_k": top_k,
+                }
+                cur.execute(query_sql, params)
+                for row in cur.fetchall():
+                    results[row[0]].append(_row_to_doc(row[1:]))
+        finally:
+            release_db(conn)
+
+        logger.info(f"Retrieved {sum(len(docs) for docs in results)} docs for {len(queries)} queries")
+        return results
+
+    except Exception as e:
+        logger.error(f"Batch retrieval failed: {e}")
+        return [[] for _ in queries]
+
+
+@register_retrieval_backend("pgvector")
+class PgvectorBackend(RetrievalBackend):
+    """document_chunks in Postgres, searched with pgvector (the default)."""
+
+    name = "pgvector"
+
+    def search(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+        **options: Any
+    ) -> List[List[Dict[str, Any]]]:
+        return _pgvector_retrieve_docs_batch(
+            queries,
+            top_k,
+            filters,
+            include_embeddings,
+            options.get("ef_search"),
+            options.get("probes"),
+            options.get("prefilter"),
+        )
+
+
 def rerank_with_mmr(
     query: str,
     candidates: List[Dict[str, Any]],
@@ -174,6 +415,11 @@ def rerank_with_mmr(
     """
     Rerank candidates using Max Marginal Relevance (diversity + relevance).
 
+    Candidates must carry their stored "embedding" (retrieve with
+    include_embeddings=True). Relevance is the similarity retrieval already
+    computed against the query embedding; diversity comes from a candidate x
+    candidate cosine matrix computed once. No embedding call is made here.
+
     Args:
         query: Original search query
         candidates: List of retrieved candidates from retrieve_docs()
@@ -187,36 +433,26 @@ def rerank_with_mmr(
         return candidates
 
     try:
-        # Get query embedding
-        query_emb = np.array(generate_embedding(query))
-
-        # Get candidate embeddings (reuse stored similarity as proxy)
-        selected = []
-        remaining_indices = set(range(len(candidates)))
-
-        # Greedy MMR selection
-        for _ in range(min(top_k, len(candidates))):
-            best_idx = None
-            best_score = -float('inf')
-
-            for idx in remaining_indices:
-                cand = candidates[idx]
-                relevance = cand.get("similarity", 0.0)
-
-                # Diversity: min distance to already selected
-                diversity = 0.0
-                if selected:
-                    # Use stored similarity as diversity proxy
-                    diversity = min([candidates[sel_idx].get("similarity", 0.0) for sel_idx in selected])
-
-                mmr_score = lambda_param * relevance - (1 - lambda_param) * diversity
-                if mmr_score > best_score:
-                    best_score = mmr_score
-                    best_idx = idx
-
-            if best_idx is not None:
-                selected.append(best_idx)
-                remaining_indices.remove(best_idx)
+        if any(cand.get("embedding") is None for cand in candidates):
+            logger.warning("MMR reranking skipped: candidates have no stored embeddings")
+            return candidates[:top_k]
+
+        matrix = np.asarray([cand["embedding"] for cand in candidates], dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+        relevance = np.asarray([cand.get("similarity", 0.0) for cand in candidates], dtype=np.float32)
+        pairwise = matrix @ matrix.T
+
+        # Greedy MMR selection with a running max-similarity-to-selected vector
+        selected: List[int] = []
+        max_sim_to_selected = np.zeros(len(candidates), dtype=np.float32)
+        available = np.ones(len(candidates), dtype=bool)
+        for _ in range(top_k):
+            scores = lambda_param * relevance - (1 - lambda_param) * max_sim_to_selected
+            scores[~available] = -np.inf
+            best_idx = int(np.argmax(scores))
+            selected.append(best_idx)
+            available[best_idx] = False
+            np.maximum(max_sim_to_selected, pairwise[best_idx], out=max_sim_to_selected)
 
         return [candidates[i] for i in selected]
 
@@ -343,7 +579,7 @@ def rag_pipeline(
     """
     try:
         # 1. Retrieve
-        docs = retrieve_docs(query, top_k=top_k, filters=filters)
+        docs = retrieve_docs(query, top_k=top_k, filters=filters, include_embeddings=use_mmr)
         if not docs:
             return {
                 "answer": "No relevant documents found.",
@@ -384,10 +620,12 @@ def rag_pipeline(
 
 __all__ = [
     "retrieve_docs",
+    "retrieve_docs_batch",
     "rerank_with_mmr",
     "generate_answer",
     "build_context",
     "rag_pipeline",
     "generate_embedding",
+    "generate_embeddings",
     "cosine_similarity",
 ]